@@ -0,0 +1,62 @@
+"""personal records
+
+Revision ID: 4e8b2f6a1d93
+Revises: 9c1d4e7a2b60
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8b2f6a1d93"
+down_revision: Union[str, None] = "9c1d4e7a2b60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "personal_records",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("exercise_id", sa.Uuid(), nullable=False),
+        sa.Column("best_weight", sa.Float(), nullable=False),
+        sa.Column("best_e1rm", sa.Float(), nullable=False),
+        sa.Column("best_volume", sa.Float(), nullable=False),
+        sa.Column("workouts_count", sa.Integer(), nullable=False),
+        sa.Column("last_performed_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["exercise_id"], ["exercises.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "exercise_id", name="uq_personal_records_user_exercise"
+        ),
+    )
+    # Заполнение по существующей истории; формула 1RM — как в records_repo
+    op.execute(
+        """
+        INSERT INTO personal_records (
+            id, user_id, exercise_id, best_weight, best_e1rm, best_volume,
+            workouts_count, last_performed_at
+        )
+        SELECT
+            gen_random_uuid(), user_id, exercise_id, max(weight),
+            max(CASE
+                WHEN reps <= 1 THEN weight
+                WHEN reps <= 10 THEN weight * 36 / (37 - reps)
+                ELSE weight * (1 + reps / 30.0)
+            END),
+            max(total_volume), count(*), max(performed_at)
+        FROM workouts
+        GROUP BY user_id, exercise_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("personal_records")
@@ -0,0 +1,88 @@
+"""training streaks
+
+Revision ID: 7a3c5e9b1f24
+Revises: 4e8b2f6a1d93
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7a3c5e9b1f24"
+down_revision: Union[str, None] = "4e8b2f6a1d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "training_streaks",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("first_training_day", sa.Date(), nullable=False),
+        sa.Column("last_training_day", sa.Date(), nullable=False),
+        sa.Column("current_streak", sa.Integer(), nullable=False),
+        sa.Column("longest_streak", sa.Integer(), nullable=False),
+        sa.Column("total_days", sa.Integer(), nullable=False),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("week_days", sa.Integer(), nullable=False),
+        sa.Column("previous_week_days", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    # Заполнение по существующей истории; расчёт — как в streaks_repo.rebuild
+    op.execute(
+        """
+        WITH days AS (
+            SELECT DISTINCT user_id, performed_at::date AS day FROM workouts
+        ),
+        runs AS (
+            SELECT user_id, count(*) AS length, max(day) AS end_day
+            FROM (
+                SELECT user_id, day,
+                    day - row_number() OVER (
+                        PARTITION BY user_id ORDER BY day
+                    )::int AS island
+                FROM days
+            ) AS islands
+            GROUP BY user_id, island
+        ),
+        streaks AS (
+            SELECT user_id, max(length) AS longest,
+                (array_agg(length ORDER BY end_day DESC))[1] AS current
+            FROM runs
+            GROUP BY user_id
+        ),
+        totals AS (
+            SELECT user_id, min(day) AS first_day, max(day) AS last_day,
+                count(*) AS total_days,
+                date_trunc('week', max(day))::date AS week_start
+            FROM days
+            GROUP BY user_id
+        )
+        INSERT INTO training_streaks (
+            id, user_id, first_training_day, last_training_day, current_streak,
+            longest_streak, total_days, week_start, week_days, previous_week_days
+        )
+        SELECT
+            gen_random_uuid(), t.user_id, t.first_day, t.last_day, s.current,
+            s.longest, t.total_days, t.week_start,
+            count(*) FILTER (WHERE d.day >= t.week_start),
+            count(*) FILTER (WHERE d.day < t.week_start)
+        FROM totals AS t
+        JOIN streaks AS s ON s.user_id = t.user_id
+        JOIN days AS d ON d.user_id = t.user_id AND d.day >= t.week_start - 7
+        GROUP BY t.user_id, t.first_day, t.last_day, t.total_days, t.week_start,
+            s.current, s.longest
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("training_streaks")
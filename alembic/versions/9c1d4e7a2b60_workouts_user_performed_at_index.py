@@ -0,0 +1,56 @@
+"""workouts (user_id, performed_at) index
+
+Revision ID: 9c1d4e7a2b60
+Revises: 32f3ba11c6c6
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1d4e7a2b60"
+down_revision: Union[str, None] = "32f3ba11c6c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Составной индекс покрывает и фильтр по user_id, поэтому одиночный
+    # индекс удаляется. CONCURRENTLY не блокирует запись в таблицу.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_workouts_user_id_performed_at",
+            "workouts",
+            ["user_id", "performed_at"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_workouts_user_id",
+            table_name="workouts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_workouts_user_id",
+            "workouts",
+            ["user_id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_workouts_user_id_performed_at",
+            table_name="workouts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,45 @@
+"""coach athletes
+
+Revision ID: b5d2f8c4e617
+Revises: 7a3c5e9b1f24
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5d2f8c4e617"
+down_revision: Union[str, None] = "7a3c5e9b1f24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coach_athletes",
+        sa.Column("coach_id", sa.Uuid(), nullable=False),
+        sa.Column("athlete_id", sa.Uuid(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["athlete_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["coach_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "coach_id", "athlete_id", name="uq_coach_athletes_coach_athlete"
+        ),
+    )
+    op.create_index(
+        op.f("ix_coach_athletes_athlete_id"),
+        "coach_athletes",
+        ["athlete_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_coach_athletes_athlete_id"), table_name="coach_athletes")
+    op.drop_table("coach_athletes")
@@ -0,0 +1,89 @@
+"""workout sessions
+
+Revision ID: c8e1a4d7f352
+Revises: b5d2f8c4e617
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e1a4d7f352"
+down_revision: Union[str, None] = "b5d2f8c4e617"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "workout_sessions",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "started_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("ended_at", sa.DateTime(), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("exercises_count", sa.Integer(), nullable=False),
+        sa.Column("sets_count", sa.Integer(), nullable=False),
+        sa.Column("total_volume", sa.Float(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_workout_sessions_user_id_started_at",
+        "workout_sessions",
+        ["user_id", "started_at"],
+        unique=False,
+    )
+    op.add_column("workouts", sa.Column("session_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "workouts_session_id_fkey",
+        "workouts",
+        "workout_sessions",
+        ["session_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index(
+        op.f("ix_workouts_session_id"), "workouts", ["session_id"], unique=False
+    )
+    # Существующая история: одна сессия на пользователя и день
+    op.execute(
+        """
+        WITH sessions AS (
+            INSERT INTO workout_sessions (
+                id, user_id, started_at, ended_at, exercises_count, sets_count,
+                total_volume
+            )
+            SELECT
+                gen_random_uuid(), user_id, min(performed_at), max(performed_at),
+                count(DISTINCT exercise_id), sum(sets), sum(total_volume)
+            FROM workouts
+            GROUP BY user_id, performed_at::date
+            RETURNING id, user_id, started_at::date AS day
+        )
+        UPDATE workouts AS w
+        SET session_id = s.id
+        FROM sessions AS s
+        WHERE w.user_id = s.user_id AND w.performed_at::date = s.day
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_workouts_session_id"), table_name="workouts")
+    op.drop_constraint("workouts_session_id_fkey", "workouts", type_="foreignkey")
+    op.drop_column("workouts", "session_id")
+    op.drop_index(
+        "ix_workout_sessions_user_id_started_at", table_name="workout_sessions"
+    )
+    op.drop_table("workout_sessions")
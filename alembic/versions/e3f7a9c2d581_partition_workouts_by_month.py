@@ -0,0 +1,162 @@
+"""partition workouts by month
+
+Revision ID: e3f7a9c2d581
+Revises: c8e1a4d7f352
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3f7a9c2d581"
+down_revision: Union[str, None] = "c8e1a4d7f352"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, user_id, performed_at, sets, reps, weight, total_volume,"
+    " exercise_id, session_id"
+)
+
+# Копия app.db.partitions.CREATE_PARTITION_FUNCTION на момент миграции
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_workouts_partition(month date)
+RETURNS text AS $$
+DECLARE
+    start_at timestamp := date_trunc('month', month::timestamp);
+    end_at timestamp := start_at + interval '1 month';
+    partition_name text := 'workouts_' || to_char(start_at, 'YYYY_MM');
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE workouts INCLUDING DEFAULTS)', partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM workouts_default'
+        ' WHERE performed_at >= %L AND performed_at < %L RETURNING *)'
+        ' INSERT INTO %I SELECT * FROM moved',
+        start_at, end_at, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE workouts ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_at, end_at
+    );
+    RETURN partition_name;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _workouts_columns() -> list[sa.Column]:
+    return [
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column(
+            "performed_at",
+            sa.DateTime(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("sets", sa.Integer(), nullable=False),
+        sa.Column("reps", sa.Integer(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=False),
+        sa.Column("total_volume", sa.Float(), nullable=False),
+        sa.Column("exercise_id", sa.Uuid(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("session_id", sa.Uuid(), nullable=True),
+    ]
+
+
+def _workouts_foreign_keys() -> list[sa.ForeignKeyConstraint]:
+    return [
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"], name="workouts_user_id_fkey"
+        ),
+        sa.ForeignKeyConstraint(
+            ["exercise_id"], ["exercises.id"], name="workouts_exercise_id_fkey"
+        ),
+        sa.ForeignKeyConstraint(
+            ["session_id"],
+            ["workout_sessions.id"],
+            name="workouts_session_id_fkey",
+            ondelete="CASCADE",
+        ),
+    ]
+
+
+def _create_indexes() -> None:
+    # На секционированной таблице индекс строится в каждой секции
+    op.create_index(
+        "ix_workouts_user_id_performed_at",
+        "workouts",
+        ["user_id", "performed_at"],
+        unique=False,
+    )
+    op.create_index("ix_workouts_session_id", "workouts", ["session_id"], unique=False)
+
+
+def _drop_indexes() -> None:
+    op.drop_index("ix_workouts_session_id", table_name="workouts")
+    op.drop_index("ix_workouts_user_id_performed_at", table_name="workouts")
+
+
+def upgrade() -> None:
+    _drop_indexes()
+    op.execute(
+        "ALTER TABLE workouts RENAME CONSTRAINT workouts_pkey TO workouts_old_pkey"
+    )
+    op.rename_table("workouts", "workouts_old")
+
+    op.create_table(
+        "workouts",
+        *_workouts_columns(),
+        *_workouts_foreign_keys(),
+        sa.PrimaryKeyConstraint("id", "performed_at", name="workouts_pkey"),
+        postgresql_partition_by="RANGE (performed_at)",
+    )
+    op.execute("CREATE TABLE workouts_default PARTITION OF workouts DEFAULT")
+    op.execute(CREATE_PARTITION_FUNCTION)
+    # Секции на всю историю и на три месяца вперёд; дальше их создаёт
+    # scripts.create_partitions
+    op.execute(
+        """
+        SELECT create_workouts_partition(month::date)
+        FROM generate_series(
+            date_trunc(
+                'month', coalesce((SELECT min(performed_at) FROM workouts_old), now())
+            ),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        ) AS month
+        """
+    )
+    op.execute(f"INSERT INTO workouts ({COLUMNS}) SELECT {COLUMNS} FROM workouts_old")
+    _create_indexes()
+    op.drop_table("workouts_old")
+
+
+def downgrade() -> None:
+    _drop_indexes()
+    op.execute(
+        "ALTER TABLE workouts RENAME CONSTRAINT workouts_pkey TO workouts_old_pkey"
+    )
+    op.rename_table("workouts", "workouts_old")
+
+    op.create_table(
+        "workouts",
+        *_workouts_columns(),
+        *_workouts_foreign_keys(),
+        sa.PrimaryKeyConstraint("id", name="workouts_pkey"),
+    )
+    op.execute(f"INSERT INTO workouts ({COLUMNS}) SELECT {COLUMNS} FROM workouts_old")
+    _create_indexes()
+    # Секции удаляются вместе с родительской таблицей
+    op.drop_table("workouts_old")
+    op.execute("DROP FUNCTION create_workouts_partition(date)")
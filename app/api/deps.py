@@ -1,17 +1,27 @@
+from collections.abc import AsyncIterator
+from functools import partial
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 import redis
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
 
-from app.core.exceptions import CreditionalsException
-from app.db.session import get_session
+from app.core.data_version import build_etag, data_versions, etag_matches
+from app.core.exceptions import CreditionalsException, NotModifiedException
+from app.db.session import get_session, read_session, replica_router
 from app.db.models.users import Users
+from app.schemas.workout import utc_today
 from app.core.cache import cache_manager
+from app.services.dashboard_service import SessionFactory
+from app.services.idempotency import (
+    IdempotentRequest,
+    idempotency_cache_key,
+    request_fingerprint,
+)
 from app.services.user_service import UserService
 from app.core.security import decode_access_token
 
@@ -48,4 +58,80 @@ async def get_current_user(
             )
 
     service = UserService(session=session)
-    return await service.get_by_id(user_id)
+    return await service.get_cached_by_id(user_id)
+
+
+async def _read_from_primary(user: Users) -> bool:
+    return replica_router.enabled and await replica_router.is_pinned(user.id)
+
+
+async def get_read_session(
+    current_user: Users = Depends(get_current_user),
+) -> AsyncIterator[AsyncSession]:
+    """Сессия для чтения: реплика, либо primary сразу после записи пользователя."""
+    use_primary = await _read_from_primary(current_user)
+    async with read_session(use_primary=use_primary) as session:
+        yield session
+
+
+async def get_read_session_factory(
+    current_user: Users = Depends(get_current_user),
+) -> SessionFactory:
+    """Фабрика сессий для чтения, когда нужно несколько параллельных запросов."""
+    use_primary = await _read_from_primary(current_user)
+    return partial(read_session, use_primary=use_primary)
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: Users = Depends(get_current_user),
+) -> None:
+    """ETag по версии данных пользователя; совпадение с If-None-Match — 304.
+
+    Выполняется до обращения к БД, поэтому 304 не стоит ни запроса,
+    ни сериализации. Без Redis условные GET отключены. Запросы кроме
+    GET/HEAD (пакетные POST) не версионируются: их ответ зависит не
+    только от данных текущего пользователя.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return
+    version = await data_versions.get(current_user.id)
+    if version is None:
+        # Без Redis версия не общая для процессов — ответ всегда полный
+        return
+    headers = {
+        "ETag": build_etag(version, f"{utc_today()}:{request.url}"),
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(headers["ETag"], request.headers.get("if-none-match")):
+        raise NotModifiedException(headers=headers)
+    response.headers.update(headers)
+
+
+async def get_idempotent_request(
+    request: Request,
+    idempotency_key: str | None = Header(
+        None, alias="Idempotency-Key", min_length=1, max_length=255
+    ),
+    current_user: Users = Depends(get_current_user),
+) -> AsyncIterator[IdempotentRequest]:
+    """Ключ идемпотентности записи из заголовка ``Idempotency-Key``.
+
+    Повтор с тем же ключом получает сохранённый ответ (``replayed``);
+    ошибка обработчика освобождает ключ.
+    """
+    if idempotency_key is None:
+        yield IdempotentRequest()
+        return
+
+    guard = IdempotentRequest(
+        idempotency_cache_key(current_user.id, idempotency_key),
+        request_fingerprint(request.method, request.url.path, await request.body()),
+    )
+    await guard.acquire()
+    try:
+        yield guard
+    except Exception:
+        await guard.release()
+        raise
@@ -0,0 +1,33 @@
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+
+def _orjson_default(value: Any) -> Any:
+    # asyncpg отдаёт собственный подкласс UUID, orjson понимает только uuid.UUID
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse, понимающий значения прямо из строк asyncpg."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
+def orjson_response(content: Any, response: Response) -> FastJSONResponse:
+    """Ответ напрямую через orjson, минуя response_model и jsonable_encoder.
+
+    Заголовки, выставленные зависимостями (ETag, Cache-Control), переносятся
+    в итоговый ответ: FastAPI их не добавляет, если эндпоинт вернул Response.
+    """
+    return FastJSONResponse(content, headers=dict(response.headers))
@@ -4,6 +4,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
 
+from app.db.instrumentation import pool_metrics
 from app.db.session import get_session
 from app.api.deps import get_redis
 
@@ -20,9 +21,10 @@ async def health(
         "redis": False,
     }
 
-    # DB
+    # DB: autocommit, без BEGIN/COMMIT вокруг проверочного запроса
     try:
-        await db.execute(select(1))
+        conn = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        await conn.execute(select(1))
         checks["database"] = True
     except Exception:
         checks["database"] = False
@@ -48,3 +50,9 @@ async def health(
         content=payload,
         status_code=status_code,
     )
+
+
+@router.get("/pool", status_code=status.HTTP_200_OK)
+async def pool_stats():
+    """Метрики пулов соединений и запросов по каждому engine."""
+    return {"engines": pool_metrics()}
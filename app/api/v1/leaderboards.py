@@ -0,0 +1,61 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user, get_read_session
+from app.core.exceptions import ExerciseNotFoundException
+from app.db.models.users import Users
+from app.schemas.workout import utc_today
+from app.schemas.leaderboard import (
+    ExerciseLeaderboardResponse,
+    LeaderboardPeriodParam,
+    VolumeLeaderboardResponse,
+)
+from app.services.leaderboards import (
+    LeaderboardService,
+    best_weight_key,
+    volume_key,
+)
+from app.services.metrics_history import bucket_start
+
+router = APIRouter(prefix="/leaderboards", tags=["leaderboards"])
+
+
+def get_leaderboard_service(session: AsyncSession = Depends(get_read_session)):
+    return LeaderboardService(session)
+
+
+@router.get("/volume", response_model=VolumeLeaderboardResponse)
+async def get_volume_leaderboard(
+    period: LeaderboardPeriodParam = Query("week"),
+    at: date | None = Query(
+        None, description="Любой день периода; по умолчанию — сегодня"
+    ),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: Users = Depends(get_current_user),
+    service: LeaderboardService = Depends(get_leaderboard_service),
+):
+    start = bucket_start(period, at or utc_today())
+    entries, me = await service.get_board(
+        volume_key(period, start), current_user.id, limit
+    )
+    return VolumeLeaderboardResponse(
+        period=period, period_start=start, entries=entries, me=me
+    )
+
+
+@router.get("/exercises/{name}", response_model=ExerciseLeaderboardResponse)
+async def get_exercise_leaderboard(
+    name: str = Path(..., min_length=1),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: Users = Depends(get_current_user),
+    service: LeaderboardService = Depends(get_leaderboard_service),
+):
+    exercise_id = await service.get_exercise_id(name)
+    if exercise_id is None:
+        raise ExerciseNotFoundException(name)
+    entries, me = await service.get_board(
+        best_weight_key(exercise_id), current_user.id, limit
+    )
+    return ExerciseLeaderboardResponse(exercise_name=name, entries=entries, me=me)
@@ -1,37 +1,217 @@
-from fastapi import APIRouter, Depends, Path, Query
+from datetime import date, timedelta
+
+from fastapi import APIRouter, Depends, Path, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_session
+from app.api.deps import (
+    conditional_get,
+    get_read_session,
+    get_read_session_factory,
+)
+from app.api.responses import orjson_response
 from app.api.v1.auth import get_current_user
-from app.schemas.metrics import MetricsSummaryResponse
-from app.schemas.workout import MetricsOut
+from app.core.exceptions import ExerciseNotFoundException, InvalidDateRangeException
+from app.schemas.metrics import (
+    BatchSummaryItem,
+    BatchSummaryRequest,
+    BatchSummaryResponse,
+    DashboardResponse,
+    DistributionField,
+    DistributionResponse,
+    MetricsComparisonResponse,
+    ExerciseRecordResponse,
+    MuscleGroupItem,
+    MetricsSummaryResponse,
+    SummaryCompare,
+    TimelineFormat,
+    TimelineGranularity,
+)
+from app.schemas.workout import MetricsOut, utc_today
 from app.db.models.users import Users
+from app.services.coach_service import CoachService
+from app.services.dashboard_service import DashboardService, SessionFactory
+from app.services.metrics_history import to_points
 from app.services.metrics_service import MetricsService
 
 
-router = APIRouter(prefix="/metrics", tags=["metrics"])
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+    dependencies=[Depends(conditional_get)],
+)
+
+MAX_RANGE_DAYS = 3 * 366
+
+
+def get_date_range(
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+) -> tuple[date, date] | None:
+    """Произвольное окно [from, to] (включительно); to по умолчанию — сегодня."""
+    if date_from is None:
+        if date_to is not None:
+            raise InvalidDateRangeException("'to' requires 'from'")
+        return None
+    date_to = date_to or utc_today()
+    if date_from > date_to:
+        raise InvalidDateRangeException("'from' must not be after 'to'")
+    if date_to - date_from > timedelta(days=MAX_RANGE_DAYS):
+        raise InvalidDateRangeException(f"Range must not exceed {MAX_RANGE_DAYS} days")
+    return date_from, date_to
 
 
 def get_metrics_service(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
     current_user: Users = Depends(get_current_user),
 ):
     return MetricsService(session, user_id=current_user.id)
 
 
-@router.get("/summary", response_model=MetricsSummaryResponse)
+def get_coach_service(
+    session: AsyncSession = Depends(get_read_session),
+    current_user: Users = Depends(get_current_user),
+):
+    return CoachService(session, coach_id=current_user.id)
+
+
+def get_dashboard_service(
+    session_factory: SessionFactory = Depends(get_read_session_factory),
+    current_user: Users = Depends(get_current_user),
+):
+    return DashboardService(session_factory, user_id=current_user.id)
+
+
+@router.get(
+    "/summary",
+    response_model=MetricsSummaryResponse | MetricsComparisonResponse,
+)
 async def get_metrics_summary(
     days: int = Query(7, ge=1, le=365),
+    compare: SummaryCompare | None = Query(None),
+    date_range: tuple[date, date] | None = Depends(get_date_range),
     service: MetricsService = Depends(get_metrics_service),
-) -> MetricsSummaryResponse:
-    summary = await service.get_summary(days=days)
-    return MetricsSummaryResponse(**summary)
+):
+    if compare == "previous":
+        if date_range is not None:
+            comparison = await service.get_summary_comparison_range(*date_range)
+            sessions = await service.get_sessions_comparison_range(*date_range)
+        else:
+            comparison = await service.get_summary_comparison(days=days)
+            sessions = await service.get_sessions_comparison(days=days)
+        response = MetricsComparisonResponse(**comparison)
+        response.current.sessions_count, response.previous.sessions_count = sessions
+        return response
+
+    if date_range is not None:
+        summary = await service.get_summary_range(*date_range)
+        sessions_count = await service.get_sessions_count_range(*date_range)
+    else:
+        summary = await service.get_summary(days=days)
+        sessions_count = await service.get_sessions_count(days=days)
+    # Серии не зависят от окна и читаются отдельно от кэшированной сводки
+    return MetricsSummaryResponse(
+        **summary, sessions_count=sessions_count, streaks=await service.get_streaks()
+    )
+
+
+@router.post("/summary/batch", response_model=BatchSummaryResponse)
+async def get_metrics_summary_batch(
+    payload: BatchSummaryRequest,
+    service: CoachService = Depends(get_coach_service),
+):
+    summaries = await service.get_summaries(payload.user_ids, days=payload.days)
+    return BatchSummaryResponse(
+        items=[
+            BatchSummaryItem(user_id=user_id, **summary)
+            for user_id, summary in summaries.items()
+        ]
+    )
 
 
 @router.get("/timeline")
 async def get_workout_timeline(
+    response: Response,
+    days: int = Query(30, ge=1, le=365),
+    fmt: TimelineFormat = Query("rows", alias="format"),
+    granularity: TimelineGranularity = Query("day"),
+    date_range: tuple[date, date] | None = Depends(get_date_range),
+    service: MetricsService = Depends(get_metrics_service),
+):
+    if date_range is not None:
+        columns = await service.get_timeline_range(*date_range, granularity)
+        if fmt == "columnar":
+            return orjson_response(columns, response)
+        return orjson_response(to_points(columns), response)
+    if fmt == "columnar":
+        columns = await service.get_workout_timeline_columns(
+            days=days, granularity=granularity
+        )
+        return orjson_response(columns, response)
+    rows = await service.get_workout_timeline(days=days, granularity=granularity)
+    return orjson_response(rows, response)
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+    days: int = Query(7, ge=1, le=365),
+    fmt: TimelineFormat = Query("rows", alias="format"),
+    granularity: TimelineGranularity = Query("day"),
+    service: DashboardService = Depends(get_dashboard_service),
+):
+    return await service.get_dashboard(
+        days=days, timeline_format=fmt, granularity=granularity
+    )
+
+
+@router.get("/muscle-groups", response_model=list[MuscleGroupItem])
+async def get_muscle_groups(
+    days: int = Query(30, ge=1, le=365),
+    date_range: tuple[date, date] | None = Depends(get_date_range),
+    service: MetricsService = Depends(get_metrics_service),
+):
+    if date_range is not None:
+        return await service.get_muscle_groups_range(*date_range)
+    return await service.get_muscle_groups(days=days)
+
+
+@router.get("/load")
+async def get_training_load(
+    response: Response,
+    days: int = Query(90, ge=7, le=1825),
+    service: MetricsService = Depends(get_metrics_service),
+):
+    report = await service.get_training_load(days=days)
+    return orjson_response(report, response)
+
+
+@router.get("/distribution", response_model=DistributionResponse)
+async def get_distribution(
+    field: DistributionField = Query(...),
+    buckets: int | None = Query(None, ge=1, le=50),
     days: int = Query(30, ge=1, le=365),
+    date_range: tuple[date, date] | None = Depends(get_date_range),
+    service: MetricsService = Depends(get_metrics_service),
+):
+    if date_range is not None:
+        rows = await service.get_distribution_range(field, *date_range, buckets)
+    else:
+        rows = await service.get_distribution(field, days=days, buckets=buckets)
+    return DistributionResponse(field=field, buckets=rows)
+
+
+@router.get("/exercises", response_model=list[ExerciseRecordResponse])
+async def list_exercise_records(
     service: MetricsService = Depends(get_metrics_service),
-) -> list:
-    rows = await service.get_workout_timeline(days=days)
-    return rows
+):
+    return await service.list_exercise_records()
+
+
+@router.get("/exercises/{name}", response_model=ExerciseRecordResponse)
+async def get_exercise_record(
+    name: str = Path(..., min_length=1, max_length=100),
+    service: MetricsService = Depends(get_metrics_service),
+):
+    record = await service.get_exercise_record(name)
+    if record is None:
+        raise ExerciseNotFoundException(name)
+    return record
@@ -1,10 +1,42 @@
-from fastapi import APIRouter, Depends, Query, Path
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Query,
+    Path,
+    Response,
+    UploadFile,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import (
+    conditional_get,
+    get_current_user,
+    get_idempotent_request,
+    get_read_session,
+)
+from app.api.responses import orjson_response
 from app.db.models.users import Users
 from app.db.session import get_session
-from app.schemas.workout import WorkoutCreate, WorkoutOut, MetricsOut
+from app.schemas.workout import (
+    ImportReport,
+    MetricsOut,
+    WorkoutCreate,
+    WorkoutOut,
+    WorkoutSessionCreate,
+    WorkoutSessionOut,
+    WorkoutUpdate,
+)
+from app.services.idempotency import IdempotentRequest
+from app.services.workout_import import (
+    ImportFormat,
+    detect_format,
+    parse_rows,
+    read_chunks,
+)
 from app.services.workout_service import WorkoutService
 
 router = APIRouter(prefix="/workouts", tags=["workouts"])
@@ -15,17 +47,90 @@ async def create_workout(
     payload: WorkoutCreate,
     current_user: Users = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request),
+):
+    if idempotency.replayed:
+        return idempotency.body
+    service = WorkoutService(session=session, user_id=current_user.id)
+    workout = WorkoutOut.model_validate(
+        await service.create_workout(payload), from_attributes=True
+    )
+    idempotency.save(session, workout)
+    return workout
+
+
+@router.post("/sessions", response_model=WorkoutSessionOut)
+async def create_workout_session(
+    payload: WorkoutSessionCreate,
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request),
+):
+    if idempotency.replayed:
+        return idempotency.body
+    service = WorkoutService(session=session, user_id=current_user.id)
+    row = await service.create_session(payload)
+    idempotency.save(session, row)
+    return row
+
+
+@router.patch("/{workout_id}", response_model=WorkoutOut)
+async def update_workout(
+    payload: WorkoutUpdate,
+    workout_id: UUID = Path(...),
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request),
 ):
+    if idempotency.replayed:
+        return idempotency.body
     service = WorkoutService(session=session, user_id=current_user.id)
-    return await service.create_workout(payload)
+    row = await service.update_workout(workout_id, payload)
+    idempotency.save(session, row)
+    return row
 
 
-@router.get("/", response_model=list[WorkoutOut])
+@router.delete("/{workout_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_workout(
+    workout_id: UUID = Path(...),
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    idempotency: IdempotentRequest = Depends(get_idempotent_request),
+):
+    if not idempotency.replayed:
+        service = WorkoutService(session=session, user_id=current_user.id)
+        await service.delete_workout(workout_id)
+        idempotency.save(session)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_workouts(
+    file: UploadFile = File(...),
+    fmt: ImportFormat | None = Query(None, alias="format"),
+    current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    service = WorkoutService(session=session, user_id=current_user.id)
+    rows = parse_rows(
+        read_chunks(file),
+        fmt or detect_format(file.filename, file.content_type),
+    )
+    return await service.import_workouts(rows)
+
+
+@router.get(
+    "/",
+    response_model=list[WorkoutOut],
+    dependencies=[Depends(conditional_get)],
+)
 async def list_workouts(
+    response: Response,
     limit: int = Query(10, ge=0),
     offset: int = Query(0, ge=0),
     current_user: Users = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     service = WorkoutService(session=session, user_id=current_user.id)
-    return await service.list_workouts(limit, offset)
+    rows = await service.list_workouts(limit, offset)
+    return orjson_response(rows, response)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import inspect
 import json
 import logging
 from contextlib import asynccontextmanager
+from datetime import date
 from functools import wraps
 from typing import Any, Callable, Optional
 
@@ -14,6 +16,12 @@ logger = logging.getLogger(__name__)
 # logger.setLevel(logging.INFO)
 
 
+def _json_default(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
 class CacheManager:
     __slots__ = ("_redis", "_default_ttl", "_prefix", "_redis_url")
 
@@ -83,13 +91,201 @@ class CacheManager:
 
         try:
             if isinstance(value, (dict, list)):
-                value = json.dumps(value, ensure_ascii=False)
+                value = json.dumps(value, ensure_ascii=False, default=_json_default)
             await self._redis.setex(full_key, ttl, value)
             return True
         except Exception as exc:
             logger.error("Cache SET error for %s: %s", full_key, exc)
             return False
 
+    async def add(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """SET NX: записать значение, только если ключа ещё нет."""
+        if not self._redis:
+            return False
+
+        full_key = self._make_key(key)
+        try:
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, ensure_ascii=False, default=_json_default)
+            created = await self._redis.set(
+                full_key, value, ex=ttl or self._default_ttl, nx=True
+            )
+            return bool(created)
+        except Exception as exc:
+            logger.error("Cache ADD error for %s: %s", full_key, exc)
+            return False
+
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Несколько значений одним MGET; промахи и ошибки — None."""
+        if not self._redis or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = await self._redis.mget([self._make_key(key) for key in keys])
+        except Exception as exc:
+            logger.error("Cache MGET error: %s", exc)
+            return [None] * len(keys)
+
+        result: list[Optional[Any]] = []
+        for value in values:
+            try:
+                result.append(None if value is None else json.loads(value))
+            except (json.JSONDecodeError, TypeError):
+                result.append(value)
+        return result
+
+    async def set_many(self, items: dict[str, tuple[Any, Optional[int]]]) -> bool:
+        """Несколько значений одним pipeline: ``{key: (value, ttl)}``."""
+        if not self._redis or not items:
+            return False
+
+        try:
+            pipe: Pipeline = self._redis.pipeline(transaction=False)
+            for key, (value, ttl) in items.items():
+                if isinstance(value, (dict, list)):
+                    value = json.dumps(value, ensure_ascii=False, default=_json_default)
+                pipe.setex(self._make_key(key), ttl or self._default_ttl, value)
+            await pipe.execute()
+            return True
+        except Exception as exc:
+            logger.error("Cache SET_MANY error: %s", exc)
+            return False
+
+    async def fetch_many(self, commands: list[tuple[str, str]]) -> Optional[list[Any]]:
+        """Команды чтения ``(команда, ключ)`` одним pipeline; без Redis — None."""
+        if not self._redis:
+            return None
+
+        try:
+            pipe: Pipeline = self._redis.pipeline(transaction=False)
+            for command, key in commands:
+                getattr(pipe, command)(self._make_key(key))
+            return await pipe.execute()
+        except Exception as exc:
+            logger.error("Cache pipeline read error: %s", exc)
+            return None
+
+    async def run_script(
+        self, script: str, keys: list[str], args: list[Any]
+    ) -> Optional[Any]:
+        """Lua-скрипт (EVALSHA с повтором через EVAL); ошибка — None."""
+        if not self._redis:
+            return None
+
+        try:
+            runner = self._redis.register_script(script)
+            return await runner(keys=[self._make_key(key) for key in keys], args=args)
+        except Exception as exc:
+            logger.error("Cache script error: %s", exc)
+            return None
+
+    async def zincrby(
+        self, increments: dict[str, tuple[float, Optional[int]]], member: str
+    ) -> bool:
+        """ZINCRBY в несколько sorted set одним pipeline: ``{key: (amount, ttl)}``."""
+        if not self._redis or not increments:
+            return False
+
+        try:
+            pipe: Pipeline = self._redis.pipeline(transaction=False)
+            for key, (amount, ttl) in increments.items():
+                full_key = self._make_key(key)
+                pipe.zincrby(full_key, amount, member)
+                if ttl:
+                    pipe.expire(full_key, ttl)
+            await pipe.execute()
+            return True
+        except Exception as exc:
+            logger.error("Cache ZINCRBY error: %s", exc)
+            return False
+
+    async def zadd(
+        self,
+        key: str,
+        scores: dict[str, float],
+        gt: bool = False,
+        ttl: Optional[int] = None,
+    ) -> bool:
+        """ZADD; с ``gt`` счёт участника только растёт (ZADD GT)."""
+        if not self._redis or not scores:
+            return False
+
+        full_key = self._make_key(key)
+        try:
+            pipe: Pipeline = self._redis.pipeline(transaction=False)
+            pipe.zadd(full_key, scores, gt=gt)
+            if ttl:
+                pipe.expire(full_key, ttl)
+            await pipe.execute()
+            return True
+        except Exception as exc:
+            logger.error("Cache ZADD error for %s: %s", full_key, exc)
+            return False
+
+    async def zrem(self, key: str, member: str) -> bool:
+        if not self._redis:
+            return False
+
+        full_key = self._make_key(key)
+        try:
+            return bool(await self._redis.zrem(full_key, member))
+        except Exception as exc:
+            logger.error("Cache ZREM error for %s: %s", full_key, exc)
+            return False
+
+    async def zreplace(
+        self, key: str, scores: dict[str, float], ttl: Optional[int] = None
+    ) -> bool:
+        """Заменить sorted set целиком: запись во временный ключ и RENAME."""
+        if not self._redis:
+            return False
+
+        full_key = self._make_key(key)
+        staging_key = f"{full_key}:staging"
+        try:
+            pipe: Pipeline = self._redis.pipeline(transaction=True)
+            pipe.delete(staging_key)
+            if scores:
+                pipe.zadd(staging_key, scores)
+                if ttl:
+                    pipe.expire(staging_key, ttl)
+                pipe.rename(staging_key, full_key)
+            else:
+                pipe.delete(full_key)
+            await pipe.execute()
+            return True
+        except Exception as exc:
+            logger.error("Cache ZREPLACE error for %s: %s", full_key, exc)
+            return False
+
+    async def ztop(self, key: str, limit: int) -> list[tuple[str, float]]:
+        """Первые ``limit`` участников по убыванию счёта: O(log N + limit)."""
+        if not self._redis:
+            return []
+
+        full_key = self._make_key(key)
+        try:
+            return await self._redis.zrevrange(full_key, 0, limit - 1, withscores=True)
+        except Exception as exc:
+            logger.error("Cache ZREVRANGE error for %s: %s", full_key, exc)
+            return []
+
+    async def zrank(self, key: str, member: str) -> Optional[tuple[int, float]]:
+        """Место (с нуля, по убыванию) и счёт участника; нет в наборе — None."""
+        if not self._redis:
+            return None
+
+        full_key = self._make_key(key)
+        try:
+            pipe: Pipeline = self._redis.pipeline(transaction=False)
+            pipe.zrevrank(full_key, member)
+            pipe.zscore(full_key, member)
+            rank, score = await pipe.execute()
+        except Exception as exc:
+            logger.error("Cache ZREVRANK error for %s: %s", full_key, exc)
+            return None
+        return None if rank is None else (rank, float(score))
+
     async def delete(self, key: str) -> bool:
         if not self._redis:
             return False
@@ -102,6 +298,22 @@ class CacheManager:
             logger.error("Cache DELETE error for %s: %s", full_key, exc)
             return False
 
+    async def scan_keys(self, pattern: str) -> list[str]:
+        """Ключи по шаблону (SCAN), без префикса; при ошибке — пустой список."""
+        if not self._redis:
+            return []
+
+        full_pattern = self._make_key(pattern)
+        prefix_length = len(self._make_key(""))
+        try:
+            return [
+                key[prefix_length:]
+                async for key in self._redis.scan_iter(match=full_pattern, count=100)
+            ]
+        except Exception as exc:
+            logger.error("Cache SCAN error for %s: %s", full_pattern, exc)
+            return []
+
     async def delete_pattern(self, pattern: str) -> int:
         if not self._redis:
             return 0
@@ -148,19 +360,29 @@ cache_manager = CacheManager(
 
 
 def cached(
-    key_pattern: str,
+    key_pattern: str = "",
     ttl: Optional[int] = None,
     key_builder: Optional[Callable[..., str]] = None,
 ):
+    """Кэширование результата корутины.
+
+    В ``key_pattern`` доступны все аргументы функции, включая атрибуты
+    ``self`` (например, ``{self._user_id}``).
+    """
+
     def decorator(func: Callable):
+        signature = inspect.signature(func)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             if key_builder:
                 cache_key = key_builder(*args, **kwargs)
             else:
                 try:
-                    cache_key = key_pattern.format(**kwargs)
-                except KeyError:
+                    bound = signature.bind(*args, **kwargs)
+                    bound.apply_defaults()
+                    cache_key = key_pattern.format(**bound.arguments)
+                except (KeyError, AttributeError, TypeError):
                     logger.warning(
                         "Cannot build cache key from pattern %s", key_pattern
                     )
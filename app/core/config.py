@@ -7,6 +7,23 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     SYNC_DATABASE_URL: str
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    # 0 — без ограничения времени выполнения запроса
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_SLOW_QUERY_MS: int = 500
+    # Совместимость с PgBouncer в режиме transaction pooling;
+    # при DB_POOL_SIZE=0 локальный пул отключается (NullPool)
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Реплики только для чтения, через запятую
+    REPLICA_DATABASE_URLS: str = ""
+    REPLICA_EJECT_SECONDS: int = 30
+    READ_YOUR_WRITES_SECONDS: int = 5
+    REPLICA_STATEMENT_TIMEOUT_MS: int = 0
+
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
@@ -14,11 +31,36 @@ class Settings(BaseSettings):
 
     REDIS_URL: str
     CACHE_TTL_DEFAULT: int
+    # Кэш пользователя для get_current_user, чтобы ответы из кэша не ходили в БД
+    USER_CACHE_TTL: int = 60
+
+    # Сжатие ответов: тела меньше порога (в байтах) отдаются как есть
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Колоночная копия истории активных пользователей в памяти процесса:
+    # сводка, таймлайн и группы мышц считаются без запросов к БД
+    COLUMN_STORE_ENABLED: bool = False
+    COLUMN_STORE_MAX_BYTES: int = 64 * 1024 * 1024
+    COLUMN_STORE_TTL: int = 300
+
+    # Помесячные секции workouts: на сколько месяцев вперёд их создаёт
+    # scripts.create_partitions
+    WORKOUT_PARTITIONS_AHEAD: int = 3
+
+    @property
+    def replica_database_urls(self) -> list[str]:
+        return [
+            url.strip() for url in self.REPLICA_DATABASE_URLS.split(",") if url.strip()
+        ]
 
 
 class TestSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env.test", extra="ignore")
     TEST_DATABASE_URL: str
+    TEST_PGBOUNCER_DATABASE_URL: str | None = None
+    TEST_REDIS_URL: str | None = None
 
 
 settings = Settings()  # type: ignore
@@ -0,0 +1,72 @@
+"""Версия данных пользователя для ETag / условных GET.
+
+Версия — момент первого чтения после последней записи: запись удаляет
+ключ, следующее чтение заново выставляет его (SET NX) текущим временем.
+Так версия не повторяется даже после потери ключа в Redis.
+"""
+
+import logging
+import time
+import zlib
+from uuid import UUID
+
+from app.core.cache import cache_manager
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_TTL = 7 * 24 * 3600
+
+
+def data_version_key(user_id: UUID) -> str:
+    return f"data_version:user:{user_id}"
+
+
+class DataVersionStore:
+    """Версии данных пользователей в Redis.
+
+    Без Redis версии нет (None): версия из памяти одного процесса не видит
+    записей в других, и условные GET и кэши по версии отключаются.
+    """
+
+    __slots__ = ()
+
+    async def get(self, user_id: UUID) -> str | None:
+        """Текущая версия; обычно один GET в Redis."""
+        key = data_version_key(user_id)
+        version = await cache_manager.get(key)
+        if version is None:
+            seed = str(time.time_ns())
+            if await cache_manager.add(key, seed, ttl=DATA_VERSION_TTL):
+                version = seed
+            else:
+                version = await cache_manager.get(key)
+        return None if version is None else str(version)
+
+    async def bump(self, user_id: UUID) -> None:
+        """Сменить версию после записи данных пользователя."""
+        await cache_manager.delete(data_version_key(user_id))
+
+
+data_versions = DataVersionStore()
+
+
+def build_etag(version: str, resource: str) -> str:
+    """Слабый ETag: версия данных + отпечаток ресурса (URL с параметрами).
+
+    В ресурс входит и текущая дата: окна «последние N дней» и текущая
+    серия меняются в полночь без записи.
+    """
+    return f'W/"{version}-{zlib.crc32(resource.encode()):08x}"'
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """Проверка If-None-Match по слабому сравнению (RFC 9110, 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
@@ -10,3 +10,59 @@ class CreditionalsException(HTTPException):
             detail="Wrong cridentionals",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+class NotModifiedException(HTTPException):
+    def __init__(self, headers: dict[str, str]):
+        super().__init__(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+class InvalidDateRangeException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail,
+        )
+
+
+class ExerciseNotFoundException(HTTPException):
+    def __init__(self, name: str):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No records for exercise '{name}'",
+        )
+
+
+class AthleteAccessDeniedException(HTTPException):
+    def __init__(self, user_ids: list):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "message": "No access to metrics of these users",
+                "user_ids": [str(user_id) for user_id in user_ids],
+            },
+        )
+
+
+class WorkoutNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Workout not found",
+        )
+
+
+class IdempotencyKeyInProgressException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress",
+        )
+
+
+class IdempotencyKeyReusedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request",
+        )
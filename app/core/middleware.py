@@ -2,11 +2,21 @@ from collections.abc import Callable
 from typing import Awaitable
 
 from fastapi import Request, Response
+import gzip
 import time
 import logging
 
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него остаётся gzip
+    brotli = None
+
 logger = logging.getLogger("fitmetrics")
 
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
 
 async def logging_middleware(
     request: Request, call_next: Callable[[Request], Awaitable[Response]]
@@ -24,3 +34,74 @@ async def logging_middleware(
         process_ms,
     )
     return response
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Выбор кодировки по Accept-Encoding с учётом q; br предпочтительнее gzip."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+
+    supported = ("br", "gzip") if brotli is not None else ("gzip",)
+    candidates = [
+        (weights.get(name, weights.get("*", 0.0)), -index, name)
+        for index, name in enumerate(supported)
+    ]
+    q, _, name = max(candidates)
+    return name if q > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+async def compression_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    accept_encoding = request.headers.get("accept-encoding", "")
+    response = await call_next(request)
+
+    content_type = response.headers.get("content-type", "")
+    if (
+        not accept_encoding
+        or "content-encoding" in response.headers
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or not content_type.startswith(COMPRESSIBLE_TYPES)
+    ):
+        return response
+
+    content_length = response.headers.get("content-length")
+    if (
+        content_length is not None
+        and int(content_length) < settings.COMPRESSION_MIN_SIZE
+    ):
+        return response
+
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    if len(body) >= settings.COMPRESSION_MIN_SIZE:
+        body = compress(body, encoding)
+        response.headers["content-encoding"] = encoding
+    response.headers["content-length"] = str(len(body))
+    vary = response.headers.get("vary")
+    response.headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+    response.body_iterator = _iterate_body(body)
+    return response
+
+
+async def _iterate_body(body: bytes):
+    yield body
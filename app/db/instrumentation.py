@@ -0,0 +1,191 @@
+"""Метрики пула соединений и запросов, собираемые из событий SQLAlchemy."""
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class EngineStats:
+    """Накопительные счётчики одного engine: пул и выполненные запросы."""
+
+    __slots__ = (
+        "name",
+        "slow_query_ms",
+        "checkouts",
+        "checkins",
+        "connects",
+        "invalidations",
+        "timeouts",
+        "wait_total_ms",
+        "wait_max_ms",
+        "in_use",
+        "peak_in_use",
+        "peak_overflow",
+        "queries",
+        "query_total_ms",
+        "query_max_ms",
+        "slow_queries",
+    )
+
+    def __init__(self, name: str, slow_query_ms: int = 0) -> None:
+        self.name = name
+        self.slow_query_ms = slow_query_ms
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.peak_overflow = 0
+        self.queries = 0
+        self.query_total_ms = 0.0
+        self.query_max_ms = 0.0
+        self.slow_queries = 0
+
+    def record_wait(self, wait_ms: float) -> None:
+        self.wait_total_ms += wait_ms
+        self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def record_query(self, duration_ms: float, statement: str) -> None:
+        self.queries += 1
+        self.query_total_ms += duration_ms
+        self.query_max_ms = max(self.query_max_ms, duration_ms)
+        if self.slow_query_ms and duration_ms >= self.slow_query_ms:
+            self.slow_queries += 1
+            logger.warning(
+                "Slow query on %s (%.2f ms): %s",
+                self.name,
+                duration_ms,
+                statement[:200],
+            )
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "engine": self.name,
+            "pool": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "wait_avg_ms": (
+                round(self.wait_total_ms / self.checkouts, 3) if self.checkouts else 0.0
+            ),
+            "wait_max_ms": round(self.wait_max_ms, 3),
+            "queries": self.queries,
+            "query_avg_ms": (
+                round(self.query_total_ms / self.queries, 3) if self.queries else 0.0
+            ),
+            "query_max_ms": round(self.query_max_ms, 3),
+            "slow_queries": self.slow_queries,
+        }
+        if isinstance(pool, QueuePool):
+            data.update(
+                size=pool.size(),
+                in_use=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                peak_overflow=self.peak_overflow,
+            )
+        return data
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Очередь соединений, замеряющая ожидание выдачи соединения."""
+
+    stats: EngineStats | None = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.stats is not None:
+                self.stats.timeouts += 1
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait((time.perf_counter() - start) * 1000)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+engine_stats: dict[str, tuple[AsyncEngine, EngineStats]] = {}
+
+
+def instrument_engine(
+    engine: AsyncEngine,
+    name: str,
+    slow_query_ms: int = 0,
+) -> EngineStats:
+    """Подписать счётчики на события пула и выполнения запросов engine."""
+    stats = EngineStats(name, slow_query_ms=slow_query_ms)
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.stats = stats
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+        stats.in_use += 1
+        stats.peak_in_use = max(stats.peak_in_use, stats.in_use)
+        current_pool = sync_engine.pool
+        if isinstance(current_pool, QueuePool):
+            stats.peak_overflow = max(stats.peak_overflow, current_pool.overflow())
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        stats.checkins += 1
+        stats.in_use = max(stats.in_use - 1, 0)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        stats.invalidations += 1
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        start = conn.info["query_start_time"].pop()
+        stats.record_query((time.perf_counter() - start) * 1000, statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(context):
+        if context.connection is not None and context.execution_context is not None:
+            starts = context.connection.info.get("query_start_time")
+            if starts:
+                starts.pop()
+
+    engine_stats[name] = (engine, stats)
+    return stats
+
+
+def pool_metrics() -> list[dict[str, Any]]:
+    """Снимок метрик всех инструментированных engine."""
+    return [
+        stats.snapshot(engine.sync_engine.pool)
+        for engine, stats in engine_stats.values()
+    ]
@@ -1,5 +1,17 @@
 from app.db.base import Base
-from app.db.models.workouts import Workout, Exercise
+from app.db.models.workouts import Workout, WorkoutSession, Exercise
 from app.db.models.users import Users
+from app.db.models.records import PersonalRecord
+from app.db.models.streaks import TrainingStreak
+from app.db.models.coaching import CoachAthlete
 
-__all__ = ["Base", "Workout", "Exercise", "Users"]
+__all__ = [
+    "Base",
+    "Workout",
+    "WorkoutSession",
+    "Exercise",
+    "Users",
+    "PersonalRecord",
+    "TrainingStreak",
+    "CoachAthlete",
+]
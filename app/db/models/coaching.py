@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CoachAthlete(Base):
+    """Связь тренер–спортсмен: тренер видит метрики спортсмена."""
+
+    __tablename__ = "coach_athletes"
+    __table_args__ = (
+        UniqueConstraint(
+            "coach_id", "athlete_id", name="uq_coach_athletes_coach_athlete"
+        ),
+    )
+
+    coach_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    athlete_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.base import Base
+
+
+class PersonalRecord(Base):
+    """Личные рекорды пользователя по упражнению, обновляются при записи."""
+
+    __tablename__ = "personal_records"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "exercise_id", name="uq_personal_records_user_exercise"
+        ),
+    )
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    exercise_id: Mapped[UUID] = mapped_column(
+        ForeignKey("exercises.id", ondelete="CASCADE")
+    )
+
+    best_weight: Mapped[float]
+    best_e1rm: Mapped[float]
+    best_volume: Mapped[float]
+    workouts_count: Mapped[int]
+    last_performed_at: Mapped[datetime]
+
+    exercise: Mapped["Exercise"] = relationship()
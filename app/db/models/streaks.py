@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TrainingStreak(Base):
+    """Серии тренировочных дней пользователя; одна строка на пользователя.
+
+    Значения отсчитываются от ``last_training_day``: актуальность серии
+    и недельных счётчиков на сегодня определяется при чтении.
+    """
+
+    __tablename__ = "training_streaks"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), unique=True
+    )
+
+    first_training_day: Mapped[date]
+    last_training_day: Mapped[date]
+    current_streak: Mapped[int]
+    longest_streak: Mapped[int]
+    total_days: Mapped[int]
+    # Понедельник недели last_training_day и дни с тренировками в ней и в прошлой
+    week_start: Mapped[date]
+    week_days: Mapped[int]
+    previous_week_days: Mapped[int]
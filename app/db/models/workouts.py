@@ -3,10 +3,11 @@ from __future__ import annotations
 from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, PrimaryKeyConstraint, Text, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.partitions import create_default_partition, create_partition_function
 
 
 class Exercise(Base):
@@ -18,11 +19,48 @@ class Exercise(Base):
     workouts: Mapped[list["Workout"]] = relationship(back_populates="exercise")
 
 
+class WorkoutSession(Base):
+    """Тренировочная сессия: подходы — дочерние строки ``workouts``.
+
+    Агрегаты по подходам хранятся в самой сессии, поэтому число сессий
+    за период — COUNT по индексу (user_id, started_at).
+    """
+
+    __tablename__ = "workout_sessions"
+    __table_args__ = (
+        Index("ix_workout_sessions_user_id_started_at", "user_id", "started_at"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    started_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    ended_at: Mapped[datetime | None]
+    notes: Mapped[str | None] = mapped_column(Text)
+
+    exercises_count: Mapped[int] = mapped_column(default=0)
+    sets_count: Mapped[int] = mapped_column(default=0)
+    total_volume: Mapped[float] = mapped_column(default=0.0)
+
+    workouts: Mapped[list["Workout"]] = relationship(back_populates="session")
+
+
 class Workout(Base):
+    """Подход; таблица секционирована по месяцам ``performed_at`` (app.db.partitions).
+
+    Ключ секционирования входит в первичный ключ (id, performed_at).
+    """
+
     __tablename__ = "workouts"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "performed_at", name="workouts_pkey"),
+        Index("ix_workouts_user_id_performed_at", "user_id", "performed_at"),
+        {"postgresql_partition_by": "RANGE (performed_at)"},
+    )
 
-    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"), index=True)
-    performed_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    user_id: Mapped[UUID] = mapped_column(ForeignKey("users.id"))
+    performed_at: Mapped[datetime] = mapped_column(
+        primary_key=True, server_default=func.now()
+    )
 
     sets: Mapped[int]
     reps: Mapped[int]
@@ -30,6 +68,15 @@ class Workout(Base):
     total_volume: Mapped[float]
 
     exercise_id: Mapped[UUID] = mapped_column(ForeignKey("exercises.id"))
+    # Подход, записанный вне сессии (POST /workouts), — без session_id
+    session_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("workout_sessions.id", ondelete="CASCADE"), index=True
+    )
 
     exercise: Mapped["Exercise"] = relationship(back_populates="workouts")
     user: Mapped["Users"] = relationship(back_populates="workouts")
+    session: Mapped["WorkoutSession | None"] = relationship(back_populates="workouts")
+
+
+event.listen(Workout.__table__, "after_create", create_default_partition)
+event.listen(Workout.__table__, "after_create", create_partition_function)
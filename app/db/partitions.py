@@ -0,0 +1,55 @@
+"""Помесячные секции таблицы ``workouts``.
+
+``workouts`` секционирована по диапазону ``performed_at``: одна секция
+``workouts_YYYY_MM`` на календарный месяц и секция по умолчанию для
+месяцев, которые ещё не созданы (например, импорт за давние годы).
+Индексы объявлены на родительской таблице, поэтому у каждой секции
+свои индексы, и при подключении новой секции они строятся автоматически.
+
+Секции создаются заранее задачей ``python -m scripts.create_partitions``;
+она же переносит строки из секции по умолчанию в секции их месяцев.
+"""
+
+from sqlalchemy import DDL
+
+DEFAULT_PARTITION = "workouts_default"
+
+# Создать (или вернуть существующую) секцию месяца ``month``. Строки этого
+# месяца из секции по умолчанию переносятся в новую до ATTACH: иначе
+# подключение секции завершилось бы ошибкой.
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_workouts_partition(month date)
+RETURNS text AS $$
+DECLARE
+    start_at timestamp := date_trunc('month', month::timestamp);
+    end_at timestamp := start_at + interval '1 month';
+    partition_name text := 'workouts_' || to_char(start_at, 'YYYY_MM');
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext(partition_name));
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE workouts INCLUDING DEFAULTS)', partition_name
+    );
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM workouts_default'
+        ' WHERE performed_at >= %L AND performed_at < %L RETURNING *)'
+        ' INSERT INTO %I SELECT * FROM moved',
+        start_at, end_at, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE workouts ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_at, end_at
+    );
+    RETURN partition_name;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# Для Base.metadata.create_all (тесты, пустая БД без миграций)
+create_default_partition = DDL(
+    f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF workouts DEFAULT"
+)
+# DDL подставляет контекст через %, поэтому % в format() экранируются
+create_partition_function = DDL(CREATE_PARTITION_FUNCTION.replace("%", "%%"))
@@ -1,25 +1,259 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+
+from app.core.cache import cache_manager
 from app.core.config import settings
+from app.db.instrumentation import InstrumentedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+def _pgbouncer_name_func() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def build_engine(
+    url: str,
+    name: str,
+    statement_timeout_ms: int = 0,
+    pgbouncer_mode: bool | None = None,
+) -> AsyncEngine:
+    """Engine с настраиваемым пулом и счётчиками пула/запросов.
+
+    В режиме PgBouncer (transaction pooling) кэш prepared statements asyncpg
+    отключается, а имена выражений делаются уникальными: соседние транзакции
+    клиента могут попасть на разные серверные соединения. statement_timeout
+    в этом режиме выставляется через ``SET LOCAL`` в начале транзакции,
+    так как PgBouncer не пропускает произвольные стартовые параметры.
+    """
+    if pgbouncer_mode is None:
+        pgbouncer_mode = settings.DB_PGBOUNCER_MODE
+
+    connect_args: dict[str, Any] = {}
+    if statement_timeout_ms and not pgbouncer_mode:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(statement_timeout_ms)
+        }
+
+    pool_args: dict[str, Any] = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+    if pgbouncer_mode:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=_pgbouncer_name_func,
+        )
+        if settings.DB_POOL_SIZE == 0:
+            pool_args = {"poolclass": NullPool}
 
-engine = create_async_engine(
+    new_engine = create_async_engine(
+        url,
+        echo=False,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+        **pool_args,
+    )
+
+    if pgbouncer_mode and statement_timeout_ms:
+
+        @event.listens_for(new_engine.sync_engine, "begin")
+        def set_statement_timeout(conn):
+            conn.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}"
+            )
+
+    instrument_engine(new_engine, name, slow_query_ms=settings.DB_SLOW_QUERY_MS)
+    return new_engine
+
+
+def build_sessionmaker(
+    bind: AsyncEngine,
+    read_only: bool = False,
+) -> async_sessionmaker[AsyncSession]:
+    """Фабрика сессий; ``read_only`` открывает транзакции как READ ONLY."""
+    if read_only:
+        bind = bind.execution_options(postgresql_readonly=True)
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+engine = build_engine(
     settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True,
+    name="primary",
+    statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT_MS,
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
+AsyncSessionLocal = build_sessionmaker(engine)
+ReadOnlySessionLocal = build_sessionmaker(engine, read_only=True)
+
+
+class ReplicaRouter:
+    """Round-robin выбор реплики для чтения с временным исключением упавших.
+
+    Сразу после записи пользователь на короткое окно закрепляется за primary,
+    чтобы видеть собственные изменения (read-your-writes).
+    """
+
+    __slots__ = (
+        "_engines",
+        "_read_engines",
+        "_next",
+        "_ejected_until",
+        "_eject_seconds",
+        "_pin_seconds",
+        "_pinned_until",
+    )
+
+    def __init__(
+        self,
+        urls: list[str],
+        eject_seconds: int,
+        pin_seconds: int,
+        statement_timeout_ms: int = 0,
+    ) -> None:
+        self._engines = [
+            build_engine(url, f"replica-{index}", statement_timeout_ms)
+            for index, url in enumerate(urls)
+        ]
+        self._read_engines = [
+            e.execution_options(postgresql_readonly=True) for e in self._engines
+        ]
+        self._next = 0
+        self._ejected_until = [0.0] * len(self._engines)
+        self._eject_seconds = eject_seconds
+        self._pin_seconds = pin_seconds
+        self._pinned_until: dict[UUID, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._engines)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return list(self._engines)
+
+    def healthy_replicas(self) -> list[int]:
+        """Индексы реплик в порядке round-robin, исключённые пропускаются."""
+        now = time.monotonic()
+        count = len(self._engines)
+        start = self._next
+        self._next = (self._next + 1) % count if count else 0
+        return [
+            index
+            for index in ((start + offset) % count for offset in range(count))
+            if self._ejected_until[index] <= now
+        ]
+
+    def eject(self, index: int) -> None:
+        self._ejected_until[index] = time.monotonic() + self._eject_seconds
+        logger.warning("Replica %s ejected for %s s", index, self._eject_seconds)
+
+    def connect(self, index: int) -> AsyncConnection:
+        """Соединение с репликой для READ ONLY транзакций."""
+        return self._read_engines[index].connect()
+
+    async def pin_to_primary(self, user_id: UUID) -> None:
+        """Закрепить чтения пользователя за primary после записи."""
+        if not self.enabled:
+            return
+        self._pinned_until[user_id] = time.monotonic() + self._pin_seconds
+        await cache_manager.set(
+            f"db:pin:user:{user_id}", "primary", ttl=self._pin_seconds
+        )
+
+    async def is_pinned(self, user_id: UUID) -> bool:
+        until = self._pinned_until.get(user_id)
+        if until is not None:
+            if until > time.monotonic():
+                return True
+            del self._pinned_until[user_id]
+        return await cache_manager.get(f"db:pin:user:{user_id}") is not None
+
+    async def pinned(self, user_ids: list[UUID]) -> set[UUID]:
+        """Пользователи из списка, чьи чтения сейчас закреплены за primary."""
+        if not self.enabled or not user_ids:
+            return set()
+        now = time.monotonic()
+        result = {
+            user_id
+            for user_id in user_ids
+            if self._pinned_until.get(user_id, 0.0) > now
+        }
+        rest = [user_id for user_id in user_ids if user_id not in result]
+        values = await cache_manager.get_many(
+            [f"db:pin:user:{user_id}" for user_id in rest]
+        )
+        result.update(
+            user_id for user_id, value in zip(rest, values) if value is not None
+        )
+        return result
+
+    async def dispose(self) -> None:
+        for replica_engine in self._engines:
+            await replica_engine.dispose()
+
+
+replica_router = ReplicaRouter(
+    settings.replica_database_urls,
+    eject_seconds=settings.REPLICA_EJECT_SECONDS,
+    pin_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    statement_timeout_ms=settings.REPLICA_STATEMENT_TIMEOUT_MS,
 )
 
 
 async def close_engine() -> None:
     await engine.dispose()
+    await replica_router.dispose()
+
+
+_after_commit_tasks: set[asyncio.Task] = set()
+
+
+def after_commit(
+    session: AsyncSession, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """Запустить корутину после успешного коммита текущей транзакции сессии."""
+
+    def on_commit(sync_session) -> None:
+        task = asyncio.get_running_loop().create_task(callback())
+        _after_commit_tasks.add(task)
+        task.add_done_callback(_after_commit_tasks.discard)
+
+    event.listen(session.sync_session, "after_commit", on_commit, once=True)
 
 
 async def get_session():
+    """Сессия на запрос.
+
+    Соединение из пула берётся, а BEGIN отправляется только при первом
+    обращении к БД: запрос, ответ на который пришёл из кэша, пул не трогает.
+    """
     async with AsyncSessionLocal() as session:
         try:
             async with session.begin():
@@ -28,3 +262,39 @@ async def get_session():
         except Exception:
             await session.rollback()
             raise
+
+
+@asynccontextmanager
+async def read_session(use_primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """READ ONLY сессия: реплика по round-robin или primary.
+
+    Соединение с репликой берётся до выдачи сессии (пул проверяет его
+    pre-ping): недоступная реплика исключается на ``REPLICA_EJECT_SECONDS``,
+    и этот же запрос переходит к следующей реплике, а без живых — к primary.
+    Сессия primary ленивая: соединение берётся при первом запросе.
+    """
+    if not use_primary:
+        for index in replica_router.healthy_replicas():
+            try:
+                connection = await replica_router.connect(index)
+            except (DBAPIError, OSError):
+                logger.exception("Replica %s is unavailable", index)
+                replica_router.eject(index)
+                continue
+
+            try:
+                async with AsyncSession(
+                    connection, expire_on_commit=False, autoflush=False
+                ) as session:
+                    yield session
+            except (DBAPIError, OSError) as exc:
+                # Реплика упала посреди запроса: его уже не повторить
+                if getattr(exc, "connection_invalidated", True):
+                    replica_router.eject(index)
+                raise
+            finally:
+                await connection.close()
+            return
+
+    async with ReadOnlySessionLocal() as session:
+        yield session
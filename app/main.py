@@ -3,10 +3,12 @@ from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
+from app.api.responses import FastJSONResponse
 from app.core.cache import cache_manager
-from app.core.middleware import logging_middleware
+from app.core.middleware import compression_middleware, logging_middleware
 from app.api.v1.workouts import router as workout_router
 from app.api.v1.metrics import router as metrics_router
+from app.api.v1.leaderboards import router as leaderboards_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.health import router as health_router
 from app.core.config import settings
@@ -31,7 +33,11 @@ async def lifespan(app: FastAPI):
         await cache_manager.disconnect()
 
 
-app = FastAPI(lifespan=lifespan, title="FitMetrics API")
+app = FastAPI(
+    lifespan=lifespan,
+    title="FitMetrics API",
+    default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,9 +47,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.middleware("http")(compression_middleware)
 app.middleware("http")(logging_middleware)
 
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(workout_router, prefix="/api/v1")
 app.include_router(metrics_router, prefix="/api/v1")
+app.include_router(leaderboards_router, prefix="/api/v1")
 app.include_router(health_router, prefix="/api/v1")
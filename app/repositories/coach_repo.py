@@ -0,0 +1,37 @@
+"""Слой репозитория для связей тренер–спортсмен."""
+
+from collections.abc import Collection
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.coaching import CoachAthlete
+
+
+class CoachRepository:
+    """Репозиторий связей: какие спортсмены доступны тренеру."""
+
+    __slots__ = ("_session",)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def linked_athletes(
+        self, coach_id: UUID, athlete_ids: Collection[UUID]
+    ) -> set[UUID]:
+        """Спортсмены из ``athlete_ids``, привязанные к тренеру."""
+        stmt = select(CoachAthlete.athlete_id).where(
+            CoachAthlete.coach_id == coach_id,
+            CoachAthlete.athlete_id.in_(athlete_ids),
+        )
+        return set((await self._session.scalars(stmt)).all())
+
+    async def link(self, coach_id: UUID, athlete_id: UUID) -> None:
+        stmt = (
+            pg_insert(CoachAthlete)
+            .values(coach_id=coach_id, athlete_id=athlete_id)
+            .on_conflict_do_nothing(constraint="uq_coach_athletes_coach_athlete")
+        )
+        await self._session.execute(stmt)
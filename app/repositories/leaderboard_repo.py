@@ -0,0 +1,71 @@
+"""Слой репозитория для сверки рейтингов с БД."""
+
+from collections.abc import Collection
+from datetime import date, datetime, time
+from uuid import UUID
+
+from sqlalchemy import Date, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.records import PersonalRecord
+from app.db.models.workouts import Exercise, Workout
+from app.repositories.metrics_repo import Granularity
+
+
+class LeaderboardRepository:
+    """Агрегаты, из которых строятся рейтинги; читаются только при сверке."""
+
+    __slots__ = ("_session",)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get_exercise_id(self, name: str) -> UUID | None:
+        stmt = select(Exercise.id).where(Exercise.name == name)
+        return (await self._session.execute(stmt)).scalar_one_or_none()
+
+    async def volume_by_user(self, start: date, end: date) -> dict[UUID, float]:
+        """Объём каждого пользователя за дни [start, end)."""
+        stmt = (
+            select(Workout.user_id, func.sum(Workout.total_volume))
+            .where(Workout.performed_at >= datetime.combine(start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+            .group_by(Workout.user_id)
+        )
+        result = await self._session.execute(stmt)
+        return {user_id: float(volume) for user_id, volume in result}
+
+    async def user_volume_by_period(
+        self, user_id: UUID, granularity: Granularity, since: date
+    ) -> dict[date, float]:
+        """Объём пользователя по неделям/месяцам, начиная с интервала ``since``."""
+        bucket = cast(func.date_trunc(granularity, Workout.performed_at), Date)
+        stmt = (
+            select(bucket, func.sum(Workout.total_volume))
+            .where(Workout.user_id == user_id)
+            .where(Workout.performed_at >= datetime.combine(since, time.min))
+            .group_by(bucket)
+        )
+        result = await self._session.execute(stmt)
+        return {start: float(volume) for start, volume in result}
+
+    async def best_weights(
+        self,
+        exercise_ids: Collection[UUID] | None = None,
+        user_id: UUID | None = None,
+    ) -> dict[UUID, dict[UUID, float]]:
+        """Лучший вес ``{exercise_id: {user_id: weight}}`` из личных рекордов."""
+        stmt = select(
+            PersonalRecord.exercise_id,
+            PersonalRecord.user_id,
+            PersonalRecord.best_weight,
+        )
+        if exercise_ids is not None:
+            stmt = stmt.where(PersonalRecord.exercise_id.in_(exercise_ids))
+        if user_id is not None:
+            stmt = stmt.where(PersonalRecord.user_id == user_id)
+
+        result: dict[UUID, dict[UUID, float]] = {}
+        for exercise_id, record_user_id, weight in await self._session.execute(stmt):
+            result.setdefault(exercise_id, {})[record_user_id] = weight
+        return result
@@ -1,13 +1,28 @@
 from __future__ import annotations
 from uuid import UUID
 
-from datetime import datetime, timedelta
-from typing import TypedDict, Sequence
+from datetime import date, datetime, time, timedelta
+from typing import Literal, TypedDict, Sequence
 
-from sqlalchemy import Select, func, select, cast, Date
+from sqlalchemy import (
+    Date,
+    Float,
+    Integer,
+    Select,
+    TableValuedAlias,
+    Uuid,
+    any_,
+    case,
+    cast,
+    func,
+    literal,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, INTERVAL, aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models.workouts import Workout
+from app.db.models.workouts import Exercise, Workout, WorkoutSession
 
 
 class MetricsSummaryRow(TypedDict):
@@ -16,75 +31,517 @@ class MetricsSummaryRow(TypedDict):
     workouts_count: int
 
 
+Granularity = Literal["day", "week", "month"]
+
+
+class TimelinePoint(TypedDict):
+    date: date
+    workouts_count: int
+    total_sets: int
+    total_volume: float
+    avg_weight: float | None
+
+
+class TimelineColumns(TypedDict):
+    """Таймлайн по колонкам; dates — номер дня от 1970-01-01."""
+
+    dates: list[int]
+    workouts_count: list[int]
+    total_sets: list[int]
+    total_volume: list[float]
+    avg_weight: list[float | None]
+
+
+class SummaryComparisonRow(TypedDict):
+    current: MetricsSummaryRow
+    previous: MetricsSummaryRow
+
+
+class MuscleGroupRow(TypedDict):
+    muscle_group: str
+    total_volume: float
+    total_sets: int
+    workouts_count: int
+    share: float
+
+
+class WorkoutColumnsRow(TypedDict):
+    """Все тренировки пользователя колонками в порядке performed_at.
+
+    exercise / muscle_group — индексы в exercise_ids / muscle_groups.
+    """
+
+    days: list[int]
+    exercise: list[int]
+    muscle_group: list[int]
+    sets: list[int]
+    reps: list[int]
+    weight: list[float]
+    volume: list[float]
+    exercise_ids: list[UUID]
+    muscle_groups: list[str]
+
+
+class DailyCountersRow(TypedDict):
+    """Дневные счётчики для горячего хранилища (см. live_counters)."""
+
+    total_sets: int
+    total_volume: float
+    weight_sum: float
+    exercise_ids: list[UUID]
+    workout_ids: list[UUID]
+
+
+DistributionField = Literal["reps", "weight", "volume"]
+
+
+class DistributionBucketRow(TypedDict):
+    lower: float
+    upper: float | None
+    workouts_count: int
+    total_sets: int
+    total_volume: float
+
+
+EPOCH = date(1970, 1, 1)
+
+_DISTRIBUTION_COLUMNS = {
+    "reps": Workout.reps,
+    "weight": Workout.weight,
+    "volume": Workout.total_volume,
+}
+
+
 class MetricsRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
-    async def get_summary(self, user_id: UUID, days: int) -> MetricsSummaryRow:
-        """Сводка метрик для конкретного пользователя."""
-        date_from = datetime.now() - timedelta(days=days)
+    async def count_sessions(self, user_id: UUID, start: date, end: date) -> int:
+        """Число сессий, начатых в дни [start, end): COUNT по индексу сессий."""
+        stmt = select(func.count()).where(
+            WorkoutSession.user_id == user_id,
+            WorkoutSession.started_at >= datetime.combine(start, time.min),
+            WorkoutSession.started_at < datetime.combine(end, time.min),
+        )
+        return (await self._session.execute(stmt)).scalar_one()
 
-        stmt: Select = select(
-            func.coalesce(func.sum(Workout.total_volume), 0).label("total_volume"),
-            func.coalesce(func.avg(Workout.total_volume), 0).label("avg_volume"),
-            func.count(Workout.id).label("workouts_count"),
-        ).where(Workout.user_id == user_id, Workout.performed_at >= date_from)
+    async def count_sessions_comparison(
+        self, user_id: UUID, start: date, end: date
+    ) -> tuple[int, int]:
+        """Число сессий в [start, end) и в таком же окне перед ним за один проход."""
+        previous_start = start - (end - start)
+        boundary = datetime.combine(start, time.min)
+        stmt = select(
+            func.count().filter(WorkoutSession.started_at >= boundary),
+            func.count().filter(WorkoutSession.started_at < boundary),
+        ).where(
+            WorkoutSession.user_id == user_id,
+            WorkoutSession.started_at >= datetime.combine(previous_start, time.min),
+            WorkoutSession.started_at < datetime.combine(end, time.min),
+        )
+        current, previous = (await self._session.execute(stmt)).one()
+        return current, previous
 
-        result = await self._session.execute(stmt)
-        row = result.one()
+    async def get_summary_comparison(
+        self,
+        user_id: UUID,
+        start: date,
+        end: date,
+    ) -> SummaryComparisonRow:
+        """Сводка за дни [start, end) и за такое же окно перед ним.
+
+        Оба окна считаются за один проход по индексу (user_id, performed_at)
+        агрегатами с FILTER (WHERE ...).
+        """
+        previous_start = start - (end - start)
+        boundary = datetime.combine(start, time.min)
+        is_current = Workout.performed_at >= boundary
+        is_previous = Workout.performed_at < boundary
+
+        stmt = (
+            select(
+                func.coalesce(func.sum(Workout.total_volume).filter(is_current), 0),
+                func.count(Workout.id).filter(is_current),
+                func.coalesce(func.sum(Workout.total_volume).filter(is_previous), 0),
+                func.count(Workout.id).filter(is_previous),
+            )
+            .where(Workout.user_id == user_id)
+            .where(Workout.performed_at >= datetime.combine(previous_start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+        )
+        row = (await self._session.execute(stmt)).one()
+
+        def summary(total_volume: float, count: int) -> MetricsSummaryRow:
+            return MetricsSummaryRow(
+                total_volume=float(total_volume),
+                avg_volume=float(total_volume) / count if count else 0.0,
+                workouts_count=count,
+            )
 
-        return MetricsSummaryRow(
-            total_volume=row.total_volume,
-            avg_volume=row.avg_volume,
-            workouts_count=row.workouts_count,
+        return SummaryComparisonRow(
+            current=summary(row[0], row[1]),
+            previous=summary(row[2], row[3]),
         )
 
-    async def get_workout_timeline(
+    async def get_summaries(
         self,
-        user_id: UUID,
-        days: int,
-    ):
-        """Сводка метрик для таймлайна тренировок"""
-        start_date = datetime.now() - timedelta(days=days)
+        user_ids: Sequence[UUID],
+        start: date,
+        end: date,
+    ) -> dict[UUID, MetricsSummaryRow]:
+        """Сводки за дни [start, end) для нескольких пользователей.
+
+        Один GROUP BY user_id с ``user_id = ANY(:ids)``: план — один проход
+        по индексу (user_id, performed_at) для всего списка. Пользователи
+        без тренировок в окне получают нулевую сводку.
+        """
+        stmt = (
+            select(
+                Workout.user_id,
+                func.sum(Workout.total_volume).label("total_volume"),
+                func.avg(Workout.total_volume).label("avg_volume"),
+                func.count(Workout.id).label("workouts_count"),
+            )
+            .where(Workout.user_id == any_(literal(list(user_ids), ARRAY(Uuid))))
+            .where(Workout.performed_at >= datetime.combine(start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+            .group_by(Workout.user_id)
+        )
+        summaries = {
+            user_id: MetricsSummaryRow(
+                total_volume=0.0, avg_volume=0.0, workouts_count=0
+            )
+            for user_id in user_ids
+        }
+        for row in await self._session.execute(stmt):
+            summaries[row.user_id] = MetricsSummaryRow(
+                total_volume=float(row.total_volume),
+                avg_volume=float(row.avg_volume),
+                workouts_count=row.workouts_count,
+            )
+        return summaries
 
+    async def get_daily_counters(
+        self,
+        user_id: UUID,
+        start: date,
+        end: date,
+    ) -> dict[date, DailyCountersRow]:
+        """Счётчики каждого дня с тренировками в [start, end)."""
+        day = cast(Workout.performed_at, Date)
         stmt = (
             select(
-                cast(Workout.performed_at, Date).label("date"),
+                day.label("day"),
+                func.count(Workout.id).label("total_sets"),
+                func.sum(Workout.total_volume).label("total_volume"),
+                func.sum(Workout.weight).label("weight_sum"),
+                func.array_agg(func.distinct(Workout.exercise_id)).label(
+                    "exercise_ids"
+                ),
+                func.array_agg(Workout.id).label("workout_ids"),
+            )
+            .where(Workout.user_id == user_id)
+            .where(Workout.performed_at >= datetime.combine(start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+            .group_by(day)
+        )
+        return {
+            row.day: DailyCountersRow(
+                total_sets=row.total_sets,
+                total_volume=float(row.total_volume),
+                weight_sum=float(row.weight_sum),
+                exercise_ids=list(row.exercise_ids),
+                workout_ids=list(row.workout_ids),
+            )
+            for row in await self._session.execute(stmt)
+        }
+
+    def _timeline_select(
+        self,
+        user_id: UUID,
+        start: date,
+        end: date,
+        granularity: Granularity,
+    ) -> tuple[Select, TableValuedAlias]:
+        """Интервалы (день/неделя/месяц) без пропусков и агрегаты по ним.
+
+        Берутся тренировки с performed_at в [start, end); интервалы строятся
+        generate_series от date_trunc(start) до интервала последнего дня окна,
+        пустые интервалы остаются с NULL в агрегатах.
+        """
+        bucket = cast(func.date_trunc(granularity, Workout.performed_at), Date)
+        aggregates = (
+            select(
+                bucket.label("bucket"),
                 func.count(Workout.id).label("total_sets"),
                 func.count(func.distinct(Workout.exercise_id)).label("workouts_count"),
                 func.sum(Workout.total_volume).label("total_volume"),
                 func.avg(Workout.weight).label("avg_weight"),
             )
             .where(Workout.user_id == user_id)
-            .where(Workout.performed_at >= start_date)
-            .group_by(cast(Workout.performed_at, Date))
-            .order_by(cast(Workout.performed_at, Date))
+            .where(Workout.performed_at >= datetime.combine(start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+            .group_by(bucket)
+            .subquery()
         )
+        series = (
+            func.generate_series(
+                func.date_trunc(granularity, literal(start, Date)),
+                func.date_trunc(granularity, literal(end - timedelta(days=1), Date)),
+                cast(literal(f"1 {granularity}"), INTERVAL),
+            )
+            .table_valued("bucket")
+            .render_derived(name="series")
+        )
+        series_date = cast(series.c.bucket, Date)
+        stmt = select(
+            series_date,
+            func.coalesce(aggregates.c.workouts_count, 0),
+            func.coalesce(aggregates.c.total_sets, 0),
+            func.coalesce(aggregates.c.total_volume, 0.0),
+            aggregates.c.avg_weight,
+        ).select_from(series.outerjoin(aggregates, aggregates.c.bucket == series_date))
+        return stmt, series
 
+    async def get_timeline_window(
+        self,
+        user_id: UUID,
+        start: date,
+        end: date,
+        granularity: Granularity = "day",
+    ) -> TimelineColumns:
+        """Таймлайн окна [start, end) массивами.
+
+        Колонки собираются array_agg — в Python приходит одна строка
+        с массивами; dates — начало интервала в днях от 1970-01-01.
+        """
+        stmt, series = self._timeline_select(user_id, start, end, granularity)
+        order = series.c.bucket
+        columns = [
+            func.array_agg(aggregate_order_by(expr, order))
+            for expr in stmt.selected_columns
+        ]
+        columns[0] = func.array_agg(
+            aggregate_order_by(
+                cast(series.c.bucket, Date) - literal(EPOCH, Date), order
+            )
+        )
+
+        row = (await self._session.execute(stmt.with_only_columns(*columns))).one()
+        return TimelineColumns(
+            dates=row[0] or [],
+            workouts_count=row[1] or [],
+            total_sets=row[2] or [],
+            total_volume=row[3] or [],
+            avg_weight=row[4] or [],
+        )
+
+    async def get_muscle_groups(
+        self,
+        user_id: UUID,
+        start: date,
+        end: date,
+    ) -> list[MuscleGroupRow]:
+        """Объём и подходы по группам мышц за дни [start, end) одним запросом.
+
+        Доля считается оконной функцией по тому же результату группировки.
+        """
+        total_volume = func.sum(Workout.total_volume)
+        stmt = (
+            select(
+                Exercise.muscle_group,
+                total_volume,
+                func.sum(Workout.sets),
+                func.count(Workout.id),
+                total_volume / func.nullif(func.sum(total_volume).over(), 0),
+            )
+            .join(Exercise, Exercise.id == Workout.exercise_id)
+            .where(Workout.user_id == user_id)
+            .where(Workout.performed_at >= datetime.combine(start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+            .group_by(Exercise.muscle_group)
+            .order_by(total_volume.desc(), Exercise.muscle_group)
+        )
         result = await self._session.execute(stmt)
-        rows = result.all()
-
-        timeline = {}
-        current = start_date.date()
-        end = datetime.now().date()
-
-        while current <= end:
-            timeline[current] = {
-                "date": current,
-                "workouts_count": 0,
-                "total_sets": 0,
-                "total_volume": 0.0,
-                "avg_weight": None,
-            }
-            current += timedelta(days=1)
+        return [
+            MuscleGroupRow(
+                muscle_group=row[0],
+                total_volume=float(row[1]),
+                total_sets=int(row[2]),
+                workouts_count=row[3],
+                share=float(row[4] or 0.0),
+            )
+            for row in result
+        ]
+
+    async def load_workout_columns(self, user_id: UUID) -> WorkoutColumnsRow:
+        """Вся история пользователя одним запросом: по массиву на колонку.
+
+        Индексы упражнений и групп мышц считает dense_rank, справочники
+        собираются array_agg(DISTINCT ...) в том же порядке.
+        """
+        rows = (
+            select(
+                Workout.performed_at,
+                cast(
+                    cast(Workout.performed_at, Date) - literal(EPOCH, Date), Integer
+                ).label("day"),
+                (func.dense_rank().over(order_by=Workout.exercise_id) - 1).label(
+                    "exercise"
+                ),
+                (func.dense_rank().over(order_by=Exercise.muscle_group) - 1).label(
+                    "muscle_group"
+                ),
+                Workout.exercise_id,
+                Exercise.muscle_group.label("muscle_group_name"),
+                Workout.sets,
+                Workout.reps,
+                Workout.weight,
+                Workout.total_volume,
+            )
+            .join(Exercise, Exercise.id == Workout.exercise_id)
+            .where(Workout.user_id == user_id)
+            .cte("rows")
+        )
+        order = rows.c.performed_at
+        stmt = select(
+            *(
+                func.array_agg(aggregate_order_by(column, order))
+                for column in (
+                    rows.c.day,
+                    rows.c.exercise,
+                    rows.c.muscle_group,
+                    rows.c.sets,
+                    rows.c.reps,
+                    rows.c.weight,
+                    rows.c.total_volume,
+                )
+            ),
+            func.array_agg(
+                aggregate_order_by(rows.c.exercise_id.distinct(), rows.c.exercise_id)
+            ),
+            func.array_agg(
+                aggregate_order_by(
+                    rows.c.muscle_group_name.distinct(), rows.c.muscle_group_name
+                )
+            ),
+        )
+        row = (await self._session.execute(stmt)).one()
+        return WorkoutColumnsRow(
+            days=row[0] or [],
+            exercise=row[1] or [],
+            muscle_group=row[2] or [],
+            sets=row[3] or [],
+            reps=row[4] or [],
+            weight=row[5] or [],
+            volume=row[6] or [],
+            exercise_ids=row[7] or [],
+            muscle_groups=row[8] or [],
+        )
+
+    async def get_distribution(
+        self,
+        user_id: UUID,
+        field: DistributionField,
+        start: date,
+        end: date,
+        buckets: int = 10,
+        edges: Sequence[float] | None = None,
+    ) -> list[DistributionBucketRow]:
+        """Гистограмма поля за дни [start, end) одним запросом с width_bucket.
+
+        Без ``edges`` — ``buckets`` интервалов равной ширины от минимума до
+        максимума окна (максимум попадает в последний интервал). С ``edges`` —
+        интервалы [edges[i], edges[i + 1]), последний открыт сверху.
+        Пустые интервалы возвращаются с нулями.
+        """
+        value = cast(_DISTRIBUTION_COLUMNS[field], Float)
+        window = (
+            select(
+                value.label("value"),
+                Workout.id,
+                Workout.sets,
+                Workout.total_volume,
+            )
+            .where(Workout.user_id == user_id)
+            .where(Workout.performed_at >= datetime.combine(start, time.min))
+            .where(Workout.performed_at < datetime.combine(end, time.min))
+            .cte("window")
+        )
+
+        if edges is not None:
+            bucket_count = len(edges)
+            bucket = func.width_bucket(
+                window.c.value, literal(list(map(float, edges)), ARRAY(Float))
+            )
+            source = window
+        else:
+            bucket_count = buckets
+            bounds = select(
+                func.min(window.c.value).label("low"),
+                func.max(window.c.value).label("high"),
+            ).cte("bounds")
+            # width_bucket не принимает равные границы
+            high = case(
+                (bounds.c.high > bounds.c.low, bounds.c.high),
+                else_=bounds.c.low + 1,
+            )
+            bucket = func.least(
+                func.width_bucket(window.c.value, bounds.c.low, high, buckets), buckets
+            )
+            source = window.join(bounds, true())
 
+        aggregates = (
+            select(
+                bucket.label("bucket"),
+                func.count(window.c.id).label("workouts_count"),
+                func.sum(window.c.sets).label("total_sets"),
+                func.sum(window.c.total_volume).label("total_volume"),
+            )
+            .select_from(source)
+            .group_by(bucket)
+            .subquery()
+        )
+        series = (
+            func.generate_series(1, bucket_count)
+            .table_valued("bucket")
+            .render_derived(name="series")
+        )
+        columns = [
+            series.c.bucket,
+            func.coalesce(aggregates.c.workouts_count, 0),
+            func.coalesce(aggregates.c.total_sets, 0),
+            func.coalesce(aggregates.c.total_volume, 0.0),
+        ]
+        joined = series.outerjoin(aggregates, aggregates.c.bucket == series.c.bucket)
+        if edges is None:
+            width = (high - bounds.c.low) / buckets
+            columns += [
+                bounds.c.low + (series.c.bucket - 1) * width,
+                bounds.c.low + series.c.bucket * width,
+            ]
+            joined = joined.join(bounds, true())
+
+        stmt = select(*columns).select_from(joined).order_by(series.c.bucket)
+        rows = (await self._session.execute(stmt)).all()
+        if not any(row[1] for row in rows):
+            return []
+
+        result = []
         for row in rows:
-            timeline[row.date] = {
-                "date": row.date,
-                "workouts_count": row.workouts_count,
-                "total_sets": row.total_sets,
-                "total_volume": float(row.total_volume or 0),
-                "avg_weight": float(row.avg_weight) if row.avg_weight else None,
-            }
-
-        return list(timeline.values())
+            if edges is not None:
+                index = row[0] - 1
+                lower = float(edges[index])
+                upper = float(edges[index + 1]) if index + 1 < len(edges) else None
+            else:
+                lower, upper = float(row[4]), float(row[5])
+            result.append(
+                DistributionBucketRow(
+                    lower=lower,
+                    upper=upper,
+                    workouts_count=row[1],
+                    total_sets=int(row[2]),
+                    total_volume=float(row[3]),
+                )
+            )
+        return result
@@ -0,0 +1,41 @@
+"""Слой репозитория для помесячных секций ``workouts`` (см. app.db.partitions)."""
+
+from datetime import date
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.partitions import DEFAULT_PARTITION
+
+
+def month_start(day: date, shift: int = 0) -> date:
+    """Первое число месяца ``day``, сдвинутого на ``shift`` месяцев."""
+    months = day.year * 12 + day.month - 1 + shift
+    return date(months // 12, months % 12 + 1, 1)
+
+
+class WorkoutPartitionRepository:
+    __slots__ = ("_session",)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def create_partition(self, month: date) -> str:
+        """Создать секцию месяца, если её нет; возвращает имя секции."""
+        stmt = select(func.create_workouts_partition(month))
+        return (await self._session.execute(stmt)).scalar_one()
+
+    async def list_partitions(self) -> list[str]:
+        stmt = text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits"
+            " WHERE inhparent = 'workouts'::regclass ORDER BY 1"
+        )
+        return list((await self._session.execute(stmt)).scalars())
+
+    async def default_months(self) -> list[date]:
+        """Месяцы, строки которых лежат в секции по умолчанию."""
+        stmt = text(
+            "SELECT DISTINCT date_trunc('month', performed_at)::date"
+            f" FROM {DEFAULT_PARTITION} ORDER BY 1"
+        )
+        return list((await self._session.execute(stmt)).scalars())
@@ -0,0 +1,291 @@
+"""Слой репозитория для личных рекордов по упражнениям."""
+
+from collections.abc import Collection
+from datetime import datetime
+from typing import TypedDict
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    case,
+    cast,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.records import PersonalRecord
+from app.db.models.workouts import Exercise, Workout
+
+# До 10 повторений — Brzycki, дальше — Epley: на 10 повторениях формулы
+# совпадают (w * 4/3), а Brzycki на больших повторениях сильно завышает.
+BRZYCKI_MAX_REPS = 10
+
+
+def estimate_1rm(weight: float, reps: int) -> float:
+    """Оценка разового максимума по весу и числу повторений."""
+    if reps <= 1:
+        return weight
+    if reps <= BRZYCKI_MAX_REPS:
+        return weight * 36 / (37 - reps)
+    return weight * (1 + reps / 30)
+
+
+def estimate_1rm_sql(weight: ColumnElement, reps: ColumnElement) -> ColumnElement:
+    """То же, что ``estimate_1rm``, выражением SQL.
+
+    Epley считается в float8 в том же порядке, что и в Python: литерал
+    ``30.0`` в Postgres — NUMERIC, и оценка расходилась бы с Python в
+    последнем бите, а apply_change сравнивает рекорд с оценкой из Python.
+    """
+    return case(
+        (reps <= 1, weight),
+        (reps <= BRZYCKI_MAX_REPS, weight * 36 / (37 - reps)),
+        else_=weight * (1 + cast(reps, Float) / 30.0),
+    )
+
+
+class RecordValues(TypedDict):
+    """Поля тренировки, от которых зависят рекорды."""
+
+    weight: float
+    reps: int
+    total_volume: float
+    performed_at: datetime
+
+
+class PersonalRecordRow(TypedDict):
+    exercise_id: UUID
+    exercise_name: str
+    muscle_group: str
+    best_weight: float
+    best_e1rm: float
+    best_volume: float
+    workouts_count: int
+    last_performed_at: datetime
+
+
+class PersonalRecordRepository:
+    """Репозиторий личных рекордов: одна строка на пару пользователь–упражнение."""
+
+    __slots__ = ("_session",)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def record_workout(
+        self,
+        user_id: UUID,
+        exercise_id: UUID,
+        weight: float,
+        reps: int,
+        total_volume: float,
+    ) -> None:
+        """Учесть новую тренировку одним upsert с GREATEST по каждому рекорду."""
+        table = PersonalRecord.__table__
+        stmt = pg_insert(PersonalRecord).values(
+            user_id=user_id,
+            exercise_id=exercise_id,
+            best_weight=weight,
+            best_e1rm=estimate_1rm(weight, reps),
+            best_volume=total_volume,
+            workouts_count=1,
+            last_performed_at=func.now(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_personal_records_user_exercise",
+            set_={
+                "best_weight": func.greatest(
+                    table.c.best_weight, stmt.excluded.best_weight
+                ),
+                "best_e1rm": func.greatest(table.c.best_e1rm, stmt.excluded.best_e1rm),
+                "best_volume": func.greatest(
+                    table.c.best_volume, stmt.excluded.best_volume
+                ),
+                "workouts_count": table.c.workouts_count + 1,
+                "last_performed_at": func.greatest(
+                    table.c.last_performed_at, stmt.excluded.last_performed_at
+                ),
+            },
+        )
+        await self._session.execute(stmt)
+
+    async def rebuild(
+        self,
+        user_id: UUID,
+        exercise_ids: Collection[UUID] | None = None,
+    ) -> None:
+        """Пересчитать рекорды по истории одним INSERT ... SELECT.
+
+        Используется после пакетного импорта: затронутые упражнения
+        пересчитываются целиком вместо upsert на каждую строку.
+        """
+        source = select(
+            func.gen_random_uuid(),
+            Workout.user_id,
+            Workout.exercise_id,
+            func.max(Workout.weight),
+            func.max(estimate_1rm_sql(Workout.weight, Workout.reps)),
+            func.max(Workout.total_volume),
+            func.count(Workout.id),
+            func.max(Workout.performed_at),
+        ).where(Workout.user_id == user_id)
+        if exercise_ids is not None:
+            if not exercise_ids:
+                return
+            source = source.where(Workout.exercise_id.in_(list(exercise_ids)))
+        source = source.group_by(Workout.user_id, Workout.exercise_id)
+
+        stmt = pg_insert(PersonalRecord).from_select(
+            [
+                "id",
+                "user_id",
+                "exercise_id",
+                "best_weight",
+                "best_e1rm",
+                "best_volume",
+                "workouts_count",
+                "last_performed_at",
+            ],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_personal_records_user_exercise",
+            set_={
+                column: getattr(stmt.excluded, column)
+                for column in (
+                    "best_weight",
+                    "best_e1rm",
+                    "best_volume",
+                    "workouts_count",
+                    "last_performed_at",
+                )
+            },
+        )
+        await self._session.execute(stmt)
+
+    async def apply_change(
+        self,
+        user_id: UUID,
+        exercise_id: UUID,
+        old: RecordValues,
+        new: RecordValues | None,
+    ) -> float | None:
+        """Учесть правку (``new``) или удаление (``new is None``) тренировки.
+
+        Обычно — один UPDATE: GREATEST с новыми значениями и счётчик.
+        Если старая строка держала рекорд, а значение уменьшилось, рекорд
+        не выводится из разности — пересчитывается одна пара
+        пользователь–упражнение. Возвращает лучший вес после изменения;
+        None — тренировок по упражнению не осталось.
+        """
+        where = (
+            PersonalRecord.user_id == user_id,
+            PersonalRecord.exercise_id == exercise_id,
+        )
+        record = (
+            await self._session.execute(
+                select(
+                    PersonalRecord.best_weight,
+                    PersonalRecord.best_e1rm,
+                    PersonalRecord.best_volume,
+                    PersonalRecord.workouts_count,
+                    PersonalRecord.last_performed_at,
+                )
+                .where(*where)
+                .with_for_update()
+            )
+        ).one_or_none()
+
+        if record is not None and new is None and record.workouts_count <= 1:
+            await self._session.execute(delete(PersonalRecord).where(*where))
+            return None
+
+        old_e1rm = estimate_1rm(old["weight"], old["reps"])
+        held = record is not None and (
+            old["weight"] >= record.best_weight
+            or old_e1rm >= record.best_e1rm
+            or old["total_volume"] >= record.best_volume
+            or (new is None and old["performed_at"] >= record.last_performed_at)
+        )
+        lowered = (
+            new is None
+            or new["weight"] < old["weight"]
+            or estimate_1rm(new["weight"], new["reps"]) < old_e1rm
+            or new["total_volume"] < old["total_volume"]
+        )
+        if record is None or (held and lowered):
+            await self.rebuild(user_id, [exercise_id])
+            best = select(PersonalRecord.best_weight).where(*where)
+            return (await self._session.execute(best)).scalar_one_or_none()
+
+        values: dict = {"workouts_count": PersonalRecord.workouts_count}
+        if new is None:
+            values["workouts_count"] = PersonalRecord.workouts_count - 1
+        else:
+            values.update(
+                best_weight=func.greatest(PersonalRecord.best_weight, new["weight"]),
+                best_e1rm=func.greatest(
+                    PersonalRecord.best_e1rm,
+                    estimate_1rm(new["weight"], new["reps"]),
+                ),
+                best_volume=func.greatest(
+                    PersonalRecord.best_volume, new["total_volume"]
+                ),
+            )
+        stmt = (
+            update(PersonalRecord)
+            .where(*where)
+            .values(**values)
+            .returning(PersonalRecord.best_weight)
+        )
+        return (await self._session.execute(stmt)).scalar_one()
+
+    def _records_select(self, user_id: UUID):
+        return (
+            select(
+                PersonalRecord.exercise_id,
+                Exercise.name,
+                Exercise.muscle_group,
+                PersonalRecord.best_weight,
+                PersonalRecord.best_e1rm,
+                PersonalRecord.best_volume,
+                PersonalRecord.workouts_count,
+                PersonalRecord.last_performed_at,
+            )
+            .join(Exercise, Exercise.id == PersonalRecord.exercise_id)
+            .where(PersonalRecord.user_id == user_id)
+        )
+
+    @staticmethod
+    def _to_row(row) -> PersonalRecordRow:
+        return PersonalRecordRow(
+            exercise_id=row[0],
+            exercise_name=row[1],
+            muscle_group=row[2],
+            best_weight=row[3],
+            best_e1rm=row[4],
+            best_volume=row[5],
+            workouts_count=row[6],
+            last_performed_at=row[7],
+        )
+
+    async def list_records(self, user_id: UUID) -> list[PersonalRecordRow]:
+        """Рекорды по всем упражнениям, недавние — первыми."""
+        stmt = self._records_select(user_id).order_by(
+            PersonalRecord.last_performed_at.desc()
+        )
+        result = await self._session.execute(stmt)
+        return [self._to_row(row) for row in result]
+
+    async def get_record(
+        self, user_id: UUID, exercise_name: str
+    ) -> PersonalRecordRow | None:
+        """Рекорды по одному упражнению или None."""
+        stmt = self._records_select(user_id).where(Exercise.name == exercise_name)
+        row = (await self._session.execute(stmt)).one_or_none()
+        return self._to_row(row) if row is not None else None
@@ -0,0 +1,230 @@
+"""Слой репозитория для серий тренировочных дней."""
+
+from datetime import date, timedelta
+from typing import TypedDict
+from uuid import UUID
+
+from sqlalchemy import (
+    ARRAY,
+    Date,
+    Integer,
+    case,
+    cast,
+    delete,
+    exists,
+    func,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.streaks import TrainingStreak
+from app.db.models.workouts import Workout
+
+STREAK_COLUMNS = (
+    "first_training_day",
+    "last_training_day",
+    "current_streak",
+    "longest_streak",
+    "total_days",
+    "week_start",
+    "week_days",
+    "previous_week_days",
+)
+
+
+class StreakRow(TypedDict):
+    first_training_day: date
+    last_training_day: date
+    current_streak: int
+    longest_streak: int
+    total_days: int
+    week_start: date
+    week_days: int
+    previous_week_days: int
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+class TrainingStreakRepository:
+    """Репозиторий серий: O(1) обновление при записи и полный пересчёт."""
+
+    __slots__ = ("_session",)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, user_id: UUID) -> StreakRow | None:
+        stmt = select(*(getattr(TrainingStreak, c) for c in STREAK_COLUMNS)).where(
+            TrainingStreak.user_id == user_id
+        )
+        row = (await self._session.execute(stmt)).one_or_none()
+        return StreakRow(**row._mapping) if row is not None else None
+
+    async def record_day(self, user_id: UUID, day: date) -> None:
+        """Учесть тренировку в ``day`` одним upsert без чтения истории.
+
+        Рассчитано на дни не раньше последнего учтённого (обычная запись
+        за сегодня); загрузка задним числом пересчитывается через ``rebuild``.
+        """
+        table = TrainingStreak.__table__
+        monday = week_start(day)
+        stmt = pg_insert(TrainingStreak).values(
+            user_id=user_id,
+            first_training_day=day,
+            last_training_day=day,
+            current_streak=1,
+            longest_streak=1,
+            total_days=1,
+            week_start=monday,
+            week_days=1,
+            previous_week_days=0,
+        )
+
+        seen = table.c.last_training_day >= day
+        new_day = case((seen, 0), else_=1)
+        current = case(
+            (seen, table.c.current_streak),
+            (
+                table.c.last_training_day == day - timedelta(days=1),
+                table.c.current_streak + 1,
+            ),
+            else_=1,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TrainingStreak.user_id],
+            set_={
+                "last_training_day": func.greatest(table.c.last_training_day, day),
+                "current_streak": current,
+                "longest_streak": func.greatest(table.c.longest_streak, current),
+                "total_days": table.c.total_days + new_day,
+                "week_start": func.greatest(table.c.week_start, monday),
+                "week_days": case(
+                    (table.c.week_start >= monday, table.c.week_days + new_day),
+                    else_=1,
+                ),
+                "previous_week_days": case(
+                    (table.c.week_start >= monday, table.c.previous_week_days),
+                    (
+                        table.c.week_start == monday - timedelta(days=7),
+                        table.c.week_days,
+                    ),
+                    else_=0,
+                ),
+            },
+        )
+        await self._session.execute(stmt)
+
+    async def rebuild(self, user_id: UUID | None = None) -> None:
+        """Пересчитать серии по истории одним INSERT ... SELECT.
+
+        Непрерывные серии — «острова» дней: у дней одной серии разность
+        day - row_number() одинакова. Без ``user_id`` — для всех пользователей.
+        Строки пользователей, у которых не осталось тренировок, удаляются.
+        """
+        stale = delete(TrainingStreak).where(
+            ~exists().where(Workout.user_id == TrainingStreak.user_id)
+        )
+        if user_id is not None:
+            stale = stale.where(TrainingStreak.user_id == user_id)
+        await self._session.execute(stale)
+
+        day = cast(Workout.performed_at, Date)
+        days = select(Workout.user_id, day.label("day")).distinct()
+        if user_id is not None:
+            days = days.where(Workout.user_id == user_id)
+        days = days.cte("days")
+
+        islands = select(
+            days.c.user_id,
+            days.c.day,
+            (
+                days.c.day
+                - cast(
+                    func.row_number().over(
+                        partition_by=days.c.user_id, order_by=days.c.day
+                    ),
+                    Integer,
+                )
+            ).label("island"),
+        ).cte("islands")
+        runs = (
+            select(
+                islands.c.user_id,
+                func.count().label("length"),
+                func.max(islands.c.day).label("end_day"),
+            )
+            .group_by(islands.c.user_id, islands.c.island)
+            .cte("runs")
+        )
+        streaks = (
+            select(
+                runs.c.user_id,
+                func.max(runs.c.length).label("longest"),
+                type_coerce(
+                    func.array_agg(
+                        aggregate_order_by(runs.c.length, runs.c.end_day.desc())
+                    ),
+                    ARRAY(Integer),
+                )[1].label("current"),
+            )
+            .group_by(runs.c.user_id)
+            .subquery("streaks")
+        )
+
+        last_week = cast(func.date_trunc("week", func.max(days.c.day)), Date)
+        totals = (
+            select(
+                days.c.user_id,
+                func.min(days.c.day).label("first_day"),
+                func.max(days.c.day).label("last_day"),
+                func.count().label("total_days"),
+                last_week.label("week_start"),
+            )
+            .group_by(days.c.user_id)
+            .cte("totals")
+        )
+        weeks = (
+            select(
+                days.c.user_id,
+                func.count()
+                .filter(days.c.day >= totals.c.week_start)
+                .label("week_days"),
+                func.count()
+                .filter(days.c.day < totals.c.week_start)
+                .label("previous_week_days"),
+            )
+            .join(totals, totals.c.user_id == days.c.user_id)
+            .where(days.c.day >= totals.c.week_start - 7)
+            .group_by(days.c.user_id)
+            .subquery("weeks")
+        )
+
+        source = (
+            select(
+                func.gen_random_uuid(),
+                totals.c.user_id,
+                totals.c.first_day,
+                totals.c.last_day,
+                streaks.c.current,
+                streaks.c.longest,
+                totals.c.total_days,
+                totals.c.week_start,
+                weeks.c.week_days,
+                weeks.c.previous_week_days,
+            )
+            .join(streaks, streaks.c.user_id == totals.c.user_id)
+            .join(weeks, weeks.c.user_id == totals.c.user_id)
+        )
+        stmt = pg_insert(TrainingStreak).from_select(
+            ["id", "user_id", *STREAK_COLUMNS], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TrainingStreak.user_id],
+            set_={column: getattr(stmt.excluded, column) for column in STREAK_COLUMNS},
+        )
+        await self._session.execute(stmt)
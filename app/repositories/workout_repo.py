@@ -1,15 +1,25 @@
 """Слой репозитория для доступа к данным тренировок и упражнений."""
 
-from collections.abc import Sequence
-from typing import TypedDict
-from uuid import UUID
+from collections.abc import Collection, Mapping, Sequence
+from datetime import date, datetime, time, timedelta
+from typing import Any, TypedDict
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    case,
+    delete,
+    distinct,
+    exists,
+    func,
+    insert,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
-from app.db.models.workouts import Exercise, Workout
-from app.schemas.workout import WorkoutCreate
+from app.db.models.workouts import Exercise, Workout, WorkoutSession
+from app.schemas.workout import WorkoutCreate, WorkoutSessionCreate
 
 
 class WorkoutMetrics(TypedDict):
@@ -20,6 +30,59 @@ class WorkoutMetrics(TypedDict):
     count: int
 
 
+class ExerciseRow(TypedDict):
+    id: UUID
+    name: str
+    muscle_group: str
+
+
+class WorkoutRow(TypedDict):
+    """Тренировка в форме ответа API (совпадает с WorkoutOut)."""
+
+    id: UUID
+    user_id: UUID
+    performed_at: datetime
+    sets: int
+    reps: int
+    weight: float
+    total_volume: float
+    exercise: ExerciseRow
+
+
+class StoredWorkoutRow(WorkoutRow):
+    """Тренировка с привязкой к сессии — для правки и удаления."""
+
+    session_id: UUID | None
+
+
+class WorkoutSessionRow(TypedDict):
+    """Сессия в форме ответа API (совпадает с WorkoutSessionOut)."""
+
+    id: UUID
+    user_id: UUID
+    started_at: datetime
+    ended_at: datetime | None
+    notes: str | None
+    exercises_count: int
+    sets_count: int
+    total_volume: float
+    workouts: list[WorkoutRow]
+
+
+WORKOUT_COPY_COLUMNS = (
+    "id",
+    "user_id",
+    "exercise_id",
+    "performed_at",
+    "sets",
+    "reps",
+    "weight",
+    "total_volume",
+)
+# Импорт: подходы сразу привязываются к сессиям своих дней
+WORKOUT_SESSION_COPY_COLUMNS = (*WORKOUT_COPY_COLUMNS, "session_id")
+
+
 class WorkoutRepository:
     """Репозиторий для операций с тренировками и упражнениями в БД."""
 
@@ -47,6 +110,194 @@ class WorkoutRepository:
         self._session.add(exercise)
         return exercise
 
+    async def resolve_exercises(
+        self,
+        exercises: Mapping[str, str],
+    ) -> dict[str, UUID]:
+        """Получить id упражнений по названиям, создав недостающие одним запросом.
+
+        ``exercises`` — отображение название -> группа мышц (для новых записей).
+        """
+        resolved = await self.resolve_exercise_rows(exercises)
+        return {name: row["id"] for name, row in resolved.items()}
+
+    async def resolve_exercise_rows(
+        self,
+        exercises: Mapping[str, str],
+    ) -> dict[str, ExerciseRow]:
+        """То же, что ``resolve_exercises``, но с группой мышц упражнения."""
+        if not exercises:
+            return {}
+
+        insert_stmt = (
+            pg_insert(Exercise)
+            .values(
+                [
+                    {"name": name, "muscle_group": muscle_group}
+                    for name, muscle_group in exercises.items()
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=[Exercise.name])
+        )
+        await self._session.execute(insert_stmt)
+
+        stmt = select(Exercise.id, Exercise.name, Exercise.muscle_group).where(
+            Exercise.name.in_(list(exercises))
+        )
+        result = await self._session.execute(stmt)
+        return {
+            row.name: ExerciseRow(
+                id=row.id, name=row.name, muscle_group=row.muscle_group
+            )
+            for row in result
+        }
+
+    async def copy_workouts(
+        self,
+        records: Sequence[Sequence[Any]],
+        columns: Sequence[str] = WORKOUT_COPY_COLUMNS,
+    ) -> int:
+        """Загрузить пачку тренировок через COPY в текущей транзакции.
+
+        Порядок полей в записях — ``columns``. Вызывается после
+        любого запроса в этой же сессии, чтобы транзакция asyncpg уже была открыта.
+        """
+        if not records:
+            return 0
+
+        connection = await self._session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            Workout.__tablename__,
+            records=records,
+            columns=list(columns),
+        )
+        return len(records)
+
+    async def create_session(
+        self, payload: WorkoutSessionCreate, user_id: UUID
+    ) -> WorkoutSessionRow:
+        """Создать сессию с подходами в текущей транзакции.
+
+        Упражнения — одним upsert, сессия — одним INSERT с агрегатами,
+        подходы — одним многострочным INSERT; время подходов — начало сессии.
+        """
+        exercises = await self.resolve_exercise_rows(
+            {item.exercise_name: item.muscle_group for item in payload.sets}
+        )
+        volumes = [item.sets * item.reps * item.weight for item in payload.sets]
+
+        workout_session = WorkoutSession(
+            user_id=user_id,
+            started_at=payload.started_at,
+            ended_at=payload.ended_at,
+            notes=payload.notes,
+            exercises_count=len(exercises),
+            sets_count=sum(item.sets for item in payload.sets),
+            total_volume=sum(volumes),
+        )
+        self._session.add(workout_session)
+        await self._session.flush()
+
+        workouts = [
+            WorkoutRow(
+                id=uuid4(),
+                user_id=user_id,
+                performed_at=workout_session.started_at,
+                sets=item.sets,
+                reps=item.reps,
+                weight=item.weight,
+                total_volume=volume,
+                exercise=exercises[item.exercise_name],
+            )
+            for item, volume in zip(payload.sets, volumes)
+        ]
+        await self._session.execute(
+            insert(Workout),
+            [
+                {
+                    "id": row["id"],
+                    "user_id": user_id,
+                    "session_id": workout_session.id,
+                    "exercise_id": row["exercise"]["id"],
+                    "performed_at": row["performed_at"],
+                    "sets": row["sets"],
+                    "reps": row["reps"],
+                    "weight": row["weight"],
+                    "total_volume": row["total_volume"],
+                }
+                for row in workouts
+            ],
+        )
+
+        return WorkoutSessionRow(
+            id=workout_session.id,
+            user_id=user_id,
+            started_at=workout_session.started_at,
+            ended_at=workout_session.ended_at,
+            notes=workout_session.notes,
+            exercises_count=workout_session.exercises_count,
+            sets_count=workout_session.sets_count,
+            total_volume=workout_session.total_volume,
+            workouts=workouts,
+        )
+
+    async def create_day_sessions(
+        self, user_id: UUID, days: Collection[date]
+    ) -> dict[date, UUID]:
+        """Пустые сессии на дни импорта одним INSERT.
+
+        Границы и агрегаты заполняет ``refresh_session_totals`` после загрузки
+        подходов.
+        """
+        if not days:
+            return {}
+
+        sessions = {day: uuid4() for day in days}
+        await self._session.execute(
+            insert(WorkoutSession),
+            [
+                {
+                    "id": session_id,
+                    "user_id": user_id,
+                    "started_at": datetime.combine(day, time()),
+                }
+                for day, session_id in sessions.items()
+            ],
+        )
+        return sessions
+
+    async def refresh_session_totals(self, session_ids: Collection[UUID]) -> None:
+        """Пересчитать границы и агрегаты сессий по их подходам одним UPDATE."""
+        if not session_ids:
+            return
+
+        totals = (
+            select(
+                Workout.session_id,
+                func.min(Workout.performed_at).label("started_at"),
+                func.max(Workout.performed_at).label("ended_at"),
+                func.count(distinct(Workout.exercise_id)).label("exercises_count"),
+                func.sum(Workout.sets).label("sets_count"),
+                func.sum(Workout.total_volume).label("total_volume"),
+            )
+            .where(Workout.session_id.in_(list(session_ids)))
+            .group_by(Workout.session_id)
+            .subquery("totals")
+        )
+        stmt = (
+            update(WorkoutSession)
+            .where(WorkoutSession.id == totals.c.session_id)
+            .values(
+                started_at=totals.c.started_at,
+                ended_at=totals.c.ended_at,
+                exercises_count=totals.c.exercises_count,
+                sets_count=totals.c.sets_count,
+                total_volume=totals.c.total_volume,
+            )
+        )
+        await self._session.execute(stmt)
+
     async def create_workout(self, payload: WorkoutCreate, user_id: UUID) -> Workout:
         """Создать новую тренировку со связанным упражнением."""
         exercise = await self.get_or_create_exercise(
@@ -67,21 +318,176 @@ class WorkoutRepository:
         await self._session.flush()
         return workout
 
+    async def get_workout_for_update(
+        self, workout_id: UUID, user_id: UUID
+    ) -> StoredWorkoutRow | None:
+        """Тренировка пользователя с блокировкой строки до конца транзакции.
+
+        Месяц по id неизвестен, поэтому поиск идёт по первичному ключу
+        (id, performed_at) во всех секциях; правка и удаление затем
+        передают ``performed_at`` и затрагивают одну секцию.
+        """
+        workouts = Workout.__table__
+        exercises = Exercise.__table__
+        stmt = (
+            select(
+                workouts.c.id,
+                workouts.c.user_id,
+                workouts.c.performed_at,
+                workouts.c.sets,
+                workouts.c.reps,
+                workouts.c.weight,
+                workouts.c.total_volume,
+                workouts.c.session_id,
+                exercises.c.id,
+                exercises.c.name,
+                exercises.c.muscle_group,
+            )
+            .select_from(
+                workouts.join(exercises, workouts.c.exercise_id == exercises.c.id)
+            )
+            .where(workouts.c.id == workout_id, workouts.c.user_id == user_id)
+            .with_for_update(of=workouts)
+        )
+        row = (await self._session.execute(stmt)).tuples().one_or_none()
+        if row is None:
+            return None
+        return StoredWorkoutRow(
+            id=row[0],
+            user_id=row[1],
+            performed_at=row[2],
+            sets=row[3],
+            reps=row[4],
+            weight=row[5],
+            total_volume=row[6],
+            session_id=row[7],
+            exercise=ExerciseRow(id=row[8], name=row[9], muscle_group=row[10]),
+        )
+
+    async def update_workout(self, row: StoredWorkoutRow) -> None:
+        """Записать новые подходы, повторения, вес и объём тренировки.
+
+        ``performed_at`` в условии отсекает остальные секции таблицы.
+        """
+        stmt = (
+            update(Workout)
+            .where(Workout.id == row["id"], Workout.performed_at == row["performed_at"])
+            .values(
+                sets=row["sets"],
+                reps=row["reps"],
+                weight=row["weight"],
+                total_volume=row["total_volume"],
+            )
+        )
+        await self._session.execute(stmt)
+
+    async def delete_workout(self, row: StoredWorkoutRow) -> None:
+        stmt = delete(Workout).where(
+            Workout.id == row["id"], Workout.performed_at == row["performed_at"]
+        )
+        await self._session.execute(stmt)
+
+    async def has_workouts_on_day(self, user_id: UUID, day: date) -> bool:
+        """Есть ли у пользователя тренировки за день (по индексу user_id, performed_at)."""
+        start = datetime.combine(day, time())
+        stmt = select(
+            exists().where(
+                Workout.user_id == user_id,
+                Workout.performed_at >= start,
+                Workout.performed_at < start + timedelta(days=1),
+            )
+        )
+        return (await self._session.execute(stmt)).scalar_one()
+
+    async def apply_session_delta(
+        self, session_id: UUID, sets: int, total_volume: float
+    ) -> None:
+        """Сдвинуть агрегаты сессии на разность после правки подхода."""
+        stmt = (
+            update(WorkoutSession)
+            .where(WorkoutSession.id == session_id)
+            .values(
+                sets_count=WorkoutSession.sets_count + sets,
+                total_volume=WorkoutSession.total_volume + total_volume,
+            )
+        )
+        await self._session.execute(stmt)
+
+    async def remove_from_session(
+        self,
+        session_id: UUID,
+        exercise_id: UUID,
+        sets: int,
+        total_volume: float,
+    ) -> None:
+        """Вычесть удалённый подход из агрегатов; пустая сессия удаляется.
+
+        Вызывается после удаления строки: упражнение перестаёт учитываться,
+        если других его подходов в сессии нет.
+        """
+        same_exercise = exists().where(
+            Workout.session_id == session_id, Workout.exercise_id == exercise_id
+        )
+        stmt = (
+            update(WorkoutSession)
+            .where(WorkoutSession.id == session_id)
+            .values(
+                sets_count=WorkoutSession.sets_count - sets,
+                total_volume=WorkoutSession.total_volume - total_volume,
+                exercises_count=WorkoutSession.exercises_count
+                - case((same_exercise, 0), else_=1),
+            )
+        )
+        await self._session.execute(stmt)
+        await self._session.execute(
+            delete(WorkoutSession).where(
+                WorkoutSession.id == session_id,
+                ~exists().where(Workout.session_id == session_id),
+            )
+        )
+
     async def list_workouts(
         self,
         user_id: UUID,
         limit: int = 50,
         offset: int = 0,
-    ) -> Sequence[Workout]:
-        """Получить список тренировок пользователя с пагинацией."""
+    ) -> list[WorkoutRow]:
+        """Страница тренировок пользователя одним JOIN, без ORM-объектов."""
+        workouts = Workout.__table__
+        exercises = Exercise.__table__
         stmt = (
-            select(Workout)
-            .where(Workout.user_id == user_id)
-            .options(selectinload(Workout.exercise))
+            select(
+                workouts.c.id,
+                workouts.c.user_id,
+                workouts.c.performed_at,
+                workouts.c.sets,
+                workouts.c.reps,
+                workouts.c.weight,
+                workouts.c.total_volume,
+                exercises.c.id,
+                exercises.c.name,
+                exercises.c.muscle_group,
+            )
+            .select_from(
+                workouts.join(exercises, workouts.c.exercise_id == exercises.c.id)
+            )
+            .where(workouts.c.user_id == user_id)
+            .order_by(workouts.c.performed_at.desc())
             .limit(limit)
             .offset(offset)
-            .order_by(Workout.performed_at.desc())
         )
 
         result = await self._session.execute(stmt)
-        return result.scalars().all()
+        return [
+            WorkoutRow(
+                id=row[0],
+                user_id=row[1],
+                performed_at=row[2],
+                sets=row[3],
+                reps=row[4],
+                weight=row[5],
+                total_volume=row[6],
+                exercise=ExerciseRow(id=row[7], name=row[8], muscle_group=row[9]),
+            )
+            for row in result.tuples()
+        ]
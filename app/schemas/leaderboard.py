@@ -0,0 +1,29 @@
+from datetime import date as Date
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+LeaderboardPeriodParam = Literal["week", "month"]
+
+
+class LeaderboardEntryOut(BaseModel):
+    rank: int = Field(..., description="Место, начиная с 1")
+    user_id: UUID
+    score: float
+
+
+class LeaderboardResponse(BaseModel):
+    entries: list[LeaderboardEntryOut]
+    me: LeaderboardEntryOut | None = Field(
+        None, description="Место текущего пользователя; null — нет в рейтинге"
+    )
+
+
+class VolumeLeaderboardResponse(LeaderboardResponse):
+    period: LeaderboardPeriodParam
+    period_start: Date
+
+
+class ExerciseLeaderboardResponse(LeaderboardResponse):
+    exercise_name: str
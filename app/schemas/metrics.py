@@ -1,11 +1,79 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
-from datetime import date as Date
+from datetime import date as Date, datetime
+from uuid import UUID
+
+from app.schemas.workout import WorkoutOut
+
+
+class StreakInfo(BaseModel):
+    current_streak: int = Field(..., description="Дней подряд по сегодня или вчера")
+    longest_streak: int = Field(..., description="Самая длинная серия дней")
+    last_training_day: Date
+    training_days_this_week: int
+    training_days_last_week: int
+    total_training_days: int
+    avg_days_per_week: float = Field(
+        ..., description="Среднее число тренировочных дней в неделю"
+    )
 
 
 class MetricsSummaryResponse(BaseModel):
     total_volume: float = Field(..., description="Суммарный тренировочный объём")
     avg_volume: float = Field(..., description="Средний объём на тренировку")
     workouts_count: int = Field(..., description="Количество тренировок")
+    sessions_count: int | None = Field(
+        None, description="Количество тренировочных сессий"
+    )
+    streaks: StreakInfo | None = None
+
+
+MAX_BATCH_USERS = 200
+
+
+class BatchSummaryRequest(BaseModel):
+    user_ids: list[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_USERS)
+    days: int = Field(7, ge=1, le=365)
+
+
+class BatchSummaryItem(BaseModel):
+    user_id: UUID
+    total_volume: float
+    avg_volume: float
+    workouts_count: int
+
+
+class BatchSummaryResponse(BaseModel):
+    items: list[BatchSummaryItem] = Field(
+        ..., description="Сводки в порядке запрошенных user_ids"
+    )
+
+
+class MetricsSummaryDelta(BaseModel):
+    total_volume: float
+    avg_volume: float
+    workouts_count: int
+
+
+class MetricsSummaryDeltaPercent(BaseModel):
+    total_volume: float | None = None
+    avg_volume: float | None = None
+    workouts_count: float | None = None
+
+
+class MetricsComparisonResponse(BaseModel):
+    current: MetricsSummaryResponse
+    previous: MetricsSummaryResponse = Field(
+        ..., description="Окно той же длины непосредственно перед текущим"
+    )
+    delta: MetricsSummaryDelta = Field(..., description="current - previous")
+    delta_pct: MetricsSummaryDeltaPercent = Field(
+        ..., description="Изменение в процентах; null, если в previous ноль"
+    )
+
+
+SummaryCompare = Literal["previous"]
 
 
 class TimelineItem(BaseModel):
@@ -14,3 +82,63 @@ class TimelineItem(BaseModel):
     total_volume: float
     total_sets: int
     avg_weight: float | None = None
+
+
+TimelineFormat = Literal["rows", "columnar"]
+TimelineGranularity = Literal["day", "week", "month"]
+
+
+class TimelineColumnsResponse(BaseModel):
+    dates: list[int] = Field(..., description="Номер дня от 1970-01-01")
+    workouts_count: list[int]
+    total_sets: list[int]
+    total_volume: list[float]
+    avg_weight: list[float | None]
+
+
+class DashboardResponse(BaseModel):
+    summary: MetricsSummaryResponse
+    timeline: list[TimelineItem] | TimelineColumnsResponse
+    recent_workouts: list[WorkoutOut]
+    cache: dict[str, Literal["hit", "miss"]] = Field(
+        ..., description="Источник каждого фрагмента: кэш или БД"
+    )
+
+
+class MuscleGroupItem(BaseModel):
+    muscle_group: str
+    total_volume: float
+    total_sets: int = Field(..., description="Сумма подходов")
+    workouts_count: int
+    share: float = Field(..., description="Доля в суммарном объёме, 0..1")
+
+
+DistributionField = Literal["reps", "weight", "volume"]
+
+
+class DistributionBucket(BaseModel):
+    lower: float = Field(..., description="Нижняя граница (включительно)")
+    upper: float | None = Field(
+        ..., description="Верхняя граница; null — интервал открыт сверху"
+    )
+    workouts_count: int
+    total_sets: int
+    total_volume: float
+
+
+class DistributionResponse(BaseModel):
+    field: DistributionField
+    buckets: list[DistributionBucket]
+
+
+class ExerciseRecordResponse(BaseModel):
+    exercise_id: UUID
+    exercise_name: str
+    muscle_group: str
+    best_weight: float = Field(..., description="Максимальный рабочий вес")
+    best_e1rm: float = Field(
+        ..., description="Лучший расчётный разовый максимум (Brzycki / Epley)"
+    )
+    best_volume: float = Field(..., description="Максимальный объём за тренировку")
+    workouts_count: int
+    last_performed_at: datetime
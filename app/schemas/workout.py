@@ -1,6 +1,32 @@
-from datetime import datetime
+from datetime import date, datetime, timezone
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
+
+MAX_SESSION_SETS = 200
+
+
+def utc_now() -> datetime:
+    """Текущее время в UTC без пояса — так хранятся performed_at и started_at."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def utc_today() -> date:
+    """Сегодняшний день по UTC — по нему раскладываются дни тренировок."""
+    return utc_now().date()
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Время с часовым поясом переводится в UTC без пояса."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def check_not_future(value: datetime, field: str) -> datetime:
+    # Будущий день нарушил бы порядок дней в сериях и колонках истории
+    if value > utc_now():
+        raise ValueError(f"{field} не может быть в будущем")
+    return value
 
 
 class ExerciseOut(BaseModel):
@@ -19,6 +45,12 @@ class WorkoutCreate(BaseModel):
     weight: float = Field(ge=0)
 
 
+class WorkoutUpdate(BaseModel):
+    sets: int | None = Field(default=None, ge=1, le=50)
+    reps: int | None = Field(default=None, ge=1, le=200)
+    weight: float | None = Field(default=None, ge=0)
+
+
 class WorkoutOut(BaseModel):
     id: UUID
     user_id: UUID
@@ -30,7 +62,63 @@ class WorkoutOut(BaseModel):
     exercise: ExerciseOut
 
 
+class WorkoutSessionCreate(BaseModel):
+    started_at: datetime = Field(
+        default_factory=utc_now,
+        description="Начало сессии; по умолчанию — время записи",
+    )
+    ended_at: datetime | None = None
+    notes: str | None = Field(default=None, max_length=2000)
+    sets: list[WorkoutCreate] = Field(min_length=1, max_length=MAX_SESSION_SETS)
+
+    @field_validator("started_at", "ended_at")
+    @classmethod
+    def to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        """Время с часовым поясом хранится в UTC без пояса, как performed_at."""
+        return None if value is None else to_naive_utc(value)
+
+    @model_validator(mode="after")
+    def check_period(self) -> "WorkoutSessionCreate":
+        check_not_future(self.started_at, "started_at")
+        if self.ended_at is not None and self.ended_at < self.started_at:
+            raise ValueError("ended_at не может быть раньше started_at")
+        return self
+
+
+class WorkoutSessionOut(BaseModel):
+    id: UUID
+    user_id: UUID
+    started_at: datetime
+    ended_at: datetime | None
+    notes: str | None
+    exercises_count: int
+    sets_count: int
+    total_volume: float
+    workouts: list[WorkoutOut]
+
+
 class MetricsOut(BaseModel):
     total_volume: float = 0.0
     avg_volume: float = 0.0
     count: int = 0
+
+
+class WorkoutImportRow(WorkoutCreate):
+    performed_at: datetime
+
+    @field_validator("performed_at")
+    @classmethod
+    def check_performed_at(cls, value: datetime) -> datetime:
+        return check_not_future(to_naive_utc(value), "performed_at")
+
+
+class ImportRowError(BaseModel):
+    line: int
+    errors: list[str]
+
+
+class ImportReport(BaseModel):
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = Field(default_factory=list)
@@ -0,0 +1,84 @@
+"""Метрики спортсменов для тренера: много пользователей за один запрос."""
+
+from datetime import timedelta
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_manager
+from app.core.exceptions import AthleteAccessDeniedException
+from app.db.session import read_session, replica_router
+from app.repositories.coach_repo import CoachRepository
+from app.repositories.metrics_repo import MetricsRepository, MetricsSummaryRow
+from app.schemas.workout import utc_today
+from app.services.metrics_service import SUMMARY_CACHE_TTL, summary_cache_key
+
+
+class CoachService:
+    """Сервис пакетных метрик для текущего пользователя-тренера."""
+
+    __slots__ = ("_repo", "_coaches", "_coach_id")
+
+    def __init__(self, session: AsyncSession, coach_id: UUID) -> None:
+        self._repo = MetricsRepository(session)
+        self._coaches = CoachRepository(session)
+        self._coach_id = coach_id
+
+    async def check_access(self, user_ids: list[UUID]) -> None:
+        """Тренеру доступны он сам и привязанные спортсмены, иначе 403."""
+        requested = set(user_ids) - {self._coach_id}
+        if not requested:
+            return
+        allowed = await self._coaches.linked_athletes(self._coach_id, requested)
+        if denied := requested - allowed:
+            raise AthleteAccessDeniedException(sorted(denied, key=str))
+
+    async def get_summaries(
+        self, user_ids: list[UUID], days: int
+    ) -> dict[UUID, MetricsSummaryRow]:
+        """Сводки за последние ``days`` дней для списка пользователей.
+
+        Ключи кэша те же, что у MetricsService.get_summary: попадания
+        берутся одним MGET, промахи считаются одним GROUP BY и
+        записываются обратно одним pipeline. Промахи спортсменов,
+        закреплённых за primary после записи, читаются с primary: иначе
+        сводка с отстающей реплики попала бы в их собственный кэш.
+        """
+        await self.check_access(user_ids)
+        user_ids = list(dict.fromkeys(user_ids))
+        keys = [summary_cache_key(user_id, days) for user_id in user_ids]
+
+        summaries: dict[UUID, MetricsSummaryRow] = {}
+        misses: list[UUID] = []
+        for user_id, value in zip(user_ids, await cache_manager.get_many(keys)):
+            if value is None:
+                misses.append(user_id)
+            else:
+                summaries[user_id] = value
+
+        if misses:
+            today = utc_today()
+            start, end = today - timedelta(days=days), today + timedelta(days=1)
+            pinned = await replica_router.pinned(misses)
+            loaded: dict[UUID, MetricsSummaryRow] = {}
+            if replica_misses := [
+                user_id for user_id in misses if user_id not in pinned
+            ]:
+                loaded.update(
+                    await self._repo.get_summaries(replica_misses, start, end)
+                )
+            if pinned:
+                async with read_session(use_primary=True) as session:
+                    loaded.update(
+                        await MetricsRepository(session).get_summaries(
+                            list(pinned), start, end
+                        )
+                    )
+            summaries.update(loaded)
+            await cache_manager.set_many(
+                {
+                    summary_cache_key(user_id, days): (summary, SUMMARY_CACHE_TTL)
+                    for user_id, summary in loaded.items()
+                }
+            )
+        return {user_id: summaries[user_id] for user_id in user_ids}
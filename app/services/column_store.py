@@ -0,0 +1,332 @@
+"""Колоночное хранилище истории тренировок в памяти процесса.
+
+Для активного пользователя вся история загружается одним запросом
+в типизированные массивы NumPy (день от 1970-01-01, индекс упражнения
+и группы мышц, подходы, повторения, вес, объём). Сводка, таймлайн и
+разбивка по группам мышц считаются срезами и bincount без запросов к БД.
+Рекорды по упражнениям читаются из ``personal_records``: это одна строка
+на упражнение, а в колонках нет имён упражнений и времени тренировки.
+
+Актуальность проверяется версией данных пользователя (см. data_version):
+запись в этом процессе вставляет строку и после коммита принимает новую
+версию, запись в другом процессе меняет версию — копия перестраивается.
+Срок жизни записи дополнительно ограничен ``COLUMN_STORE_TTL``.
+Вытеснение — LRU по суммарному объёму массивов.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from uuid import UUID
+
+import numpy as np
+
+from app.core.config import settings
+from app.repositories.metrics_repo import (
+    EPOCH,
+    Granularity,
+    MetricsSummaryRow,
+    MuscleGroupRow,
+    TimelineColumns,
+    WorkoutColumnsRow,
+)
+
+COLUMN_DTYPES = {
+    "days": np.int32,
+    "exercise": np.int32,
+    "muscle_group": np.int16,
+    "sets": np.int16,
+    "reps": np.int16,
+    "weight": np.float64,
+    "volume": np.float64,
+}
+
+
+def _day_number(day: date) -> int:
+    return (day - EPOCH).days
+
+
+def bucket_days(days: np.ndarray, granularity: Granularity) -> np.ndarray:
+    """Начало интервала для каждого дня; неделя начинается с понедельника."""
+    days = days.astype(np.int64)
+    if granularity == "week":
+        # 1970-01-01 — четверг: (day + 3) % 7 — номер дня недели от понедельника
+        return days - (days + 3) % 7
+    if granularity == "month":
+        months = days.astype("datetime64[D]").astype("datetime64[M]")
+        return months.astype("datetime64[D]").astype(np.int64)
+    return days
+
+
+def bucket_series(start: date, end: date, granularity: Granularity) -> np.ndarray:
+    """Начала интервалов от интервала ``start`` до интервала дня ``end - 1``."""
+    first, last = bucket_days(
+        np.array([_day_number(start), _day_number(end - timedelta(days=1))]),
+        granularity,
+    )
+    if granularity == "month":
+        months = np.arange(
+            np.datetime64(int(first), "D").astype("datetime64[M]"),
+            np.datetime64(int(last), "D").astype("datetime64[M]") + 1,
+        )
+        return months.astype("datetime64[D]").astype(np.int64)
+    step = 7 if granularity == "week" else 1
+    return np.arange(first, last + 1, step, dtype=np.int64)
+
+
+class UserColumns:
+    """История одного пользователя колонками; строки упорядочены по дню."""
+
+    __slots__ = (
+        "_columns",
+        "size",
+        "exercise_ids",
+        "muscle_groups",
+        "_exercise_index",
+        "_muscle_group_index",
+        "version",
+        "pending",
+        "expires_at",
+    )
+
+    def __init__(self, row: WorkoutColumnsRow, version: str) -> None:
+        self._columns = {
+            name: np.asarray(row[name], dtype=dtype)
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+        self.size = len(row["days"])
+        self.exercise_ids = list(row["exercise_ids"])
+        self.muscle_groups = list(row["muscle_groups"])
+        self._exercise_index = {
+            exercise_id: index for index, exercise_id in enumerate(self.exercise_ids)
+        }
+        self._muscle_group_index = {
+            name: index for index, name in enumerate(self.muscle_groups)
+        }
+        self.version = version
+        self.pending = 0
+        self.expires_at = time.monotonic() + settings.COLUMN_STORE_TTL
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name][: self.size]
+
+    def append(
+        self,
+        day: date,
+        exercise_id: UUID,
+        muscle_group: str,
+        sets: int,
+        reps: int,
+        weight: float,
+        volume: float,
+    ) -> None:
+        """Вставить строку после строк того же дня; ёмкость растёт удвоением.
+
+        День может быть раньше последнего: импорт и сессии пишут прошлые
+        даты, а колонки должны оставаться упорядоченными для searchsorted.
+        """
+        exercise = self._exercise_index.setdefault(exercise_id, len(self.exercise_ids))
+        if exercise == len(self.exercise_ids):
+            self.exercise_ids.append(exercise_id)
+        group = self._muscle_group_index.setdefault(
+            muscle_group, len(self.muscle_groups)
+        )
+        if group == len(self.muscle_groups):
+            self.muscle_groups.append(muscle_group)
+
+        if self.size == len(self._columns["days"]):
+            capacity = max(2 * self.size, 16)
+            for name, column in self._columns.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[: self.size] = column[: self.size]
+                self._columns[name] = grown
+
+        day_number = _day_number(day)
+        position = int(np.searchsorted(self.column("days"), day_number, "right"))
+        values = (day_number, exercise, group, sets, reps, weight, volume)
+        for name, value in zip(COLUMN_DTYPES, values):
+            column = self._columns[name]
+            column[position + 1 : self.size + 1] = column[position : self.size]
+            column[position] = value
+        self.size += 1
+
+    def _rows(self, start: date, end: date) -> slice:
+        """Строки с днём в [start, end)."""
+        days = self.column("days")
+        return slice(
+            int(np.searchsorted(days, _day_number(start), side="left")),
+            int(np.searchsorted(days, _day_number(end), side="left")),
+        )
+
+    def summary(self, start: date, end: date) -> MetricsSummaryRow:
+        rows = self._rows(start, end)
+        count = rows.stop - rows.start
+        total_volume = float(self.column("volume")[rows].sum())
+        return MetricsSummaryRow(
+            total_volume=total_volume,
+            avg_volume=total_volume / count if count else 0.0,
+            workouts_count=count,
+        )
+
+    def timeline(
+        self,
+        start: date,
+        end: date,
+        granularity: Granularity = "day",
+    ) -> TimelineColumns:
+        """То же, что MetricsRepository.get_timeline_window, без запроса к БД."""
+        rows = self._rows(start, end)
+        series = bucket_series(start, end, granularity)
+        index = np.searchsorted(
+            series, bucket_days(self.column("days")[rows], granularity)
+        )
+        size = len(series)
+
+        total_sets = np.bincount(index, minlength=size)
+        total_volume = np.bincount(
+            index, weights=self.column("volume")[rows], minlength=size
+        )
+        weight_sum = np.bincount(
+            index, weights=self.column("weight")[rows], minlength=size
+        )
+        # workouts_count — число разных упражнений в интервале
+        pairs = np.unique(
+            index * len(self.exercise_ids) + self.column("exercise")[rows]
+        )
+        workouts_count = np.bincount(
+            pairs // max(len(self.exercise_ids), 1), minlength=size
+        )
+
+        avg_weight = np.zeros(size, dtype=object)
+        has_rows = total_sets > 0
+        avg_weight[has_rows] = (weight_sum[has_rows] / total_sets[has_rows]).tolist()
+        avg_weight[~has_rows] = None
+
+        return TimelineColumns(
+            dates=series.tolist(),
+            workouts_count=workouts_count.tolist(),
+            total_sets=total_sets.tolist(),
+            total_volume=total_volume.tolist(),
+            avg_weight=avg_weight.tolist(),
+        )
+
+    def muscle_groups_breakdown(self, start: date, end: date) -> list[MuscleGroupRow]:
+        """То же, что MetricsRepository.get_muscle_groups, без запроса к БД."""
+        rows = self._rows(start, end)
+        groups = self.column("muscle_group")[rows]
+        size = len(self.muscle_groups)
+
+        volume = np.bincount(
+            groups, weights=self.column("volume")[rows], minlength=size
+        )
+        sets = np.bincount(groups, weights=self.column("sets")[rows], minlength=size)
+        counts = np.bincount(groups, minlength=size)
+        total = volume.sum()
+
+        present = np.flatnonzero(counts)
+        order = sorted(
+            present.tolist(), key=lambda g: (-volume[g], self.muscle_groups[g])
+        )
+        return [
+            MuscleGroupRow(
+                muscle_group=self.muscle_groups[group],
+                total_volume=float(volume[group]),
+                total_sets=int(sets[group]),
+                workouts_count=int(counts[group]),
+                share=float(volume[group] / total) if total else 0.0,
+            )
+            for group in order
+        ]
+
+
+class ColumnStore:
+    """LRU-кэш UserColumns с ограничением по памяти."""
+
+    __slots__ = ("_entries", "_max_bytes", "_bytes")
+
+    def __init__(self, max_bytes: int) -> None:
+        self._entries: OrderedDict[UUID, UserColumns] = OrderedDict()
+        self._max_bytes = max_bytes
+        self._bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: UUID, version: str) -> UserColumns | None:
+        """Колонки пользователя, если они соответствуют версии данных."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if (
+            entry.pending
+            or entry.version != version
+            or entry.expires_at <= time.monotonic()
+        ):
+            self.evict(user_id)
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def put(self, user_id: UUID, entry: UserColumns) -> None:
+        self.evict(user_id)
+        if entry.nbytes > self._max_bytes:
+            return
+        self._entries[user_id] = entry
+        self._bytes += entry.nbytes
+        self._shrink(user_id)
+
+    def _shrink(self, keep: UUID) -> None:
+        """Вытеснять давно не читавшихся, пока объём больше бюджета.
+
+        ``keep`` вытесняется последним — только если он один не помещается.
+        """
+        while self._bytes > self._max_bytes:
+            oldest = next(iter(self._entries))
+            if oldest == keep and len(self._entries) > 1:
+                self._entries.move_to_end(keep)
+                continue
+            self.evict(oldest)
+
+    def evict(self, user_id: UUID) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def append(self, user_id: UUID, **row) -> None:
+        """Дописать тренировку в загруженные колонки до коммита.
+
+        Запись считается ожидающей, пока каждая дописавшая её транзакция
+        не вызовет ``confirm``: до этого она не отдаётся, а при откате
+        любой из них будет перестроена при следующем чтении.
+        """
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+        self._bytes -= entry.nbytes
+        entry.append(**row)
+        entry.pending += 1
+        self._bytes += entry.nbytes
+        self._shrink(user_id)
+
+    def confirm(self, user_id: UUID, version: str) -> None:
+        """Принять версию данных, выставленную после коммита записи.
+
+        Пока другая запись того же пользователя не закоммичена, её строка
+        уже в массивах, и версия не принимается.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and entry.pending:
+            entry.pending -= 1
+            if not entry.pending:
+                entry.version = version
+
+
+column_store = ColumnStore(settings.COLUMN_STORE_MAX_BYTES)
@@ -0,0 +1,153 @@
+"""Данные главного экрана одним запросом."""
+
+import asyncio
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import timedelta
+from functools import partial
+from typing import Any, Literal, TypedDict
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_manager
+from app.repositories.metrics_repo import (
+    Granularity,
+    TimelineColumns,
+    TimelinePoint,
+)
+from app.repositories.workout_repo import WorkoutRepository
+from app.schemas.workout import utc_today
+from app.services.metrics_history import to_points
+from app.services.metrics_service import (
+    SUMMARY_CACHE_TTL,
+    TIMELINE_CACHE_TTL,
+    MetricsService,
+    summary_cache_key,
+    timeline_cache_key,
+    timeline_columns_cache_key,
+)
+
+DASHBOARD_RECENT_WORKOUTS = 10
+RECENT_WORKOUTS_CACHE_TTL = 300
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+CacheStatus = Literal["hit", "miss"]
+
+
+def recent_workouts_cache_key(user_id: UUID, limit: int) -> str:
+    # Префикс metrics:* — ключ сбрасывается вместе с остальными метриками
+    return f"metrics:recent:user:{user_id}:limit:{limit}"
+
+
+class DashboardPayload(TypedDict):
+    summary: dict[str, Any]
+    timeline: list[TimelinePoint] | TimelineColumns
+    recent_workouts: list[dict[str, Any]]
+    cache: dict[str, CacheStatus]
+
+
+class DashboardService:
+    """Сводка, таймлайн и последние тренировки за одну аутентификацию.
+
+    Фрагменты сначала читаются из кэша одним MGET, промахи догружаются
+    параллельно, каждый в своей сессии. Сводка содержит те же поля, что
+    /metrics/summary: число сессий и серии не кэшируются и читаются всегда.
+    """
+
+    __slots__ = ("_session_factory", "_user_id")
+
+    def __init__(self, session_factory: SessionFactory, user_id: UUID) -> None:
+        self._session_factory = session_factory
+        self._user_id = user_id
+
+    async def get_dashboard(
+        self,
+        days: int,
+        recent_limit: int = DASHBOARD_RECENT_WORKOUTS,
+        timeline_format: str = "rows",
+        granularity: Granularity = "day",
+    ) -> DashboardPayload:
+        if timeline_format == "columnar":
+            timeline_key = timeline_columns_cache_key(self._user_id, days, granularity)
+            load_timeline = partial(self._load_timeline_columns, days, granularity)
+        else:
+            timeline_key = timeline_cache_key(self._user_id, days, granularity)
+            load_timeline = partial(self._load_timeline, days, granularity)
+
+        fragments = {
+            "summary": (
+                summary_cache_key(self._user_id, days),
+                SUMMARY_CACHE_TTL,
+                lambda: self._load_summary(days),
+            ),
+            "timeline": (timeline_key, TIMELINE_CACHE_TTL, load_timeline),
+            "recent_workouts": (
+                recent_workouts_cache_key(self._user_id, recent_limit),
+                RECENT_WORKOUTS_CACHE_TTL,
+                lambda: self._load_recent_workouts(recent_limit),
+            ),
+        }
+
+        cached_values = await cache_manager.get_many(
+            [key for key, _, _ in fragments.values()]
+        )
+        data = dict(zip(fragments, cached_values))
+        misses = [name for name, value in data.items() if value is None]
+
+        extras, *loaded = await asyncio.gather(
+            self._load_summary_extras(days),
+            *(fragments[name][2]() for name in misses),
+        )
+        data.update(zip(misses, loaded))
+
+        if misses:
+            await cache_manager.set_many(
+                {
+                    fragments[name][0]: (data[name], fragments[name][1])
+                    for name in misses
+                }
+            )
+
+        return DashboardPayload(
+            summary={**data["summary"], **extras},
+            timeline=data["timeline"],
+            recent_workouts=data["recent_workouts"],
+            cache={name: "miss" if name in misses else "hit" for name in fragments},
+        )
+
+    async def _load_summary(self, days: int) -> dict[str, Any]:
+        today = utc_today()
+        async with self._session_factory() as session:
+            return await MetricsService(session, self._user_id).get_summary_range(
+                today - timedelta(days=days), today
+            )
+
+    async def _load_summary_extras(self, days: int) -> dict[str, Any]:
+        """Поля /metrics/summary вне кэшируемой сводки: сессии и серии."""
+        async with self._session_factory() as session:
+            service = MetricsService(session, self._user_id)
+            return {
+                "sessions_count": await service.get_sessions_count(days),
+                "streaks": await service.get_streaks(),
+            }
+
+    async def _load_timeline(
+        self, days: int, granularity: Granularity
+    ) -> list[TimelinePoint]:
+        return to_points(await self._load_timeline_columns(days, granularity))
+
+    async def _load_timeline_columns(
+        self, days: int, granularity: Granularity
+    ) -> TimelineColumns:
+        today = utc_today()
+        async with self._session_factory() as session:
+            return await MetricsService(session, self._user_id).get_timeline_range(
+                today - timedelta(days=days), today, granularity
+            )
+
+    async def _load_recent_workouts(self, limit: int) -> list[dict[str, Any]]:
+        async with self._session_factory() as session:
+            return await WorkoutRepository(session).list_workouts(
+                self._user_id, limit=limit
+            )
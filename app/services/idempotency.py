@@ -0,0 +1,95 @@
+"""Ключи идемпотентности для записей, которые клиенты повторяют при сбоях сети.
+
+Первый запрос с заголовком ``Idempotency-Key`` занимает ключ (SET NX)
+с отпечатком метода, пути и тела. Ответ записывается в ключ только после
+коммита транзакции, и повтор получает его, не применяя изменения второй раз.
+
+- повтор, пока первый запрос не завершился, — 409;
+- тот же ключ с другим запросом — 422;
+- ошибка первого запроса освобождает ключ; если не закоммитилась сама
+  транзакция, ключ освобождается по ``IDEMPOTENCY_PENDING_TTL``.
+
+Без Redis ключи не проверяются.
+"""
+
+import hashlib
+from functools import partial
+from typing import Any
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_manager
+from app.core.exceptions import (
+    IdempotencyKeyInProgressException,
+    IdempotencyKeyReusedException,
+)
+from app.db.session import after_commit
+
+IDEMPOTENCY_TTL = 24 * 3600
+IDEMPOTENCY_PENDING_TTL = 60
+
+
+def idempotency_cache_key(user_id: UUID, key: str) -> str:
+    return f"idempotency:user:{user_id}:{key}"
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    return hashlib.sha256(
+        b"\n".join([method.encode(), path.encode(), body])
+    ).hexdigest()
+
+
+class IdempotentRequest:
+    """Состояние ключа для одного запроса; без ключа ничего не делает."""
+
+    __slots__ = ("_cache_key", "_fingerprint", "replayed", "body")
+
+    def __init__(self, cache_key: str | None = None, fingerprint: str = "") -> None:
+        self._cache_key = cache_key
+        self._fingerprint = fingerprint
+        self.replayed = False
+        self.body: Any = None
+
+    async def acquire(self) -> None:
+        """Занять ключ или загрузить сохранённый ответ (``replayed``)."""
+        if self._cache_key is None:
+            return
+        pending = {"fingerprint": self._fingerprint, "done": False}
+        if await cache_manager.add(
+            self._cache_key, pending, ttl=IDEMPOTENCY_PENDING_TTL
+        ):
+            return
+
+        stored = await cache_manager.get(self._cache_key)
+        # Ключ занят другим запросом: этот его не сохраняет и не освобождает
+        self._cache_key = None
+        if stored is None:
+            # Redis недоступен или ключ только что истёк
+            return
+        if stored["fingerprint"] != self._fingerprint:
+            raise IdempotencyKeyReusedException()
+        if not stored["done"]:
+            raise IdempotencyKeyInProgressException()
+        self.replayed = True
+        self.body = stored["body"]
+
+    def save(self, session: AsyncSession, body: Any = None) -> None:
+        """Сохранить ответ для повторов после коммита транзакции ``session``."""
+        if self._cache_key is None:
+            return
+        stored = {
+            "fingerprint": self._fingerprint,
+            "done": True,
+            "body": jsonable_encoder(body),
+        }
+        after_commit(
+            session,
+            partial(cache_manager.set, self._cache_key, stored, IDEMPOTENCY_TTL),
+        )
+
+    async def release(self) -> None:
+        """Освободить ключ после ошибки, чтобы повтор выполнился заново."""
+        if self._cache_key is not None:
+            await cache_manager.delete(self._cache_key)
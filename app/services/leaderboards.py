@@ -0,0 +1,241 @@
+"""Глобальные рейтинги в Redis sorted set.
+
+- ``leaderboard:volume:{week|month}:{начало}`` — суммарный объём за период,
+  ZINCRBY на каждую тренировку;
+- ``leaderboard:best-weight:exercise:{id}`` — лучший вес в упражнении,
+  ZADD GT (счёт только растёт); правка тренировки выставляет его точно.
+
+Рейтинг обновляется после коммита записи, топ и место пользователя —
+O(log N). Расхождения (потерянный Redis, правки в БД) исправляет сверка
+с Postgres: ``python -m scripts.reconcile_leaderboards``. Текущий период
+сверка не трогает: ZINCRBY, закоммиченный между чтением из БД и заменой
+набора, потерялся бы; период пересобирается, когда закроется.
+"""
+
+from collections.abc import Collection
+from datetime import date, timedelta
+from typing import Literal, TypedDict
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_manager
+from app.repositories.leaderboard_repo import LeaderboardRepository
+from app.services.metrics_history import bucket_start, next_bucket
+
+LeaderboardPeriod = Literal["week", "month"]
+LEADERBOARD_PERIODS: tuple[LeaderboardPeriod, ...] = ("week", "month")
+
+# Сколько хранятся рейтинги прошедших периодов
+LEADERBOARD_TTL: dict[LeaderboardPeriod, int] = {
+    "week": 8 * 7 * 24 * 3600,
+    "month": 13 * 31 * 24 * 3600,
+}
+
+
+class LeaderboardEntry(TypedDict):
+    rank: int
+    user_id: str
+    score: float
+
+
+def volume_key(period: LeaderboardPeriod, start: date) -> str:
+    return f"leaderboard:volume:{period}:{start.isoformat()}"
+
+
+def best_weight_key(exercise_id: UUID | str) -> str:
+    return f"leaderboard:best-weight:exercise:{exercise_id}"
+
+
+def retained_since(period: LeaderboardPeriod, today: date) -> date:
+    """Начало самого старого периода, рейтинг которого ещё хранится."""
+    return bucket_start(period, today - timedelta(seconds=LEADERBOARD_TTL[period]))
+
+
+class LeaderboardStore:
+    """Запись и чтение рейтингов; без Redis операции ничего не делают."""
+
+    __slots__ = ()
+
+    async def record_workout(
+        self,
+        user_id: UUID,
+        exercise_id: UUID,
+        day: date,
+        volume: float,
+        weight: float,
+    ) -> None:
+        """Учесть одну новую тренировку (вызывается после коммита)."""
+        await cache_manager.zincrby(
+            {
+                volume_key(period, bucket_start(period, day)): (
+                    volume,
+                    LEADERBOARD_TTL[period],
+                )
+                for period in LEADERBOARD_PERIODS
+            },
+            str(user_id),
+        )
+        await cache_manager.zadd(
+            best_weight_key(exercise_id), {str(user_id): weight}, gt=True
+        )
+
+    async def set_user_scores(
+        self,
+        user_id: UUID,
+        volumes: dict[tuple[LeaderboardPeriod, date], float],
+        best_weights: dict[UUID, float],
+    ) -> None:
+        """Выставить пересчитанные счета пользователя (после импорта)."""
+        for (period, start), volume in volumes.items():
+            await cache_manager.zadd(
+                volume_key(period, start),
+                {str(user_id): volume},
+                ttl=LEADERBOARD_TTL[period],
+            )
+        for exercise_id, weight in best_weights.items():
+            await cache_manager.zadd(
+                best_weight_key(exercise_id), {str(user_id): weight}, gt=True
+            )
+
+    async def apply_change(
+        self,
+        user_id: UUID,
+        exercise_id: UUID,
+        day: date,
+        volume_delta: float,
+        best_weight: float | None,
+    ) -> None:
+        """Учесть правку или удаление тренировки (вызывается после коммита).
+
+        Объём периодов меняется на разность, лучший вес выставляется точно
+        по личному рекорду после правки; ``None`` — упражнений больше нет.
+        """
+        if volume_delta:
+            await cache_manager.zincrby(
+                {
+                    volume_key(period, bucket_start(period, day)): (
+                        volume_delta,
+                        LEADERBOARD_TTL[period],
+                    )
+                    for period in LEADERBOARD_PERIODS
+                },
+                str(user_id),
+            )
+        key = best_weight_key(exercise_id)
+        if best_weight is None:
+            await cache_manager.zrem(key, str(user_id))
+        else:
+            await cache_manager.zadd(key, {str(user_id): best_weight})
+
+    async def top(self, key: str, limit: int) -> list[LeaderboardEntry]:
+        return [
+            LeaderboardEntry(rank=index + 1, user_id=member, score=score)
+            for index, (member, score) in enumerate(
+                await cache_manager.ztop(key, limit)
+            )
+        ]
+
+    async def position(self, key: str, user_id: UUID) -> LeaderboardEntry | None:
+        found = await cache_manager.zrank(key, str(user_id))
+        if found is None:
+            return None
+        rank, score = found
+        return LeaderboardEntry(rank=rank + 1, user_id=str(user_id), score=score)
+
+
+leaderboards = LeaderboardStore()
+
+
+class LeaderboardService:
+    """Рейтинги для API, пересчёт после импорта и сверка с БД."""
+
+    __slots__ = ("_repo",)
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._repo = LeaderboardRepository(session)
+
+    async def get_exercise_id(self, name: str) -> UUID | None:
+        return await self._repo.get_exercise_id(name)
+
+    async def get_board(
+        self, key: str, user_id: UUID, limit: int
+    ) -> tuple[list[LeaderboardEntry], LeaderboardEntry | None]:
+        """Топ ``limit`` и место текущего пользователя."""
+        return (
+            await leaderboards.top(key, limit),
+            await leaderboards.position(key, user_id),
+        )
+
+    async def user_scores(
+        self,
+        user_id: UUID,
+        days: Collection[date],
+        exercise_ids: Collection[UUID],
+        today: date,
+    ) -> tuple[dict[tuple[LeaderboardPeriod, date], float], dict[UUID, float]]:
+        """Счета пользователя в хранимых периодах с ``days`` и по упражнениям.
+
+        Считается внутри транзакции импорта, записывается после коммита.
+        """
+        volumes: dict[tuple[LeaderboardPeriod, date], float] = {}
+        for period in LEADERBOARD_PERIODS:
+            since = retained_since(period, today)
+            touched = {bucket_start(period, day) for day in days if day >= since}
+            if not touched:
+                continue
+            by_period = await self._repo.user_volume_by_period(
+                user_id, period, min(touched)
+            )
+            volumes.update(
+                {(period, start): by_period.get(start, 0.0) for start in touched}
+            )
+        best = await self._repo.best_weights(exercise_ids, user_id=user_id)
+        weights = {exercise_id: scores[user_id] for exercise_id, scores in best.items()}
+        return volumes, weights
+
+    async def reconcile(self, today: date) -> int:
+        """Пересобрать рейтинги прошлого (закрытого) периода и все упражнения.
+
+        Каждый sorted set заменяется целиком (RENAME из временного ключа),
+        рейтинги упражнений без личных рекордов удаляются; возвращается
+        число пересобранных и удалённых наборов. Рейтинги упражнений не
+        закрываются, поэтому после замены рекорды перечитываются и
+        досылаются через ZADD GT: ZADD GT тренировки, закоммиченной между
+        чтением и RENAME, иначе был бы затёрт снимком.
+        """
+        rebuilt = 0
+        for period in LEADERBOARD_PERIODS:
+            start = bucket_start(
+                period, bucket_start(period, today) - timedelta(days=1)
+            )
+            volumes = await self._repo.volume_by_user(start, next_bucket(period, start))
+            await cache_manager.zreplace(
+                volume_key(period, start),
+                {str(user_id): volume for user_id, volume in volumes.items()},
+                ttl=LEADERBOARD_TTL[period],
+            )
+            rebuilt += 1
+
+        # Ключи читаются до рекордов: набор, созданный после чтения рекордов,
+        # принадлежит новому рекорду и удаляться не должен
+        existing = set(await cache_manager.scan_keys(best_weight_key("*")))
+        best = await self._repo.best_weights()
+        for key in existing - {best_weight_key(exercise_id) for exercise_id in best}:
+            await cache_manager.delete(key)
+            rebuilt += 1
+        for exercise_id, scores in best.items():
+            await cache_manager.zreplace(
+                best_weight_key(exercise_id),
+                {str(user_id): weight for user_id, weight in scores.items()},
+            )
+            rebuilt += 1
+
+        for exercise_id, scores in (await self._repo.best_weights()).items():
+            if scores != best.get(exercise_id):
+                await cache_manager.zadd(
+                    best_weight_key(exercise_id),
+                    {str(user_id): weight for user_id, weight in scores.items()},
+                    gt=True,
+                )
+        return rebuilt
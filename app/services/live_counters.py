@@ -0,0 +1,208 @@
+"""Счётчики последних дней в Redis — горячий источник текущего интервала.
+
+На каждый день пользователя — хэш ``total_sets`` / ``total_volume`` /
+``weight_sum`` и два множества: упражнения дня (для числа разных
+упражнений в интервале) и id учтённых тренировок.
+
+- Запись после коммита увеличивает счётчики Lua-скриптом, только если
+  день уже загружен, и только один раз на тренировку (SADD id).
+- Незагруженные дни читаются одним запросом к БД и записываются скриптом,
+  только если версия данных пользователя не сменилась с начала чтения:
+  иначе снимок мог пропустить тренировку, закоммиченную в это время.
+- Правка прошлых дней (импорт) удаляет их счётчики.
+
+Текущий интервал (сегодня / эта неделя / этот месяц) собирается из
+счётчиков его дней без агрегатов в SQL.
+"""
+
+import json
+from collections.abc import Iterable
+from datetime import date
+from typing import TypedDict
+from uuid import UUID
+
+from app.core.cache import cache_manager
+from app.core.data_version import data_version_key
+from app.repositories.metrics_repo import EPOCH, DailyCountersRow, TimelineColumns
+
+# Хватает на текущий месяц и неделю, начавшуюся в прошлом месяце
+LIVE_COUNTERS_TTL = 40 * 24 * 3600
+
+EMPTY_DAY_COUNTERS = DailyCountersRow(
+    total_sets=0, total_volume=0.0, weight_sum=0.0, exercise_ids=[], workout_ids=[]
+)
+
+RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if redis.call('SADD', KEYS[3], ARGV[4]) == 0 then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], 'total_sets', 1)
+redis.call('HINCRBYFLOAT', KEYS[1], 'total_volume', ARGV[1])
+redis.call('HINCRBYFLOAT', KEYS[1], 'weight_sum', ARGV[2])
+redis.call('SADD', KEYS[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+return 1
+"""
+
+SEED_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+local days = cjson.decode(ARGV[3])
+for index, day in ipairs(days) do
+    local counters = KEYS[index * 3 - 1]
+    local exercises = KEYS[index * 3]
+    local workouts = KEYS[index * 3 + 1]
+    if redis.call('EXISTS', counters) == 0 then
+        redis.call('DEL', exercises, workouts)
+        redis.call('HSET', counters, 'total_sets', day[1],
+            'total_volume', day[2], 'weight_sum', day[3])
+        redis.call('EXPIRE', counters, ARGV[2])
+        for _, id in ipairs(day[4]) do redis.call('SADD', exercises, id) end
+        for _, id in ipairs(day[5]) do redis.call('SADD', workouts, id) end
+        redis.call('EXPIRE', exercises, ARGV[2])
+        redis.call('EXPIRE', workouts, ARGV[2])
+    end
+end
+return 1
+"""
+
+
+class LiveDay(TypedDict):
+    total_sets: int
+    total_volume: float
+    weight_sum: float
+    exercise_ids: set[str]
+
+
+def live_key(user_id: UUID, day: date) -> str:
+    return f"live:user:{user_id}:day:{day.isoformat()}"
+
+
+def _day_keys(user_id: UUID, day: date) -> list[str]:
+    key = live_key(user_id, day)
+    return [key, f"{key}:exercises", f"{key}:workouts"]
+
+
+def to_live_day(row: DailyCountersRow) -> LiveDay:
+    return LiveDay(
+        total_sets=row["total_sets"],
+        total_volume=row["total_volume"],
+        weight_sum=row["weight_sum"],
+        exercise_ids={str(exercise_id) for exercise_id in row["exercise_ids"]},
+    )
+
+
+def bucket_columns(bucket: date, days: Iterable[LiveDay]) -> TimelineColumns:
+    """Один интервал с началом ``bucket`` из счётчиков его дней."""
+    total_sets = 0
+    total_volume = weight_sum = 0.0
+    exercise_ids: set[str] = set()
+    for day in days:
+        total_sets += day["total_sets"]
+        total_volume += day["total_volume"]
+        weight_sum += day["weight_sum"]
+        exercise_ids |= day["exercise_ids"]
+    return TimelineColumns(
+        dates=[(bucket - EPOCH).days],
+        workouts_count=[len(exercise_ids)],
+        total_sets=[total_sets],
+        total_volume=[total_volume],
+        avg_weight=[weight_sum / total_sets if total_sets else None],
+    )
+
+
+class LiveCounterStore:
+    """Чтение, загрузка и обновление дневных счётчиков."""
+
+    __slots__ = ()
+
+    async def read(
+        self, user_id: UUID, days: list[date]
+    ) -> list[LiveDay | None] | None:
+        """Счётчики дней одним pipeline; None на месте незагруженных дней.
+
+        Без Redis — None целиком: текущий интервал считается в БД.
+        """
+        commands = []
+        for day in days:
+            counters, exercises, _ = _day_keys(user_id, day)
+            commands += [("hgetall", counters), ("smembers", exercises)]
+        values = await cache_manager.fetch_many(commands)
+        if values is None:
+            return None
+
+        result: list[LiveDay | None] = []
+        for counters, exercise_ids in zip(values[::2], values[1::2]):
+            if not counters:
+                result.append(None)
+                continue
+            result.append(
+                LiveDay(
+                    total_sets=int(counters["total_sets"]),
+                    total_volume=float(counters["total_volume"]),
+                    weight_sum=float(counters["weight_sum"]),
+                    exercise_ids=set(exercise_ids),
+                )
+            )
+        return result
+
+    async def seed(
+        self,
+        user_id: UUID,
+        version: str,
+        rows: dict[date, DailyCountersRow],
+    ) -> None:
+        """Записать дни, прочитанные из БД при версии данных ``version``."""
+        if not rows:
+            return
+        keys = [data_version_key(user_id)]
+        payload = []
+        for day, row in rows.items():
+            keys += _day_keys(user_id, day)
+            payload.append(
+                [
+                    str(row["total_sets"]),
+                    repr(float(row["total_volume"])),
+                    repr(float(row["weight_sum"])),
+                    [str(exercise_id) for exercise_id in row["exercise_ids"]],
+                    [str(workout_id) for workout_id in row["workout_ids"]],
+                ]
+            )
+        await cache_manager.run_script(
+            SEED_SCRIPT, keys, [version, LIVE_COUNTERS_TTL, json.dumps(payload)]
+        )
+
+    async def record(
+        self,
+        user_id: UUID,
+        day: date,
+        workout_id: UUID,
+        exercise_id: UUID,
+        volume: float,
+        weight: float,
+    ) -> None:
+        """Учесть закоммиченную тренировку; повторный вызов ничего не меняет."""
+        await cache_manager.run_script(
+            RECORD_SCRIPT,
+            _day_keys(user_id, day),
+            [
+                repr(float(volume)),
+                repr(float(weight)),
+                str(exercise_id),
+                str(workout_id),
+                LIVE_COUNTERS_TTL,
+            ],
+        )
+
+    async def invalidate(self, user_id: UUID, days: Iterable[date]) -> None:
+        for day in set(days):
+            for key in _day_keys(user_id, day):
+                await cache_manager.delete(key)
+
+
+live_counters = LiveCounterStore()
@@ -0,0 +1,167 @@
+"""Кэш закрытых исторических окон таймлайна.
+
+Таймлайн режется на фрагменты с фиксированными границами: для дневной
+гранулярности — календарный месяц, для недельной — недели, начинающиеся
+в этом месяце, для месячной — календарный год. Фрагмент, лежащий целиком
+до текущего интервала, меняется только при правке старых данных, поэтому
+кэшируется надолго и переиспользуется окнами с любыми from/to.
+Текущий интервал (сегодня / эта неделя / этот месяц) собирается из дневных
+счётчиков в Redis (см. live_counters).
+"""
+
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import NamedTuple
+from uuid import UUID
+
+from app.core.cache import cache_manager
+from app.repositories.metrics_repo import (
+    EPOCH,
+    Granularity,
+    TimelineColumns,
+    TimelinePoint,
+)
+from app.schemas.workout import utc_today
+
+HISTORY_CACHE_TTL = 30 * 24 * 3600
+GRANULARITIES: tuple[Granularity, ...] = ("day", "week", "month")
+
+TIMELINE_FIELDS = (
+    "dates",
+    "workouts_count",
+    "total_sets",
+    "total_volume",
+    "avg_weight",
+)
+
+
+class Chunk(NamedTuple):
+    id: str
+    start: date
+    end: date
+
+
+def bucket_start(granularity: Granularity, day: date) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(granularity: Granularity, bucket: date) -> date:
+    if granularity == "week":
+        return bucket + timedelta(days=7)
+    if granularity == "month":
+        return _next_month(bucket)
+    return bucket + timedelta(days=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _first_monday(day: date) -> date:
+    return day + timedelta(days=(7 - day.weekday()) % 7)
+
+
+def chunk_of(granularity: Granularity, bucket: date) -> Chunk:
+    """Фрагмент, которому принадлежит интервал с началом ``bucket``."""
+    if granularity == "month":
+        year = bucket.year
+        return Chunk(str(year), date(year, 1, 1), date(year + 1, 1, 1))
+
+    month_start = bucket.replace(day=1)
+    chunk_id = f"{bucket.year}-{bucket.month:02d}"
+    if granularity == "week":
+        return Chunk(
+            chunk_id,
+            _first_monday(month_start),
+            _first_monday(_next_month(month_start)),
+        )
+    return Chunk(chunk_id, month_start, _next_month(month_start))
+
+
+def chunks_between(granularity: Granularity, start: date, end: date) -> list[Chunk]:
+    """Фрагменты, покрывающие интервалы с началом в [start, end)."""
+    chunks = []
+    current = start
+    while current < end:
+        chunk = chunk_of(granularity, current)
+        chunks.append(chunk)
+        current = chunk.end
+    return chunks
+
+
+def history_key(
+    user_id: UUID,
+    granularity: Granularity,
+    chunk: Chunk,
+    until: date,
+) -> str:
+    # Префикс history:* не попадает под сброс metrics:* при каждой записи
+    key = f"history:timeline:user:{user_id}:{granularity}:{chunk.id}"
+    if until < chunk.end:
+        key += f":until:{until.isoformat()}"
+    return key
+
+
+def empty_columns() -> TimelineColumns:
+    return TimelineColumns(
+        dates=[], workouts_count=[], total_sets=[], total_volume=[], avg_weight=[]
+    )
+
+
+def concat_columns(parts: Iterable[TimelineColumns]) -> TimelineColumns:
+    result = empty_columns()
+    for part in parts:
+        for field in TIMELINE_FIELDS:
+            result[field].extend(part[field])
+    return result
+
+
+def slice_columns(columns: TimelineColumns, start: date, end: date) -> TimelineColumns:
+    """Интервалы с началом в [start, end); даты в колонках упорядочены."""
+    dates = columns["dates"]
+    first = bisect_left(dates, (start - EPOCH).days)
+    last = bisect_left(dates, (end - EPOCH).days)
+    return TimelineColumns(
+        **{field: columns[field][first:last] for field in TIMELINE_FIELDS}
+    )
+
+
+def to_points(columns: TimelineColumns) -> list[TimelinePoint]:
+    """Колонки в построчный формат ответа."""
+    return [
+        TimelinePoint(
+            date=EPOCH + timedelta(days=day),
+            workouts_count=workouts_count,
+            total_sets=total_sets,
+            total_volume=float(total_volume),
+            avg_weight=float(avg_weight) if avg_weight else None,
+        )
+        for day, workouts_count, total_sets, total_volume, avg_weight in zip(
+            *(columns[field] for field in TIMELINE_FIELDS)
+        )
+    ]
+
+
+async def invalidate_history(user_id: UUID, days: Iterable[date]) -> None:
+    """Сбросить закрытые фрагменты, содержащие изменённые даты.
+
+    Запись в текущий интервал (обычное добавление тренировки сегодня)
+    ничего не сбрасывает: текущий интервал в кэш не попадает.
+    """
+    today = utc_today()
+    patterns = set()
+    for day in set(days):
+        for granularity in GRANULARITIES:
+            bucket = bucket_start(granularity, day)
+            if bucket >= bucket_start(granularity, today):
+                continue
+            chunk = chunk_of(granularity, bucket)
+            patterns.add(f"history:timeline:user:{user_id}:{granularity}:{chunk.id}*")
+
+    for pattern in patterns:
+        await cache_manager.delete_pattern(pattern)
@@ -1,31 +1,488 @@
 # app/services/metrics.py
 from __future__ import annotations
+from datetime import date, timedelta
+from typing import TypedDict
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import cached
-from app.repositories.metrics_repo import MetricsRepository, MetricsSummaryRow
+from app.core.cache import cache_manager, cached
+from app.core.config import settings
+from app.core.data_version import data_versions
+from app.repositories.metrics_repo import (
+    EPOCH,
+    DistributionBucketRow,
+    DistributionField,
+    MetricsRepository,
+    Granularity,
+    MuscleGroupRow,
+    SummaryComparisonRow,
+    MetricsSummaryRow,
+    TimelineColumns,
+    TimelinePoint,
+)
+from app.repositories.records_repo import PersonalRecordRepository, PersonalRecordRow
+from app.repositories.streaks_repo import (
+    StreakRow,
+    TrainingStreakRepository,
+    week_start,
+)
 from app.repositories.workout_repo import WorkoutMetrics
+from app.schemas.workout import utc_today
+from app.services.column_store import UserColumns, column_store
+from app.services.live_counters import (
+    EMPTY_DAY_COUNTERS,
+    bucket_columns,
+    live_counters,
+    to_live_day,
+)
+from app.services.metrics_history import (
+    HISTORY_CACHE_TTL,
+    bucket_start,
+    chunks_between,
+    concat_columns,
+    history_key,
+    next_bucket,
+    slice_columns,
+    to_points,
+)
+from app.services.training_load import (
+    CHRONIC_DAYS,
+    TrainingLoadReport,
+    build_report,
+)
+
+
+SUMMARY_CACHE_TTL = 600
+TIMELINE_CACHE_TTL = 900
+MUSCLE_GROUPS_CACHE_TTL = 900
+LOAD_CACHE_TTL = 900
+DISTRIBUTION_CACHE_TTL = 900
+DEFAULT_DISTRIBUTION_BUCKETS = 10
+# Диапазоны повторений по умолчанию: 1–5 (сила), 6–12 (гипертрофия), 13+
+REP_RANGE_EDGES = (1, 6, 13)
+# Дни перед окном для разгона хронической EWMA: после 3 * 28 дней вес
+# нулевого начального значения меньше 1 %.
+LOAD_WARMUP_DAYS = 3 * CHRONIC_DAYS
+
+
+def summary_cache_key(user_id: UUID, days: int) -> str:
+    return f"metrics:summary:user:{user_id}:days:{days}"
+
+
+def timeline_cache_key(user_id: UUID, days: int, granularity: str = "day") -> str:
+    return f"metrics:timeline:user:{user_id}:days:{days}:{granularity}"
+
+
+def timeline_columns_cache_key(
+    user_id: UUID, days: int, granularity: str = "day"
+) -> str:
+    return f"metrics:timeline-columns:user:{user_id}:days:{days}:{granularity}"
+
+
+def muscle_groups_cache_key(user_id: UUID, days: int) -> str:
+    return f"metrics:muscle-groups:user:{user_id}:days:{days}"
+
+
+def training_load_cache_key(user_id: UUID, days: int) -> str:
+    return f"metrics:load:user:{user_id}:days:{days}"
+
+
+def distribution_cache_key(
+    user_id: UUID, days: int, field: str, buckets: int | None
+) -> str:
+    return (
+        f"metrics:distribution:user:{user_id}:days:{days}:{field}:"
+        f"{buckets or 'default'}"
+    )
+
+
+def summary_compare_cache_key(user_id: UUID, days: int) -> str:
+    return f"metrics:summary-compare:user:{user_id}:days:{days}"
+
+
+SUMMARY_FIELDS = ("total_volume", "avg_volume", "workouts_count")
+
+
+class SummaryComparison(TypedDict):
+    current: MetricsSummaryRow
+    previous: MetricsSummaryRow
+    delta: dict[str, float]
+    delta_pct: dict[str, float | None]
+
+
+def compare_summaries(row: SummaryComparisonRow) -> SummaryComparison:
+    """Абсолютные и процентные изменения; процент — None, если база нулевая."""
+    current, previous = row["current"], row["previous"]
+    delta = {field: current[field] - previous[field] for field in SUMMARY_FIELDS}
+    delta_pct = {
+        field: (
+            round(delta[field] / previous[field] * 100, 2) if previous[field] else None
+        )
+        for field in SUMMARY_FIELDS
+    }
+    return SummaryComparison(
+        current=current, previous=previous, delta=delta, delta_pct=delta_pct
+    )
+
+
+class StreakInfo(TypedDict):
+    current_streak: int
+    longest_streak: int
+    last_training_day: date
+    training_days_this_week: int
+    training_days_last_week: int
+    total_training_days: int
+    avg_days_per_week: float
+
+
+def streak_info(row: StreakRow, today: date) -> StreakInfo:
+    """Серии на ``today``: сохранённые значения отсчитаны от последнего дня.
+
+    Серия продолжается, пока последний тренировочный день — сегодня или вчера;
+    недельные счётчики сдвигаются, если с последней тренировки сменилась неделя.
+    """
+    monday = week_start(today)
+    last = row["last_training_day"]
+    current = row["current_streak"] if last >= today - timedelta(days=1) else 0
+
+    this_week = last_week = 0
+    if row["week_start"] >= monday:
+        this_week, last_week = row["week_days"], row["previous_week_days"]
+    elif row["week_start"] == monday - timedelta(days=7):
+        last_week = row["week_days"]
+
+    weeks = max(((today - row["first_training_day"]).days + 1) / 7, 1.0)
+    return StreakInfo(
+        current_streak=current,
+        longest_streak=row["longest_streak"],
+        last_training_day=last,
+        training_days_this_week=this_week,
+        training_days_last_week=last_week,
+        total_training_days=row["total_days"],
+        avg_days_per_week=round(row["total_days"] / weeks, 2),
+    )
 
 
 class MetricsService:
     """Сервис метрик для текущего пользователя."""
 
-    __slots__ = ("_repo", "_user_id", "_session")
+    __slots__ = ("_repo", "_records", "_streaks", "_user_id", "_session")
 
     def __init__(self, session: AsyncSession, user_id: UUID) -> None:
         self._session = session
         self._repo = MetricsRepository(session)
+        self._records = PersonalRecordRepository(session)
+        self._streaks = TrainingStreakRepository(session)
         self._user_id = user_id
 
-    @cached(key_pattern="metrics:summary:user:{user_id}:days:{days}", ttl=600)
+    @cached(
+        key_builder=lambda self, days: summary_cache_key(self._user_id, days),
+        ttl=SUMMARY_CACHE_TTL,
+    )
     async def get_summary(self, days: int) -> MetricsSummaryRow:
-        """Сводка метрик только для текущего пользователя."""
-        return await self._repo.get_summary(user_id=self._user_id, days=days)
+        """Сводка за последние ``days`` дней (включая сегодня)."""
+        today = utc_today()
+        return await self.get_summary_range(today - timedelta(days=days), today)
 
-    @cached(key_pattern="metrics:timeline:user:{user_id}:days:{days}", ttl=900)
-    async def get_workout_timeline(self, days: int) -> list[WorkoutCountRow]:
+    @cached(
+        key_builder=lambda self, days, granularity="day": timeline_cache_key(
+            self._user_id, days, granularity
+        ),
+        ttl=TIMELINE_CACHE_TTL,
+    )
+    async def get_workout_timeline(
+        self, days: int, granularity: Granularity = "day"
+    ) -> list[TimelinePoint]:
         """Таймлайн тренировок только для текущего пользователя."""
-        rows = await self._repo.get_workout_timeline(user_id=self._user_id, days=days)
-        return list(rows)
+        today = utc_today()
+        columns = await self.get_timeline_range(
+            today - timedelta(days=days), today, granularity
+        )
+        return to_points(columns)
+
+    @cached(
+        key_builder=lambda self, days, granularity="day": timeline_columns_cache_key(
+            self._user_id, days, granularity
+        ),
+        ttl=TIMELINE_CACHE_TTL,
+    )
+    async def get_workout_timeline_columns(
+        self, days: int, granularity: Granularity = "day"
+    ) -> TimelineColumns:
+        """Таймлайн по колонкам для графиков."""
+        today = utc_today()
+        return await self.get_timeline_range(
+            today - timedelta(days=days), today, granularity
+        )
+
+    @cached(
+        key_builder=lambda self, days: summary_compare_cache_key(self._user_id, days),
+        ttl=SUMMARY_CACHE_TTL,
+    )
+    async def get_summary_comparison(self, days: int) -> SummaryComparison:
+        """Сводка за последние ``days`` дней против такого же окна перед ними."""
+        today = utc_today()
+        return await self.get_summary_comparison_range(
+            today - timedelta(days=days), today
+        )
+
+    async def get_summary_comparison_range(
+        self, date_from: date, date_to: date
+    ) -> SummaryComparison:
+        """Сводка за дни [date_from, date_to] против предыдущего окна той же длины."""
+        row = await self._repo.get_summary_comparison(
+            self._user_id, date_from, date_to + timedelta(days=1)
+        )
+        return compare_summaries(row)
+
+    @cached(
+        key_builder=lambda self, days: muscle_groups_cache_key(self._user_id, days),
+        ttl=MUSCLE_GROUPS_CACHE_TTL,
+    )
+    async def get_muscle_groups(self, days: int) -> list[MuscleGroupRow]:
+        """Разбивка объёма по группам мышц за последние ``days`` дней."""
+        today = utc_today()
+        return await self.get_muscle_groups_range(today - timedelta(days=days), today)
+
+    async def get_muscle_groups_range(
+        self, date_from: date, date_to: date
+    ) -> list[MuscleGroupRow]:
+        """Разбивка объёма по группам мышц за дни [date_from, date_to]."""
+        if columns := await self._column_store():
+            return columns.muscle_groups_breakdown(
+                date_from, date_to + timedelta(days=1)
+            )
+        return await self._repo.get_muscle_groups(
+            self._user_id, date_from, date_to + timedelta(days=1)
+        )
+
+    @cached(
+        key_builder=lambda self, days: training_load_cache_key(self._user_id, days),
+        ttl=LOAD_CACHE_TTL,
+    )
+    async def get_training_load(self, days: int) -> TrainingLoadReport:
+        """ACWR, EWMA, монотонность и напряжение за последние ``days`` дней.
+
+        Дневной ряд объёма берётся из таймлайна (закрытые месяцы — из кэша
+        истории) вместе с разгонным периодом и считается векторно в NumPy.
+        """
+        today = utc_today()
+        date_from = today - timedelta(days=days)
+        timeline = await self.get_timeline_range(
+            date_from - timedelta(days=LOAD_WARMUP_DAYS), today, "day"
+        )
+        return build_report(
+            timeline["dates"], timeline["total_volume"], (date_from - EPOCH).days
+        )
+
+    @cached(
+        key_builder=lambda self, field, days, buckets=None: distribution_cache_key(
+            self._user_id, days, field, buckets
+        ),
+        ttl=DISTRIBUTION_CACHE_TTL,
+    )
+    async def get_distribution(
+        self,
+        field: DistributionField,
+        days: int,
+        buckets: int | None = None,
+    ) -> list[DistributionBucketRow]:
+        """Распределение тренировок по значению поля за последние ``days`` дней."""
+        today = utc_today()
+        return await self.get_distribution_range(
+            field, today - timedelta(days=days), today, buckets
+        )
+
+    async def get_distribution_range(
+        self,
+        field: DistributionField,
+        date_from: date,
+        date_to: date,
+        buckets: int | None = None,
+    ) -> list[DistributionBucketRow]:
+        """Распределение за дни [date_from, date_to].
+
+        Без ``buckets`` повторения делятся на диапазоны REP_RANGE_EDGES,
+        остальные поля — на DEFAULT_DISTRIBUTION_BUCKETS равных интервалов.
+        """
+        end = date_to + timedelta(days=1)
+        if buckets is None and field == "reps":
+            return await self._repo.get_distribution(
+                self._user_id, field, date_from, end, edges=REP_RANGE_EDGES
+            )
+        return await self._repo.get_distribution(
+            self._user_id,
+            field,
+            date_from,
+            end,
+            buckets=buckets or DEFAULT_DISTRIBUTION_BUCKETS,
+        )
+
+    async def list_exercise_records(self) -> list[PersonalRecordRow]:
+        """Личные рекорды по всем упражнениям пользователя."""
+        return await self._records.list_records(self._user_id)
+
+    async def get_exercise_record(self, exercise_name: str) -> PersonalRecordRow | None:
+        """Личные рекорды по одному упражнению."""
+        return await self._records.get_record(self._user_id, exercise_name)
+
+    async def get_streaks(self) -> StreakInfo | None:
+        """Серии тренировочных дней: чтение одной строки, без кэша."""
+        row = await self._streaks.get(self._user_id)
+        return streak_info(row, utc_today()) if row is not None else None
+
+    async def get_sessions_count(self, days: int) -> int:
+        """Число тренировочных сессий за последние ``days`` дней (включая сегодня)."""
+        today = utc_today()
+        return await self.get_sessions_count_range(today - timedelta(days=days), today)
+
+    async def get_sessions_count_range(self, date_from: date, date_to: date) -> int:
+        """Число сессий за дни [date_from, date_to]; агрегаты лежат в сессиях."""
+        return await self._repo.count_sessions(
+            self._user_id, date_from, date_to + timedelta(days=1)
+        )
+
+    async def get_sessions_comparison(self, days: int) -> tuple[int, int]:
+        """Число сессий за последние ``days`` дней и за такое же окно перед ними."""
+        today = utc_today()
+        return await self.get_sessions_comparison_range(
+            today - timedelta(days=days), today
+        )
+
+    async def get_sessions_comparison_range(
+        self, date_from: date, date_to: date
+    ) -> tuple[int, int]:
+        """Число сессий за дни [date_from, date_to] и за предыдущее окно."""
+        return await self._repo.count_sessions_comparison(
+            self._user_id, date_from, date_to + timedelta(days=1)
+        )
+
+    async def get_summary_range(
+        self, date_from: date, date_to: date
+    ) -> MetricsSummaryRow:
+        """Сводка за дни [date_from, date_to] из дневного таймлайна."""
+        if columns := await self._column_store():
+            return columns.summary(date_from, date_to + timedelta(days=1))
+        timeline = await self.get_timeline_range(date_from, date_to, "day")
+        total_volume = float(sum(timeline["total_volume"]))
+        workouts_count = sum(timeline["total_sets"])
+        return MetricsSummaryRow(
+            total_volume=total_volume,
+            avg_volume=total_volume / workouts_count if workouts_count else 0.0,
+            workouts_count=workouts_count,
+        )
+
+    async def get_timeline_range(
+        self,
+        date_from: date,
+        date_to: date,
+        granularity: Granularity = "day",
+    ) -> TimelineColumns:
+        """Интервалы, пересекающиеся с днями [date_from, date_to].
+
+        Закрытые интервалы берутся из долгоживущего кэша фрагментов,
+        текущий — из дневных счётчиков в Redis; в БД уходят только промахи.
+        """
+        today = utc_today()
+        current = bucket_start(granularity, today)
+        first = bucket_start(granularity, date_from)
+        last = bucket_start(granularity, min(date_to, today))
+        if columns := await self._column_store():
+            end = min(next_bucket(granularity, last), today + timedelta(days=1))
+            return columns.timeline(first, end, granularity)
+        closed_end = min(next_bucket(granularity, last), current)
+
+        parts: list[TimelineColumns] = []
+        if first < closed_end:
+            parts.extend(await self._closed_timeline(first, closed_end, granularity))
+        if last >= current:
+            parts.append(await self._current_bucket(current, today, granularity))
+        return slice_columns(
+            concat_columns(parts), first, next_bucket(granularity, last)
+        )
+
+    async def _current_bucket(
+        self,
+        current: date,
+        today: date,
+        granularity: Granularity,
+    ) -> TimelineColumns:
+        """Текущий интервал по дням [current, today] из live_counters.
+
+        Незагруженные дни читаются одним запросом; без Redis весь
+        интервал считается в БД.
+        """
+        days = [current + timedelta(days=n) for n in range((today - current).days + 1)]
+        live = await live_counters.read(self._user_id, days)
+        if live is None:
+            return await self._repo.get_timeline_window(
+                self._user_id, current, today + timedelta(days=1), granularity
+            )
+
+        missing = [day for day, counters in zip(days, live) if counters is None]
+        if missing:
+            # Версия берётся до запроса: смена версии отменит запись снимка
+            version = await data_versions.get(self._user_id)
+            rows = await self._repo.get_daily_counters(
+                self._user_id, missing[0], today + timedelta(days=1)
+            )
+            loaded = {day: rows.get(day, EMPTY_DAY_COUNTERS) for day in missing}
+            if version is not None:
+                await live_counters.seed(self._user_id, version, loaded)
+            live = [
+                counters if counters is not None else to_live_day(loaded[day])
+                for day, counters in zip(days, live)
+            ]
+        return bucket_columns(current, live)
+
+    async def _column_store(self) -> UserColumns | None:
+        """Колонки пользователя в памяти процесса, если хранилище включено.
+
+        Загружаются одним запросом при первом обращении и после смены
+        версии данных. Без Redis смену версии в других процессах не увидеть,
+        и хранилище не используется.
+        """
+        if not settings.COLUMN_STORE_ENABLED:
+            return None
+        version = await data_versions.get(self._user_id)
+        if version is None:
+            return None
+        columns = column_store.get(self._user_id, version)
+        if columns is None:
+            row = await self._repo.load_workout_columns(self._user_id)
+            columns = UserColumns(row, version)
+            column_store.put(self._user_id, columns)
+        return columns
+
+    async def _closed_timeline(
+        self,
+        start: date,
+        end: date,
+        granularity: Granularity,
+    ) -> list[TimelineColumns]:
+        """Фрагменты до ``end``: один MGET, промахи — одним запросом к БД."""
+        chunks = chunks_between(granularity, start, end)
+        keys = [
+            history_key(self._user_id, granularity, chunk, min(chunk.end, end))
+            for chunk in chunks
+        ]
+        parts = await cache_manager.get_many(keys)
+        misses = [index for index, part in enumerate(parts) if part is None]
+        if not misses:
+            return parts
+
+        loaded = await self._repo.get_timeline_window(
+            self._user_id,
+            chunks[misses[0]].start,
+            min(chunks[misses[-1]].end, end),
+            granularity,
+        )
+        for index in misses:
+            chunk = chunks[index]
+            parts[index] = slice_columns(loaded, chunk.start, min(chunk.end, end))
+
+        await cache_manager.set_many(
+            {keys[index]: (parts[index], HISTORY_CACHE_TTL) for index in misses}
+        )
+        return parts
@@ -0,0 +1,143 @@
+"""Показатели тренировочной нагрузки по дневному ряду объёма.
+
+Ряд загружается один раз в массив NumPy, все показатели считаются
+векторно, без цикла по дням:
+
+- EWMA острой (7 дней) и хронической (28 дней) нагрузки, λ = 2 / (N + 1);
+- ACWR — отношение острой EWMA к хронической;
+- монотонность (Foster) — среднее / стандартное отклонение за 7 дней;
+- напряжение (strain) — недельная нагрузка × монотонность.
+
+Неопределённые значения (деление на ноль) — NaN, в ответе — null.
+"""
+
+from datetime import timedelta
+from typing import Any, TypedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.repositories.metrics_repo import EPOCH
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+MONOTONY_DAYS = 7
+
+# Рекурсия EWMA раскрывается через cumsum внутри блока; длина блока
+# ограничена, чтобы множители decay ** -k не переполняли float64.
+EWMA_BLOCK = 256
+
+
+class TrainingLoadColumns(TypedDict):
+    """Ряды показателей; dates — номер дня от 1970-01-01."""
+
+    dates: list[int]
+    load: list[float]
+    acute_load: list[float | None]
+    chronic_load: list[float | None]
+    acwr: list[float | None]
+    monotony: list[float | None]
+    strain: list[float | None]
+
+
+class TrainingLoadReport(TypedDict):
+    current: dict[str, Any]
+    series: TrainingLoadColumns
+
+
+LOAD_FIELDS = ("load", "acute_load", "chronic_load", "acwr", "monotony", "strain")
+
+
+def ewma(values: np.ndarray, span: int) -> np.ndarray:
+    """EWMA с λ = 2 / (span + 1) и нулевым начальным значением.
+
+    Внутри блока y_j = decay^(j+1) * carry + λ * Σ decay^(j-k) * x_k,
+    что равно p_j * (carry + λ * cumsum(x / p)_j) при p_j = decay^(j+1).
+    """
+    alpha = 2 / (span + 1)
+    decay = 1 - alpha
+    values = np.asarray(values, dtype=np.float64)
+    result = np.empty_like(values)
+    powers = decay ** np.arange(1, EWMA_BLOCK + 1)
+
+    carry = 0.0
+    for start in range(0, len(values), EWMA_BLOCK):
+        block = values[start : start + EWMA_BLOCK]
+        scale = powers[: len(block)]
+        result[start : start + len(block)] = scale * (
+            carry + alpha * np.cumsum(block / scale)
+        )
+        carry = result[start + len(block) - 1]
+    return result
+
+
+def _windows(values: np.ndarray, size: int) -> np.ndarray:
+    """Окна ``size`` дней, заканчивающиеся в каждом дне; до начала ряда — нули."""
+    padded = np.concatenate((np.zeros(size - 1), values))
+    return sliding_window_view(padded, size)
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    result = np.full_like(numerator, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def training_load(loads: np.ndarray) -> dict[str, np.ndarray]:
+    """Все показатели для непрерывного дневного ряда нагрузки."""
+    loads = np.asarray(loads, dtype=np.float64)
+    acute = ewma(loads, ACUTE_DAYS)
+    chronic = ewma(loads, CHRONIC_DAYS)
+
+    windows = _windows(loads, MONOTONY_DAYS)
+    weekly = windows.sum(axis=1)
+    monotony = _divide(windows.mean(axis=1), windows.std(axis=1))
+
+    return {
+        "load": loads,
+        "acute_load": acute,
+        "chronic_load": chronic,
+        "acwr": _divide(acute, chronic),
+        "monotony": monotony,
+        "strain": weekly * monotony,
+    }
+
+
+def to_columns(
+    dates: np.ndarray,
+    indicators: dict[str, np.ndarray],
+    decimals: int = 3,
+) -> TrainingLoadColumns:
+    """Массивы в JSON-совместимые списки: NaN -> None."""
+    columns = {"dates": np.asarray(dates).tolist()}
+    for field in LOAD_FIELDS:
+        values = indicators[field]
+        rounded = np.round(values, decimals).astype(object)
+        rounded[np.isnan(values)] = None
+        columns[field] = rounded.tolist()
+    return TrainingLoadColumns(**columns)
+
+
+def build_report(
+    dates: list[int],
+    loads: list[float],
+    since_day: int,
+) -> TrainingLoadReport:
+    """Показатели по всему ряду, в ответ — дни начиная с ``since_day``.
+
+    Дни до ``since_day`` служат разгоном для EWMA и окон.
+    """
+    day_numbers = np.asarray(dates, dtype=np.int64)
+    indicators = training_load(np.asarray(loads, dtype=np.float64))
+    keep = day_numbers >= since_day
+    series = to_columns(
+        day_numbers[keep],
+        {field: values[keep] for field, values in indicators.items()},
+    )
+    current: dict[str, Any] = {"date": None}
+    if series["dates"]:
+        current["date"] = EPOCH + timedelta(days=series["dates"][-1])
+    current.update(
+        {field: series[field][-1] if series["dates"] else None for field in LOAD_FIELDS}
+    )
+    return TrainingLoadReport(current=current, series=series)
@@ -1,10 +1,12 @@
 from datetime import datetime
-from uuid import uuid4
+from uuid import UUID, uuid4
 from redis.asyncio import Redis
 from sqlalchemy import select, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.core.cache import cache_manager
+from app.core.config import settings
 from app.db.models.users import Users
 from app.schemas.token import Token
 from app.schemas.users import UserCreate
@@ -66,6 +68,25 @@ class UserService:
             raise HTTPException(status_code=404, detail="User not found")
         return user
 
+    async def get_cached_by_id(self, user_id: UUID) -> Users:
+        """Пользователь из кэша (короткий TTL), при промахе — из БД."""
+        cache_key = f"user:{user_id}"
+        data = await cache_manager.get(cache_key)
+        if data is not None:
+            return Users(
+                id=UUID(data["id"]),
+                email=data["email"],
+                is_active=data["is_active"],
+            )
+
+        user = await self.get_by_id(user_id)
+        await cache_manager.set(
+            cache_key,
+            {"id": str(user.id), "email": user.email, "is_active": user.is_active},
+            ttl=settings.USER_CACHE_TTL,
+        )
+        return user
+
     async def logout(self, token: str) -> None:
         payload = decode_access_token(token)
 
@@ -0,0 +1,184 @@
+"""Потоковый разбор CSV/NDJSON файлов для импорта истории тренировок."""
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any, Awaitable, Literal, NamedTuple, Protocol
+
+ImportFormat = Literal["csv", "ndjson"]
+
+READ_CHUNK_SIZE = 64 * 1024
+# Незакрытая кавычка не должна копить в памяти весь оставшийся файл
+MAX_CSV_RECORD_LINES = 100
+
+INVALID_UTF8 = "invalid UTF-8"
+UNTERMINATED_QUOTE = "unterminated quoted field"
+
+
+class RawRow(NamedTuple):
+    """Сырая строка файла: номер строки и данные либо текст ошибки разбора."""
+
+    line: int
+    data: dict[str, Any] | None
+    error: str | None = None
+
+
+class AsyncReadable(Protocol):
+    def read(self, size: int = -1) -> Awaitable[bytes]: ...
+
+
+async def read_chunks(
+    stream: AsyncReadable,
+    chunk_size: int = READ_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """Читать загруженный файл кусками фиксированного размера."""
+    while chunk := await stream.read(chunk_size):
+        yield chunk
+
+
+def detect_format(
+    filename: str | None, content_type: str | None = None
+) -> ImportFormat:
+    """Определить формат файла по расширению или content-type."""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type in (
+        "application/x-ndjson",
+        "application/jsonl",
+    ):
+        return "ndjson"
+    return "csv"
+
+
+class Line(NamedTuple):
+    """Физическая строка файла; ``invalid`` — строка не в UTF-8."""
+
+    number: int
+    text: str
+    invalid: bool = False
+
+
+def decode_line(number: int, raw: bytes) -> Line:
+    if number == 1:
+        raw = raw.removeprefix(codecs.BOM_UTF8)
+    try:
+        return Line(number, raw.decode("utf-8").rstrip("\r"))
+    except UnicodeDecodeError:
+        # Текст с заменой нужен только для подсчёта кавычек в CSV
+        return Line(number, raw.decode("utf-8", errors="replace").rstrip("\r"), True)
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Line]:
+    """Разбить поток байтов на строки без чтения файла целиком.
+
+    Каждая строка декодируется отдельно (байт \\n не встречается внутри
+    многобайтовых символов UTF-8), и строка не в UTF-8 попадает в отчёт
+    ошибкой, а не в названия упражнений с символами замены.
+    """
+    tail = b""
+    number = 0
+
+    async for chunk in chunks:
+        tail += chunk
+        *lines, tail = tail.split(b"\n")
+        for raw in lines:
+            number += 1
+            yield decode_line(number, raw)
+
+    if tail:
+        yield decode_line(number + 1, tail)
+
+
+async def parse_csv(lines: AsyncIterable[Line]) -> AsyncIterator[RawRow]:
+    """Разобрать CSV с заголовком; пустые ячейки не передаются в валидацию.
+
+    Поле в кавычках может занимать несколько строк: строки копятся, пока
+    число кавычек в записи нечётное, и запись разбирается целиком.
+    """
+    header: list[str] | None = None
+    record: list[Line] = []
+    quotes = 0
+
+    async for line in lines:
+        if not record and not line.text.strip() and not line.invalid:
+            continue
+
+        record.append(line)
+        quotes += line.text.count('"')
+        if quotes % 2 and len(record) < MAX_CSV_RECORD_LINES:
+            continue
+
+        first = record[0].number
+        invalid = any(part.invalid for part in record)
+        texts = [part.text + "\n" for part in record]
+        unterminated = quotes % 2
+        record, quotes = [], 0
+
+        if invalid:
+            yield RawRow(first, None, INVALID_UTF8)
+            continue
+        if unterminated:
+            yield RawRow(first, None, UNTERMINATED_QUOTE)
+            continue
+        try:
+            values = next(csv.reader(texts))
+        except csv.Error as exc:
+            yield RawRow(first, None, f"invalid CSV: {exc}")
+            continue
+
+        if header is None:
+            header = [column.strip() for column in values]
+            continue
+
+        if len(values) != len(header):
+            yield RawRow(
+                first,
+                None,
+                f"expected {len(header)} columns, got {len(values)}",
+            )
+            continue
+
+        yield RawRow(
+            first,
+            {
+                column: value.strip()
+                for column, value in zip(header, values)
+                if value.strip()
+            },
+        )
+
+    if record:
+        yield RawRow(record[0].number, None, UNTERMINATED_QUOTE)
+
+
+async def parse_ndjson(lines: AsyncIterable[Line]) -> AsyncIterator[RawRow]:
+    """Разобрать NDJSON: один JSON-объект на строку."""
+    async for line_no, line, invalid in lines:
+        if invalid:
+            yield RawRow(line_no, None, INVALID_UTF8)
+            continue
+        if not line.strip():
+            continue
+
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield RawRow(line_no, None, f"invalid JSON: {exc.msg}")
+            continue
+
+        if not isinstance(data, dict):
+            yield RawRow(line_no, None, "expected a JSON object")
+            continue
+
+        yield RawRow(line_no, data)
+
+
+def parse_rows(
+    chunks: AsyncIterable[bytes],
+    fmt: ImportFormat,
+) -> AsyncIterator[RawRow]:
+    """Построчный парсер выбранного формата поверх потока байтов."""
+    lines = iter_lines(chunks)
+    if fmt == "ndjson":
+        return parse_ndjson(lines)
+    return parse_csv(lines)
@@ -1,40 +1,438 @@
 """Слой бизнес-логики для операций с тренировками."""
 
-from collections.abc import Sequence
-from uuid import UUID
+from collections.abc import AsyncIterable, Awaitable, Callable, Iterable
+from datetime import date, timezone
+from functools import partial
+from uuid import UUID, uuid4
 
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.workouts import Workout
-from app.repositories.workout_repo import WorkoutRepository
-from app.schemas.workout import WorkoutCreate
+from app.db.session import after_commit, replica_router
+from app.repositories.records_repo import PersonalRecordRepository
+from app.repositories.streaks_repo import TrainingStreakRepository
+from app.repositories.workout_repo import (
+    WORKOUT_SESSION_COPY_COLUMNS,
+    StoredWorkoutRow,
+    WorkoutRepository,
+    WorkoutRow,
+    WorkoutSessionRow,
+)
+from app.schemas.workout import (
+    ImportReport,
+    ImportRowError,
+    WorkoutCreate,
+    WorkoutImportRow,
+    WorkoutSessionCreate,
+    WorkoutUpdate,
+    utc_today,
+)
+from app.services.column_store import column_store
+from app.services.leaderboards import LeaderboardService, leaderboards
+from app.services.live_counters import live_counters
+from app.services.metrics_history import invalidate_history
+from app.services.workout_import import RawRow
 from app.core.cache import cache_manager
+from app.core.data_version import data_versions
+from app.core.exceptions import WorkoutNotFoundException
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+_import_batch_adapter = TypeAdapter(list[WorkoutImportRow])
 
 
 class WorkoutService:
     """Сервис для бизнес-логики работы с тренировками."""
 
-    __slots__ = ("_session", "_repo", "_user_id")
+    __slots__ = (
+        "_session",
+        "_repo",
+        "_records",
+        "_streaks",
+        "_leaderboards",
+        "_user_id",
+    )
 
     def __init__(self, session: AsyncSession, user_id: UUID) -> None:
         self._session = session
         self._repo = WorkoutRepository(session)
+        self._records = PersonalRecordRepository(session)
+        self._streaks = TrainingStreakRepository(session)
+        self._leaderboards = LeaderboardService(session)
         self._user_id = user_id
 
     async def _invalidate_metrics_cache(self) -> None:
         """Инвалидация кэша только для текущего пользователя."""
-        await cache_manager.delete_pattern(f"metrics:summary:user:{self._user_id}:*")
+        await cache_manager.delete_pattern(f"metrics:*:user:{self._user_id}:*")
+
+    async def _invalidate_derived(self, days: set[date], keep_live: bool) -> None:
+        """Сбросить версию данных, кэш метрик и затронутые исторические окна.
+
+        Без ``keep_live`` сбрасываются и дневные счётчики этих дней.
+        """
+        await data_versions.bump(self._user_id)
+        await self._invalidate_metrics_cache()
+        await invalidate_history(self._user_id, days)
+        if not keep_live:
+            await live_counters.invalidate(self._user_id, days)
+
+    async def _after_write(
+        self,
+        days: Iterable[date],
+        record_live: Callable[[], Awaitable[None]] | None = None,
+    ) -> None:
+        """Общие действия после изменения тренировок пользователя.
+
+        Сброс повторяется после коммита: чтение, попавшее между первым
+        сбросом и коммитом, могло снова закэшировать старые данные.
+        ``record_live`` увеличивает дневные счётчики вместо их сброса;
+        вызывается после коммита и после смены версии данных (её требует
+        проверка версии при загрузке счётчиков), после него версия и кэш
+        метрик сбрасываются ещё раз.
+        """
+        days = set(days)
+        keep_live = record_live is not None
+        await replica_router.pin_to_primary(self._user_id)
+        await self._invalidate_derived(days, keep_live)
+        after_commit(self._session, lambda: self._after_commit(days, record_live))
+
+    async def _after_commit(
+        self,
+        days: set[date],
+        record_live: Callable[[], Awaitable[None]] | None,
+    ) -> None:
+        await self._invalidate_derived(days, keep_live=record_live is not None)
+        if record_live is not None:
+            await record_live()
+            # Чтение между сбросом и record_live видело счётчики без этой
+            # записи и могло закэшировать метрики под уже новой версией
+            await data_versions.bump(self._user_id)
+            await self._invalidate_metrics_cache()
+        version = await data_versions.get(self._user_id)
+        if version is None:
+            column_store.evict(self._user_id)
+        else:
+            column_store.confirm(self._user_id, version)
 
     async def create_workout(self, payload: WorkoutCreate) -> Workout:
         """Создать новую тренировку (user_id подставляется автоматически)."""
         workout = await self._repo.create_workout(payload, self._user_id)
-        await self._invalidate_metrics_cache()
+        await self._records.record_workout(
+            self._user_id,
+            workout.exercise_id,
+            weight=workout.weight,
+            reps=workout.reps,
+            total_volume=workout.total_volume,
+        )
+        # performed_at выставляется сервером (now()); день берётся из него же,
+        # а не из часов процесса — иначе около полуночи дни бы разошлись
+        day = workout.performed_at.date()
+        await self._streaks.record_day(self._user_id, day)
+        column_store.append(
+            self._user_id,
+            day=day,
+            exercise_id=workout.exercise_id,
+            muscle_group=workout.exercise.muscle_group,
+            sets=workout.sets,
+            reps=workout.reps,
+            weight=workout.weight,
+            volume=workout.total_volume,
+        )
+        await self._after_write(
+            [day],
+            record_live=partial(
+                live_counters.record,
+                self._user_id,
+                day,
+                workout.id,
+                workout.exercise_id,
+                volume=workout.total_volume,
+                weight=workout.weight,
+            ),
+        )
+        # ZINCRBY не идемпотентен: рейтинг обновляется только после коммита
+        after_commit(
+            self._session,
+            partial(
+                leaderboards.record_workout,
+                self._user_id,
+                workout.exercise_id,
+                day,
+                volume=workout.total_volume,
+                weight=workout.weight,
+            ),
+        )
         return workout
 
-    async def list_workouts(self, limit: int, offset: int) -> Sequence[Workout]:
+    async def create_session(self, payload: WorkoutSessionCreate) -> WorkoutSessionRow:
+        """Создать сессию со всеми подходами в одной транзакции.
+
+        Производные данные обновляются один раз на сессию: рекорды
+        пересчитываются по её упражнениям, рейтинги — суммой по упражнению.
+        """
+        row = await self._repo.create_session(payload, self._user_id)
+        day = row["started_at"].date()
+        workouts = row["workouts"]
+
+        await self._records.rebuild(
+            self._user_id, {workout["exercise"]["id"] for workout in workouts}
+        )
+        if day == utc_today():
+            await self._streaks.record_day(self._user_id, day)
+        else:
+            await self._streaks.rebuild(self._user_id)
+        # Сессия задним числом нарушила бы порядок строк по дню
+        column_store.evict(self._user_id)
+
+        scores: dict[UUID, tuple[float, float]] = {}
+        for workout in workouts:
+            volume, weight = scores.get(workout["exercise"]["id"], (0.0, 0.0))
+            scores[workout["exercise"]["id"]] = (
+                volume + workout["total_volume"],
+                max(weight, workout["weight"]),
+            )
+
+        await self._after_write(
+            [day], record_live=partial(self._record_live_session, day, workouts)
+        )
+        after_commit(self._session, partial(self._record_session_scores, day, scores))
+        return row
+
+    async def _record_live_session(self, day: date, workouts: list[WorkoutRow]) -> None:
+        for workout in workouts:
+            await live_counters.record(
+                self._user_id,
+                day,
+                workout["id"],
+                workout["exercise"]["id"],
+                volume=workout["total_volume"],
+                weight=workout["weight"],
+            )
+
+    async def _record_session_scores(
+        self, day: date, scores: dict[UUID, tuple[float, float]]
+    ) -> None:
+        """Рейтинги сессии: ``{exercise_id: (объём, лучший вес)}``."""
+        for exercise_id, (volume, weight) in scores.items():
+            await leaderboards.record_workout(
+                self._user_id, exercise_id, day, volume=volume, weight=weight
+            )
+
+    async def update_workout(
+        self, workout_id: UUID, payload: WorkoutUpdate
+    ) -> StoredWorkoutRow:
+        """Исправить подходы, повторения или вес тренировки.
+
+        Производные данные сдвигаются на разность старой и новой строки.
+        """
+        old = await self._get_workout(workout_id)
+        new = StoredWorkoutRow(**{**old, **payload.model_dump(exclude_none=True)})
+        new["total_volume"] = new["sets"] * new["reps"] * new["weight"]
+        if all(new[field] == old[field] for field in ("sets", "reps", "weight")):
+            return old
+
+        await self._repo.update_workout(new)
+        await self._apply_change(old, new)
+        return new
+
+    async def delete_workout(self, workout_id: UUID) -> None:
+        """Удалить тренировку, вычтя её из производных данных."""
+        old = await self._get_workout(workout_id)
+        await self._repo.delete_workout(old)
+        await self._apply_change(old, None)
+
+    async def _get_workout(self, workout_id: UUID) -> StoredWorkoutRow:
+        row = await self._repo.get_workout_for_update(workout_id, self._user_id)
+        if row is None:
+            raise WorkoutNotFoundException()
+        return row
+
+    async def _apply_change(
+        self, old: StoredWorkoutRow, new: StoredWorkoutRow | None
+    ) -> None:
+        """Применить разность строки (``new is None`` — удаление) к производным.
+
+        Сессия, рекорды и рейтинги обновляются на разность. Полный пересчёт
+        остаётся только там, где разности недостаточно: рекорд, который
+        держала строка, при уменьшении (одна пара пользователь–упражнение)
+        и серии, если удалена последняя тренировка дня. Дневные счётчики
+        дня сбрасываются: после коммита их могли уже загрузить с новыми
+        значениями, и разность учлась бы дважды.
+        """
+        day = old["performed_at"].date()
+        exercise_id = old["exercise"]["id"]
+        volume_delta = (new["total_volume"] if new else 0.0) - old["total_volume"]
+
+        if old["session_id"] is not None:
+            if new is None:
+                await self._repo.remove_from_session(
+                    old["session_id"], exercise_id, old["sets"], old["total_volume"]
+                )
+            else:
+                await self._repo.apply_session_delta(
+                    old["session_id"], new["sets"] - old["sets"], volume_delta
+                )
+
+        best_weight = await self._records.apply_change(
+            self._user_id, exercise_id, old, new
+        )
+        if new is None and not await self._repo.has_workouts_on_day(self._user_id, day):
+            await self._streaks.rebuild(self._user_id)
+        # Строки колонок не хранят id тренировки — копия перестраивается
+        column_store.evict(self._user_id)
+
+        await self._after_write([day])
+        after_commit(
+            self._session,
+            partial(
+                leaderboards.apply_change,
+                self._user_id,
+                exercise_id,
+                day,
+                volume_delta,
+                best_weight,
+            ),
+        )
+
+    async def list_workouts(self, limit: int, offset: int) -> list[WorkoutRow]:
         """Получить список тренировок текущего пользователя."""
         return await self._repo.list_workouts(
             user_id=self._user_id,
             limit=limit,
             offset=offset,
         )
+
+    async def import_workouts(
+        self,
+        rows: AsyncIterable[RawRow],
+        batch_size: int = IMPORT_BATCH_SIZE,
+        on_progress: Callable[[ImportReport], None] | None = None,
+    ) -> ImportReport:
+        """Импорт истории тренировок пачками: валидация, упражнения, COPY.
+
+        Подходы каждого дня объединяются в сессию этого импорта. Производные
+        агрегаты (сессии, личные рекорды, серии, кэш метрик) пересчитываются
+        один раз в конце.
+        """
+        report = ImportReport()
+        batch: list[RawRow] = []
+        sessions: dict[date, UUID] = {}
+        exercise_ids: set[UUID] = set()
+
+        async for row in rows:
+            report.total_rows += 1
+            if row.error is not None:
+                self._add_import_error(report, row.line, [row.error])
+                continue
+
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await self._import_batch(batch, report, sessions, exercise_ids)
+                batch = []
+                if on_progress:
+                    on_progress(report)
+
+        if batch:
+            await self._import_batch(batch, report, sessions, exercise_ids)
+        if on_progress:
+            on_progress(report)
+
+        report.errors.sort(key=lambda error: error.line)
+        if report.imported:
+            days = set(sessions)
+            await self._repo.refresh_session_totals(sessions.values())
+            column_store.evict(self._user_id)
+            await self._records.rebuild(self._user_id, exercise_ids)
+            await self._streaks.rebuild(self._user_id)
+            volumes, weights = await self._leaderboards.user_scores(
+                self._user_id, days, exercise_ids, utc_today()
+            )
+            after_commit(
+                self._session,
+                partial(leaderboards.set_user_scores, self._user_id, volumes, weights),
+            )
+            await self._after_write(days)
+        return report
+
+    async def _import_batch(
+        self,
+        batch: list[RawRow],
+        report: ImportReport,
+        sessions: dict[date, UUID],
+        exercise_ids: set[UUID],
+    ) -> None:
+        """Провалидировать пачку целиком и загрузить корректные строки.
+
+        Для новых дат создаются сессии (``sessions``: день -> id), упражнения
+        добавляются в ``exercise_ids`` для точечного пересчёта производных данных.
+        """
+        valid_rows = self._validate_import_batch(batch, report)
+        if not valid_rows:
+            return
+
+        resolved = await self._repo.resolve_exercises(
+            {item.exercise_name: item.muscle_group for item in valid_rows}
+        )
+        exercise_ids.update(resolved.values())
+
+        rows = []
+        for item in valid_rows:
+            performed_at = item.performed_at
+            if performed_at.tzinfo is not None:
+                performed_at = performed_at.astimezone(timezone.utc).replace(
+                    tzinfo=None
+                )
+            rows.append((item, performed_at))
+        new_days = {performed_at.date() for _, performed_at in rows} - set(sessions)
+        sessions.update(await self._repo.create_day_sessions(self._user_id, new_days))
+
+        records = []
+        for item, performed_at in rows:
+            records.append(
+                (
+                    uuid4(),
+                    self._user_id,
+                    resolved[item.exercise_name],
+                    performed_at,
+                    item.sets,
+                    item.reps,
+                    item.weight,
+                    item.sets * item.reps * item.weight,
+                    sessions[performed_at.date()],
+                )
+            )
+
+        report.imported += await self._repo.copy_workouts(
+            records, WORKOUT_SESSION_COPY_COLUMNS
+        )
+
+    def _validate_import_batch(
+        self,
+        batch: list[RawRow],
+        report: ImportReport,
+    ) -> list[WorkoutImportRow]:
+        """Валидация пачки одним вызовом; при ошибках отбрасываются только плохие строки."""
+        raw = [row.data for row in batch]
+        try:
+            return _import_batch_adapter.validate_python(raw)
+        except ValidationError as exc:
+            errors_by_index: dict[int, list[str]] = {}
+            for error in exc.errors():
+                index = error["loc"][0]
+                field = ".".join(str(part) for part in error["loc"][1:])
+                message = f"{field}: {error['msg']}" if field else error["msg"]
+                errors_by_index.setdefault(index, []).append(message)
+
+        for index, messages in sorted(errors_by_index.items()):
+            self._add_import_error(report, batch[index].line, messages)
+
+        valid = [item for index, item in enumerate(raw) if index not in errors_by_index]
+        return _import_batch_adapter.validate_python(valid)
+
+    @staticmethod
+    def _add_import_error(report: ImportReport, line: int, messages: list[str]) -> None:
+        report.failed += 1
+        if len(report.errors) < IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(ImportRowError(line=line, errors=messages))
@@ -37,21 +37,23 @@ async function apiRequest(endpoint, options = {}) {
 }
 
 // Загрузка данных
+// Сводка, таймлайн и последние тренировки приходят одним запросом
 async function loadDashboardData() {
     try {
-        await Promise.all([
-            loadMetricsSummary(),
-            loadTimeline(),
-            loadWorkouts()
-        ]);
+        // За год — по неделям: 365 точек графику не нужны
+        const granularity = currentPeriod > 90 ? 'week' : 'day';
+        const data = await apiRequest(
+            `/metrics/dashboard?days=${currentPeriod}&format=columnar&granularity=${granularity}`
+        );
+        renderMetricsSummary(data.summary);
+        renderTimeline(data.timeline);
+        renderWorkouts(data.recent_workouts);
     } catch (error) {
         console.error('Ошибка загрузки данных:', error);
     }
 }
 
-async function loadMetricsSummary() {
-    const data = await apiRequest(`/metrics/summary?days=${currentPeriod}`);
-    
+function renderMetricsSummary(data) {
     document.getElementById('total-volume').textContent = 
         `${Math.round(data.total_volume)} кг`;
     document.getElementById('workouts-count').textContent = 
@@ -60,22 +62,21 @@ async function loadMetricsSummary() {
         `${Math.round(data.avg_volume)} кг`;
 }
 
-async function loadTimeline() {
-    const data = await apiRequest(`/metrics/timeline?days=${currentPeriod}`);
-    
-    if (!data || data.length === 0) {
+// Таймлайн приходит колонками, даты — номер дня от 1970-01-01
+function renderTimeline(data) {
+    if (!data || data.dates.length === 0) {
         console.warn('Нет данных для графиков');
         return;
     }
     
-    const labels = data.map(item => {
-        const date = new Date(item.date);
-        return date.toLocaleDateString('ru-RU', { day: 'numeric', month: 'short' });
+    const labels = data.dates.map(epochDay => {
+        const date = new Date(epochDay * 86400000);
+        return date.toLocaleDateString('ru-RU', { day: 'numeric', month: 'short', timeZone: 'UTC' });
     });
-    const volumes = data.map(item => item.total_volume);
-    const workoutsCounts = data.map(item => item.workouts_count);
-    const avgWeights = data.map(item => item.avg_weight || 0);
-    const totalSets = data.map(item => item.total_sets);
+    const volumes = data.total_volume;
+    const workoutsCounts = data.workouts_count;
+    const avgWeights = data.avg_weight.map(weight => weight || 0);
+    const totalSets = data.total_sets;
     
     // Volume Chart
     updateChart('volumeChart', {
@@ -152,8 +153,7 @@ async function loadTimeline() {
     });
 }
 
-async function loadWorkouts() {
-    const data = await apiRequest('/workouts?limit=10&offset=0');
+function renderWorkouts(data) {
     const container = document.getElementById('workouts-list');
     
     if (data.length === 0) {
@@ -224,8 +224,7 @@ function setTimePeriod(days) {
     });
     event.target.classList.add('active');
     
-    loadMetricsSummary();
-    loadTimeline();
+    loadDashboardData();
 }
 
 // Modal
@@ -0,0 +1,136 @@
+"""Бенчмарк чтения страницы тренировок: ORM + WorkoutOut против Core JOIN.
+
+Создаёт во временной транзакции пользователя с тренировками, замеряет
+строки в секунду для страниц разного размера и откатывает транзакцию.
+
+Пример:
+    python -m scripts.bench_list_workouts --pages 10 100 1000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.api.responses import FastJSONResponse
+from app.core.security import get_password_hash
+from app.db.models.users import Users
+from app.db.models.workouts import Workout
+from app.db.session import AsyncSessionLocal
+from app.repositories.workout_repo import WorkoutRepository
+from app.schemas.workout import WorkoutOut
+
+_workouts_adapter = TypeAdapter(list[WorkoutOut])
+
+
+async def seed(session: AsyncSession, count: int):
+    user = Users(
+        email=f"bench_{uuid4().hex}@example.com",
+        hashed_password=get_password_hash("bench123"),
+        is_active=True,
+    )
+    session.add(user)
+    await session.flush()
+
+    repo = WorkoutRepository(session)
+    exercise_ids = await repo.resolve_exercises(
+        {f"Bench Exercise {i}": "general" for i in range(5)}
+    )
+    ids = list(exercise_ids.values())
+    now = datetime.now()
+    await repo.copy_workouts(
+        [
+            (
+                uuid4(),
+                user.id,
+                ids[i % 5],
+                now - timedelta(hours=i),
+                3,
+                10,
+                50.0,
+                1500.0,
+            )
+            for i in range(count)
+        ]
+    )
+    return user.id
+
+
+async def orm_page(session: AsyncSession, user_id, limit: int) -> bytes:
+    """Прежний путь: ORM + selectinload + валидация WorkoutOut."""
+    stmt = (
+        select(Workout)
+        .where(Workout.user_id == user_id)
+        .options(selectinload(Workout.exercise))
+        .limit(limit)
+        .order_by(Workout.performed_at.desc())
+    )
+    workouts = (await session.execute(stmt)).scalars().all()
+    content = _workouts_adapter.dump_python(
+        _workouts_adapter.validate_python(workouts, from_attributes=True),
+        mode="json",
+    )
+    body = JSONResponse(jsonable_encoder(content)).body
+    session.expunge_all()
+    return body
+
+
+async def core_page(session: AsyncSession, user_id, limit: int) -> bytes:
+    """Новый путь: один JOIN, словари, orjson."""
+    rows = await WorkoutRepository(session).list_workouts(user_id, limit=limit)
+    return FastJSONResponse(rows).body
+
+
+async def rows_per_second(
+    func: Callable[[AsyncSession, object, int], Awaitable[bytes]],
+    session: AsyncSession,
+    user_id,
+    limit: int,
+    iterations: int,
+) -> float:
+    await func(session, user_id, limit)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func(session, user_id, limit)
+    return limit * iterations / (time.perf_counter() - start)
+
+
+async def run(pages: list[int], iterations: int) -> None:
+    async with AsyncSessionLocal() as session:
+        transaction = await session.begin()
+        try:
+            user_id = await seed(session, max(pages))
+            print(
+                f"{'строк':>7}{'ORM, строк/с':>16}{'Core, строк/с':>17}{'ускорение':>12}"
+            )
+            for limit in pages:
+                orm = await rows_per_second(
+                    orm_page, session, user_id, limit, iterations
+                )
+                core = await rows_per_second(
+                    core_page, session, user_id, limit, iterations
+                )
+                print(f"{limit:>7}{orm:>16.0f}{core:>17.0f}{core / orm:>11.1f}x")
+        finally:
+            await transaction.rollback()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк GET /workouts")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.pages, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Бенчмарк помесячных секций: секционированная workouts против обычной.
+
+Строит в отдельной схеме ``bench_partitions`` две таблицы с одинаковыми
+синтетическими строками (по умолчанию 50 млн за 5 лет) — обычную и
+секционированную по месяцам, как workouts, — и сравнивает запросы
+репозитория: период пользователя, агрегат за месяц, поиск по id и
+удаление старого месяца (DELETE против DROP секции, с откатом).
+
+Загрузка 50 млн строк занимает десятки минут и ~20 ГБ на диске;
+``--keep`` оставляет схему для повторных замеров без загрузки.
+
+Пример:
+    python -m scripts.bench_partitions
+    python -m scripts.bench_partitions --rows 1000000 --users 2000 --keep
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db.session import engine
+from app.repositories.partition_repo import month_start
+
+SCHEMA = "bench_partitions"
+CHUNK_ROWS = 1_000_000
+
+COLUMNS = """
+    user_id uuid NOT NULL,
+    performed_at timestamp NOT NULL,
+    sets integer NOT NULL,
+    reps integer NOT NULL,
+    weight double precision NOT NULL,
+    total_volume double precision NOT NULL,
+    exercise_id uuid NOT NULL,
+    id uuid NOT NULL,
+    session_id uuid
+"""
+
+# Запросы в форме, которую строят репозитории: {table} — plain или parted
+QUERIES = {
+    "период пользователя, 30 дней": """
+        SELECT count(*), sum(total_volume) FROM {table}
+        WHERE user_id = :user_id
+          AND performed_at >= CAST(:day_start AS timestamp) - interval '30 days'
+          AND performed_at < :day_start
+    """,
+    "тренировки пользователя за месяц": """
+        SELECT id, performed_at, total_volume FROM {table}
+        WHERE user_id = :user_id
+          AND performed_at >= :month
+          AND performed_at < CAST(:month AS timestamp) + interval '1 month'
+        ORDER BY performed_at DESC
+    """,
+    "агрегат всех за месяц": """
+        SELECT count(*), sum(total_volume) FROM {table}
+        WHERE performed_at >= :month
+          AND performed_at < CAST(:month AS timestamp) + interval '1 month'
+    """,
+    "поиск по id (без отсечения)": """
+        SELECT * FROM {table} WHERE id = :id
+    """,
+}
+
+
+def user_uuid(number: int) -> UUID:
+    """Тот же id пользователя, что генерирует load() в SQL."""
+    return UUID(int=number + 1)
+
+
+async def create_tables(conn: AsyncConnection, months: list[date]) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(
+        text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))")
+    )
+    await conn.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.parted ({COLUMNS},"
+            " PRIMARY KEY (id, performed_at)) PARTITION BY RANGE (performed_at)"
+        )
+    )
+    for month in months:
+        await conn.execute(
+            text(
+                f"CREATE TABLE {SCHEMA}.parted_{month:%Y_%m}"
+                f" PARTITION OF {SCHEMA}.parted"
+                f" FOR VALUES FROM ('{month}') TO ('{month_start(month, 1)}')"
+            )
+        )
+    await conn.execute(
+        text(
+            f"CREATE TABLE {SCHEMA}.parted_default PARTITION OF {SCHEMA}.parted DEFAULT"
+        )
+    )
+
+
+async def load(
+    conn: AsyncConnection, rows: int, users: int, first: date, last: date
+) -> None:
+    """Одинаковые строки в обе таблицы порциями по CHUNK_ROWS."""
+    span = (last - first).days * 86400
+    for offset in range(0, rows, CHUNK_ROWS):
+        count = min(CHUNK_ROWS, rows - offset)
+        params = {
+            "start": offset,
+            "stop": offset + count - 1,
+            "users": users,
+            "first": first,
+            "span": span,
+        }
+        await conn.execute(
+            text(
+                f"""
+                INSERT INTO {SCHEMA}.plain
+                SELECT
+                    lpad(to_hex(g % :users + 1), 32, '0')::uuid,
+                    CAST(:first AS timestamp)
+                        + random() * CAST(:span AS float) * interval '1 second',
+                    3, 10, w, 30 * w,
+                    lpad(to_hex(g % 50 + 1), 32, '0')::uuid,
+                    gen_random_uuid(),
+                    NULL
+                FROM generate_series(CAST(:start AS bigint), :stop) AS g,
+                    LATERAL (
+                        SELECT round((20 + random() * 180)::numeric, 1)::float AS w
+                    ) AS weights
+                """
+            ),
+            params,
+        )
+        await conn.commit()
+        print(f"  загружено {offset + count:,} строк", flush=True)
+
+    await conn.execute(
+        text(f"INSERT INTO {SCHEMA}.parted SELECT * FROM {SCHEMA}.plain")
+    )
+    for table in ("plain", "parted"):
+        await conn.execute(
+            text(f"CREATE INDEX ON {SCHEMA}.{table} (user_id, performed_at)")
+        )
+        await conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+    await conn.commit()
+
+
+async def timed_ms(conn: AsyncConnection, sql: str, params: Mapping[str, Any]) -> float:
+    start = time.perf_counter()
+    (await conn.execute(text(sql), params)).all()
+    return (time.perf_counter() - start) * 1000
+
+
+async def compare(
+    conn: AsyncConnection,
+    users: int,
+    months: list[date],
+    repeat: int,
+) -> None:
+    rng = random.Random(42)
+    sample_ids = list(
+        (
+            await conn.execute(
+                text(f"SELECT id FROM {SCHEMA}.plain TABLESAMPLE SYSTEM (1) LIMIT :n"),
+                {"n": repeat},
+            )
+        ).scalars()
+    )
+    day_start = datetime.combine(months[-1] - timedelta(days=1), datetime.min.time())
+
+    print(f"{'запрос':<36}{'обычная, мс':>14}{'секции, мс':>14}{'ускорение':>12}")
+    for name, sql in QUERIES.items():
+        timings: dict[str, list[float]] = {"plain": [], "parted": []}
+        for index in range(repeat):
+            params = {
+                "user_id": user_uuid(rng.randrange(users)),
+                "day_start": day_start,
+                "month": datetime.combine(rng.choice(months[:-1]), datetime.min.time()),
+                "id": sample_ids[index % len(sample_ids)] if sample_ids else None,
+            }
+            # Прогрев и чередование, чтобы кэш страниц не давал форы второй
+            for table in ("plain", "parted", "parted", "plain"):
+                timings[table].append(
+                    await timed_ms(conn, sql.format(table=f"{SCHEMA}.{table}"), params)
+                )
+        plain = statistics.median(timings["plain"])
+        parted = statistics.median(timings["parted"])
+        print(f"{name:<36}{plain:>14.2f}{parted:>14.2f}{plain / parted:>11.1f}x")
+
+    await conn.commit()
+    oldest = datetime.combine(months[0], datetime.min.time())
+    oldest_partition = f"{SCHEMA}.parted_{oldest:%Y_%m}"
+    retention = {
+        "plain": [
+            f"DELETE FROM {SCHEMA}.plain"
+            f" WHERE performed_at < '{month_start(oldest.date(), 1)}'"
+        ],
+        "parted": [
+            f"ALTER TABLE {SCHEMA}.parted DETACH PARTITION {oldest_partition}",
+            f"DROP TABLE {oldest_partition}",
+        ],
+    }
+    result = {}
+    for table, statements in retention.items():
+        transaction = await conn.begin()
+        start = time.perf_counter()
+        for statement in statements:
+            await conn.execute(text(statement))
+        result[table] = (time.perf_counter() - start) * 1000
+        await transaction.rollback()
+    print(
+        f"{'удаление старого месяца':<36}{result['plain']:>14.2f}"
+        f"{result['parted']:>14.2f}{result['plain'] / result['parted']:>11.1f}x"
+    )
+
+
+async def run(rows: int, users: int, years: int, repeat: int, keep: bool) -> None:
+    last = month_start(date.today(), 1)
+    months = [month_start(last, -shift) for shift in range(years * 12, 0, -1)]
+    months.append(last)
+    async with engine.connect() as conn:
+        exists = (
+            await conn.execute(
+                text("SELECT to_regclass(:name)"), {"name": f"{SCHEMA}.parted"}
+            )
+        ).scalar_one()
+        await conn.commit()
+        if not (keep and exists):
+            print(f"Загрузка {rows:,} строк, {users:,} пользователей, {years} лет")
+            await create_tables(conn, months)
+            await conn.commit()
+            await load(conn, rows, users, months[0], last)
+        await conn.commit()
+        try:
+            await compare(conn, users, months, repeat)
+        finally:
+            if not keep:
+                await conn.rollback()
+                await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+                await conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк секций workouts")
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--keep", action="store_true", help="оставить схему и не загружать повторно"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.users, args.years, args.repeat, args.keep))
+
+
+if __name__ == "__main__":
+    main()
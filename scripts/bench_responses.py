@@ -0,0 +1,145 @@
+"""Бенчмарк ответов API: размер на проводе и CPU на сериализацию.
+
+Сравнивает стандартный путь FastAPI (jsonable_encoder + JSONResponse)
+с orjson (FastJSONResponse) и сжатие gzip/brotli на полезной нагрузке,
+повторяющей ответы основных эндпоинтов.
+
+Пример:
+    python -m scripts.bench_responses --repeat 200
+"""
+
+import argparse
+import gzip
+import random
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.responses import FastJSONResponse
+from app.core.middleware import brotli
+
+EXERCISES = [
+    ("Bench Press", "Chest"),
+    ("Squat", "Legs"),
+    ("Deadlift", "Back"),
+    ("Overhead Press", "Shoulders"),
+    ("Barbell Row", "Back"),
+]
+
+
+def make_timeline(days: int) -> list[dict[str, Any]]:
+    today = date.today()
+    return [
+        {
+            "date": today - timedelta(days=offset),
+            "workouts_count": random.randint(0, 4),
+            "total_sets": random.randint(0, 20),
+            "total_volume": round(random.uniform(0, 12000), 2),
+            "avg_weight": round(random.uniform(20, 140), 2),
+        }
+        for offset in range(days, -1, -1)
+    ]
+
+
+def make_workouts(count: int) -> list[dict[str, Any]]:
+    user_id = uuid4()
+    exercises = [
+        {"id": uuid4(), "name": name, "muscle_group": group}
+        for name, group in EXERCISES
+    ]
+    now = datetime.now()
+    workouts = []
+    for index in range(count):
+        sets, reps, weight = random.randint(1, 5), random.randint(3, 12), 80.0
+        workouts.append(
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "performed_at": now - timedelta(hours=index * 7),
+                "sets": sets,
+                "reps": reps,
+                "weight": weight,
+                "total_volume": sets * reps * weight,
+                "exercise": random.choice(exercises),
+            }
+        )
+    return workouts
+
+
+def build_payloads() -> dict[str, Any]:
+    summary = {"total_volume": 86000.0, "avg_volume": 2866.67, "workouts_count": 30}
+    return {
+        "GET /metrics/summary": summary,
+        "GET /metrics/timeline?days=30": make_timeline(30),
+        "GET /metrics/timeline?days=365": make_timeline(365),
+        "GET /metrics/dashboard?days=365": {
+            "summary": summary,
+            "timeline": make_timeline(365),
+            "recent_workouts": make_workouts(10),
+            "cache": {"summary": "hit", "timeline": "hit", "recent_workouts": "miss"},
+        },
+        "GET /workouts?limit=100": make_workouts(100),
+        "GET /workouts?limit=1000": make_workouts(1000),
+    }
+
+
+def measure_us(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее из трёх средних времён вызова, мкс."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации ответов")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    args = parser.parse_args()
+
+    random.seed(42)
+    header = (
+        f"{'эндпоинт':<34}{'json, мкс':>11}{'orjson, мкс':>13}"
+        f"{'байт':>9}{'gzip':>8}{'br':>8}{'gzip, мкс':>11}{'br, мкс':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for name, payload in build_payloads().items():
+        json_us = measure_us(
+            lambda: JSONResponse(jsonable_encoder(payload)).body, args.repeat
+        )
+        orjson_us = measure_us(lambda: FastJSONResponse(payload).body, args.repeat)
+
+        body = FastJSONResponse(payload).body
+        gzip_size = len(gzip.compress(body, compresslevel=args.gzip_level))
+        gzip_us = measure_us(
+            lambda: gzip.compress(body, compresslevel=args.gzip_level), args.repeat
+        )
+        if brotli is not None:
+            br_size = str(len(brotli.compress(body, quality=args.brotli_quality)))
+            br_time = measure_us(
+                lambda: brotli.compress(body, quality=args.brotli_quality),
+                args.repeat,
+            )
+            br_us = f"{br_time:.0f}"
+        else:
+            br_size = br_us = "—"
+
+        print(
+            f"{name:<34}{json_us:>11.0f}{orjson_us:>13.0f}"
+            f"{len(body):>9}{gzip_size:>8}{br_size:>8}{gzip_us:>11.0f}{br_us:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
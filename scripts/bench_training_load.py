@@ -0,0 +1,106 @@
+"""Бенчмарк показателей нагрузки: векторный NumPy против цикла по дням.
+
+Генерирует синтетический дневной ряд объёма (по умолчанию 5 лет,
+тренировки 3–5 раз в неделю), проверяет совпадение результатов
+и замеряет время полного расчёта /metrics/load.
+
+Пример:
+    python -m scripts.bench_training_load --years 5 --repeat 50
+"""
+
+import argparse
+import math
+import time
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+import numpy as np
+
+from app.repositories.metrics_repo import EPOCH
+from app.services.training_load import (
+    ACUTE_DAYS,
+    CHRONIC_DAYS,
+    LOAD_FIELDS,
+    MONOTONY_DAYS,
+    build_report,
+    training_load,
+)
+
+
+def make_loads(days: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    trained = rng.random(days) < 4 / 7
+    return np.where(trained, rng.normal(8000, 2500, days).clip(500), 0.0)
+
+
+def loop_training_load(loads: list[float]) -> dict[str, list[float]]:
+    """Те же показатели построчным циклом, как считались бы без NumPy."""
+    acute_alpha = 2 / (ACUTE_DAYS + 1)
+    chronic_alpha = 2 / (CHRONIC_DAYS + 1)
+    acute = chronic = 0.0
+    result: dict[str, list[float]] = {field: [] for field in LOAD_FIELDS}
+
+    for index, load in enumerate(loads):
+        acute = acute_alpha * load + (1 - acute_alpha) * acute
+        chronic = chronic_alpha * load + (1 - chronic_alpha) * chronic
+        window = [0.0] * max(MONOTONY_DAYS - index - 1, 0) + loads[
+            max(index - MONOTONY_DAYS + 1, 0) : index + 1
+        ]
+        mean = sum(window) / MONOTONY_DAYS
+        std = math.sqrt(sum((value - mean) ** 2 for value in window) / MONOTONY_DAYS)
+        monotony = mean / std if std > 0 else math.nan
+
+        result["load"].append(load)
+        result["acute_load"].append(acute)
+        result["chronic_load"].append(chronic)
+        result["acwr"].append(acute / chronic if chronic > 0 else math.nan)
+        result["monotony"].append(monotony)
+        result["strain"].append(sum(window) * monotony)
+    return result
+
+
+def measure_ms(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее из трёх средних времён вызова, мс."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк показателей нагрузки")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    days = args.years * 365 + 1
+    loads = make_loads(days)
+    load_list = loads.tolist()
+    first_day = (date.today() - EPOCH).days - days + 1
+    dates = list(range(first_day, first_day + days))
+
+    vectorized = training_load(loads)
+    reference = loop_training_load(load_list)
+    for field in LOAD_FIELDS:
+        np.testing.assert_allclose(
+            vectorized[field], reference[field], rtol=1e-9, equal_nan=True
+        )
+
+    loop_ms = measure_ms(lambda: loop_training_load(load_list), args.repeat)
+    numpy_ms = measure_ms(lambda: training_load(loads), args.repeat)
+    report_ms = measure_ms(
+        lambda: build_report(dates, load_list, first_day), args.repeat
+    )
+
+    print(f"дней в ряду: {days}")
+    print(f"цикл по дням:               {loop_ms:8.2f} мс")
+    print(f"NumPy (показатели):         {numpy_ms:8.2f} мс  x{loop_ms / numpy_ms:.1f}")
+    print(f"NumPy (+ списки для JSON):  {report_ms:8.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Создание помесячных секций ``workouts`` заранее.
+
+Создаёт секции с текущего месяца на ``--ahead`` месяцев вперёд и секции
+для месяцев, строки которых попали в секцию по умолчанию (импорт старой
+истории). Уже существующие секции пропускаются. Запускается по расписанию
+(cron, раз в сутки) или циклом с ``--interval``.
+
+Пример:
+    python -m scripts.create_partitions
+    python -m scripts.create_partitions --ahead 6 --interval 86400
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.partition_repo import WorkoutPartitionRepository, month_start
+
+logger = logging.getLogger(__name__)
+
+
+async def create_once(ahead: int) -> list[str]:
+    today = date.today()
+    months = [month_start(today, shift) for shift in range(ahead + 1)]
+    created = []
+    async with AsyncSessionLocal() as session:
+        repo = WorkoutPartitionRepository(session)
+        async with session.begin():
+            existing = set(await repo.list_partitions())
+            months += await repo.default_months()
+        # Каждая секция — своя транзакция: перенос строк из секции по
+        # умолчанию не держит блокировку родительской таблицы на весь проход
+        for month in sorted(set(months)):
+            async with session.begin():
+                name = await repo.create_partition(month)
+            if name not in existing:
+                existing.add(name)
+                created.append(name)
+    return created
+
+
+async def run(ahead: int, interval: int) -> None:
+    while True:
+        try:
+            created = await create_once(ahead)
+            print(f"Создано секций: {len(created)} {' '.join(created)}".rstrip())
+        except Exception:
+            if not interval:
+                raise
+            logger.exception("Workout partition creation failed")
+        if not interval:
+            return
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Создание секций workouts")
+    parser.add_argument(
+        "--ahead",
+        type=int,
+        default=settings.WORKOUT_PARTITIONS_AHEAD,
+        help="на сколько месяцев вперёд создавать секции",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=0,
+        help="повторять каждые N секунд; 0 — один проход",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.ahead, args.interval))
+
+
+if __name__ == "__main__":
+    main()
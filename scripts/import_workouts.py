@@ -0,0 +1,99 @@
+"""Импорт истории тренировок из CSV/NDJSON файла.
+
+Пример:
+    python -m scripts.import_workouts --email test@fitmetrics.com history.csv
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from sqlalchemy import select
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.db.models.users import Users
+from app.db.session import AsyncSessionLocal
+from app.schemas.workout import ImportReport
+from app.services.workout_import import READ_CHUNK_SIZE, detect_format, parse_rows
+from app.services.workout_service import IMPORT_BATCH_SIZE, WorkoutService
+
+
+async def read_file_chunks(path: Path) -> AsyncIterator[bytes]:
+    with path.open("rb") as file:
+        while chunk := file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+def print_progress(report: ImportReport) -> None:
+    print(
+        f"\rстрок: {report.total_rows}  загружено: {report.imported}  "
+        f"ошибок: {report.failed}",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def import_file(
+    path: Path,
+    email: str,
+    fmt: str | None,
+    batch_size: int,
+) -> ImportReport:
+    cache_manager._redis_url = settings.REDIS_URL
+    try:
+        await cache_manager.connect()
+    except Exception as exc:
+        print(f"Redis недоступен, кэш метрик не будет сброшен: {exc}")
+
+    try:
+        async with AsyncSessionLocal() as session:
+            async with session.begin():
+                result = await session.execute(
+                    select(Users.id).where(Users.email == email)
+                )
+                user_id = result.scalar_one_or_none()
+                if user_id is None:
+                    raise SystemExit(f"Пользователь {email} не найден")
+
+                service = WorkoutService(session=session, user_id=user_id)
+                rows = parse_rows(
+                    read_file_chunks(path), fmt or detect_format(path.name)
+                )
+                report = await service.import_workouts(
+                    rows,
+                    batch_size=batch_size,
+                    on_progress=print_progress,
+                )
+    finally:
+        await cache_manager.disconnect()
+
+    print(file=sys.stderr)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Импорт тренировок из файла")
+    parser.add_argument("path", type=Path, help="CSV или NDJSON файл")
+    parser.add_argument("--email", required=True, help="email пользователя")
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        import_file(args.path, args.email, args.format, args.batch_size)
+    )
+
+    print(
+        f"Загружено {report.imported} из {report.total_rows} строк, "
+        f"ошибок: {report.failed}"
+    )
+    for error in report.errors:
+        print(f"  строка {error.line}: {'; '.join(error.errors)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Привязка спортсмена к тренеру для пакетных метрик.
+
+Пример:
+    python -m scripts.link_athlete --coach coach@fitmetrics.com athlete@fitmetrics.com
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.db.models.users import Users
+from app.db.session import AsyncSessionLocal
+from app.repositories.coach_repo import CoachRepository
+
+
+async def link(coach_email: str, athlete_emails: list[str]) -> None:
+    emails = [coach_email, *athlete_emails]
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            result = await session.execute(
+                select(Users.email, Users.id).where(Users.email.in_(emails))
+            )
+            ids = dict(result.all())
+            missing = [email for email in emails if email not in ids]
+            if missing:
+                raise SystemExit(f"Пользователи не найдены: {', '.join(missing)}")
+
+            repo = CoachRepository(session)
+            for email in athlete_emails:
+                await repo.link(ids[coach_email], ids[email])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Привязка спортсменов к тренеру")
+    parser.add_argument("athletes", nargs="+", help="email спортсменов")
+    parser.add_argument("--coach", required=True, help="email тренера")
+    args = parser.parse_args()
+
+    asyncio.run(link(args.coach, args.athletes))
+    print(f"Привязано спортсменов: {len(args.athletes)}")
+
+
+if __name__ == "__main__":
+    main()
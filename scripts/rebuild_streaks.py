@@ -0,0 +1,51 @@
+"""Пересчёт серий тренировочных дней по истории тренировок.
+
+Нужен после ручных правок истории в БД; обычная запись и импорт
+поддерживают серии сами.
+
+Пример:
+    python -m scripts.rebuild_streaks --email test@fitmetrics.com
+    python -m scripts.rebuild_streaks  # все пользователи
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.db.models.streaks import TrainingStreak
+from app.db.models.users import Users
+from app.db.session import AsyncSessionLocal
+from app.repositories.streaks_repo import TrainingStreakRepository
+
+
+async def rebuild(email: str | None) -> int:
+    async with AsyncSessionLocal() as session:
+        async with session.begin():
+            user_id = None
+            if email is not None:
+                result = await session.execute(
+                    select(Users.id).where(Users.email == email)
+                )
+                user_id = result.scalar_one_or_none()
+                if user_id is None:
+                    raise SystemExit(f"Пользователь {email} не найден")
+
+            await TrainingStreakRepository(session).rebuild(user_id)
+            count = select(func.count()).select_from(TrainingStreak)
+            if user_id is not None:
+                count = count.where(TrainingStreak.user_id == user_id)
+            return (await session.execute(count)).scalar_one()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пересчёт серий тренировок")
+    parser.add_argument("--email", default=None, help="email пользователя")
+    args = parser.parse_args()
+
+    count = asyncio.run(rebuild(args.email))
+    print(f"Пересчитано серий: {count}")
+
+
+if __name__ == "__main__":
+    main()
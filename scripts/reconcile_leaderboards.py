@@ -0,0 +1,62 @@
+"""Сверка рейтингов в Redis с Postgres.
+
+Пересобирает рейтинги объёма за прошлые (закрытые) неделю и месяц и
+рейтинги лучшего веса по всем упражнениям. Запускается по расписанию
+(cron) или циклом с ``--interval``.
+
+Пример:
+    python -m scripts.reconcile_leaderboards
+    python -m scripts.reconcile_leaderboards --interval 900
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.db.session import ReadOnlySessionLocal
+from app.services.leaderboards import LeaderboardService
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_once() -> int:
+    async with ReadOnlySessionLocal() as session:
+        return await LeaderboardService(session).reconcile(date.today())
+
+
+async def run(interval: int) -> None:
+    cache_manager._redis_url = settings.REDIS_URL
+    await cache_manager.connect()
+    try:
+        while True:
+            try:
+                rebuilt = await reconcile_once()
+                print(f"Пересобрано рейтингов: {rebuilt}")
+            except Exception:
+                if not interval:
+                    raise
+                logger.exception("Leaderboard reconciliation failed")
+            if not interval:
+                return
+            await asyncio.sleep(interval)
+    finally:
+        await cache_manager.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сверка рейтингов с БД")
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=0,
+        help="повторять каждые N секунд; 0 — один проход",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import random
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import AsyncSessionLocal
 from app.db.models.users import Users
-from app.db.models.workouts import Exercise, Workout
+from app.db.models.workouts import Exercise, Workout, WorkoutSession
 from app.core.security import get_password_hash
 
 
@@ -61,8 +61,14 @@ async def seed_data():
 
         for day_str in training_days:
             day = datetime.strptime(day_str, "%Y-%m-%d")
+            started_at = day + timedelta(hours=random.randint(9, 19))
 
             selected_exercises = random.sample(exercises, k=random.randint(2, 3))
+            workout_session = WorkoutSession(
+                user_id=user.id,
+                started_at=started_at,
+                exercises_count=len(selected_exercises),
+            )
 
             for exercise in selected_exercises:
 
@@ -84,16 +90,24 @@ async def seed_data():
 
                     total_volume = reps * weight
 
-                    workout = Workout(
-                        user_id=user.id,
-                        exercise_id=exercise.id,
-                        performed_at=day + timedelta(hours=random.randint(9, 20)),
-                        sets=1,
-                        reps=reps,
-                        weight=round(weight, 1),
-                        total_volume=round(total_volume, 1),
+                    workout_session.workouts.append(
+                        Workout(
+                            user_id=user.id,
+                            exercise_id=exercise.id,
+                            performed_at=started_at,
+                            sets=1,
+                            reps=reps,
+                            weight=round(weight, 1),
+                            total_volume=round(total_volume, 1),
+                        )
                     )
-                    session.add(workout)
+
+            workout_session.ended_at = started_at + timedelta(hours=1)
+            workout_session.sets_count = len(workout_session.workouts)
+            workout_session.total_volume = round(
+                sum(w.total_volume for w in workout_session.workouts), 1
+            )
+            session.add(workout_session)
 
         await session.commit()
         print("Фейковые данные добавлены!")
@@ -1,10 +1,16 @@
 # tests/conftest.py
 import asyncio
+import fnmatch
+import json
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Generator
+from uuid import uuid4
 from datetime import datetime, timedelta
 
+import pytest
 import pytest_asyncio
 from httpx import AsyncClient
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
@@ -13,11 +19,19 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy.pool import NullPool
 from sqlalchemy import delete
 
-from app.core.config import test_settings
+from app.core.cache import cache_manager
+from app.services import live_counters as live_counters_module
+from app.core.config import settings, test_settings
 from app.main import app
 from app.db.base import Base
-from app.db.session import get_session
-from app.api.deps import get_redis, get_current_user
+from app.db.instrumentation import engine_stats
+from app.db.session import _after_commit_tasks, build_engine, get_session
+from app.api.deps import (
+    get_redis,
+    get_current_user,
+    get_read_session,
+    get_read_session_factory,
+)
 from app.db.models.users import Users
 from app.db.models.workouts import Workout, Exercise
 from app.core.security import get_password_hash
@@ -38,6 +52,25 @@ TestSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+# С TEST_PGBOUNCER_DATABASE_URL каждый тест с БД выполняется ещё раз через
+# PgBouncer в режиме transaction pooling — engine приложения в режиме
+# DB_PGBOUNCER_MODE (make test-pgbouncer)
+BOUNCER_STATEMENT_TIMEOUT_MS = 15000
+test_engines = {"direct": test_engine}
+if test_settings.TEST_PGBOUNCER_DATABASE_URL:
+    test_engines["pgbouncer"] = build_engine(
+        test_settings.TEST_PGBOUNCER_DATABASE_URL,
+        name="pgbouncer-test",
+        statement_timeout_ms=BOUNCER_STATEMENT_TIMEOUT_MS,
+        pgbouncer_mode=True,
+    )
+
+
+def pytest_configure(config):
+    # Соединения пула привязаны к event loop, а у каждого теста свой loop
+    if "pgbouncer" in test_engines and settings.DB_POOL_SIZE:
+        raise pytest.UsageError("PgBouncer tests need DB_POOL_SIZE=0 (NullPool)")
+
 
 # ============================================================================
 # DATABASE SETUP
@@ -53,14 +86,21 @@ async def setup_test_db():
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
     await test_engine.dispose()
+    if "pgbouncer" in test_engines:
+        engine_stats.pop("pgbouncer-test", None)
+        await test_engines["pgbouncer"].dispose()
 
 
-@pytest_asyncio.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
+@pytest_asyncio.fixture(
+    scope="function",
+    params=list(test_engines) if len(test_engines) > 1 else None,
+)
+async def db_session(request) -> AsyncGenerator[AsyncSession, None]:
     """
     Создаёт изолированную сессию БД с транзакцией.
     """
-    connection = await test_engine.connect()
+    engine = test_engines[getattr(request, "param", "direct")]
+    connection = await engine.connect()
     transaction = await connection.begin()
 
     session = TestSessionLocal(bind=connection)
@@ -72,6 +112,17 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     await connection.close()
 
 
+@pytest_asyncio.fixture
+async def commit_session(db_session: AsyncSession):
+    """Коммит тестовой сессии с ожиданием колбэков after_commit, как в запросе"""
+
+    async def commit():
+        await db_session.commit()
+        await asyncio.gather(*list(_after_commit_tasks))
+
+    return commit
+
+
 # ============================================================================
 # HTTP CLIENT
 # ============================================================================
@@ -97,7 +148,22 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_redis():
         return MockRedis()
 
+    # Параллельные фрагменты по очереди используют общую тестовую сессию
+    session_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def shared_session():
+        async with session_lock:
+            yield db_session
+
+    async def override_get_read_session_factory():
+        return shared_session
+
     app.dependency_overrides[get_session] = override_get_db
+    app.dependency_overrides[get_read_session] = override_get_db
+    app.dependency_overrides[get_read_session_factory] = (
+        override_get_read_session_factory
+    )
     app.dependency_overrides[get_redis] = override_get_redis
 
     async with AsyncClient(app=app, base_url="http://test") as ac:
@@ -106,6 +172,192 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     app.dependency_overrides.clear()
 
 
+class InMemoryRedis:
+    """Минимальная замена Redis для проверки кэширования"""
+
+    def __init__(self):
+        self.store: dict[str, str] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.sets: dict[str, set[str]] = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        deleted = 0
+        for key in keys:
+            found = [kind.pop(key, None) for kind in self._keyspaces()]
+            deleted += any(value is not None for value in found)
+        return deleted
+
+    def _keyspaces(self):
+        return (self.store, self.zsets, self.hashes, self.sets)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def register_script(self, script):
+        """Lua-скрипты приложения, выполненные тем же порядком команд"""
+        handler = SCRIPT_HANDLERS[script]
+
+        async def run(keys=(), args=()):
+            return handler(self, list(keys), [str(arg) for arg in args])
+
+        return run
+
+    async def expire(self, key, ttl):
+        return any(key in kind for kind in self._keyspaces())
+
+    async def rename(self, key, new_key):
+        self.zsets[new_key] = self.zsets.pop(key)
+        return True
+
+    async def zincrby(self, key, amount, member):
+        zset = self.zsets.setdefault(key, {})
+        zset[member] = zset.get(member, 0.0) + amount
+        return zset[member]
+
+    async def zadd(self, key, mapping, gt=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not gt or member not in zset or score > zset[member]:
+                zset[member] = float(score)
+        return len(mapping)
+
+    async def zrem(self, key, member):
+        return self.zsets.get(key, {}).pop(member, None) is not None
+
+    def _ranked(self, key):
+        zset = self.zsets.get(key, {})
+        return sorted(zset.items(), key=lambda item: (-item[1], item[0]))
+
+    async def zrevrange(self, key, start, stop, withscores=False):
+        ranked = self._ranked(key)[start : stop + 1]
+        return ranked if withscores else [member for member, _ in ranked]
+
+    async def zrevrank(self, key, member):
+        members = [name for name, _ in self._ranked(key)]
+        return members.index(member) if member in members else None
+
+    async def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    async def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return InMemoryPipeline(self)
+
+    async def scan_iter(self, match="*", count=None):
+        for kind in self._keyspaces():
+            for key in list(kind):
+                if fnmatch.fnmatchcase(key, match):
+                    yield key
+
+
+def _live_record(redis: InMemoryRedis, keys, args):
+    counters, exercises, workouts = keys
+    volume, weight, exercise_id, workout_id, _ = args
+    if counters not in redis.hashes or workout_id in redis.sets.get(workouts, ()):
+        return 0
+    redis.sets.setdefault(workouts, set()).add(workout_id)
+    day = redis.hashes[counters]
+    day["total_sets"] = str(int(day["total_sets"]) + 1)
+    day["total_volume"] = str(float(day["total_volume"]) + float(volume))
+    day["weight_sum"] = str(float(day["weight_sum"]) + float(weight))
+    redis.sets.setdefault(exercises, set()).add(exercise_id)
+    return 1
+
+
+def _live_seed(redis: InMemoryRedis, keys, args):
+    version, _, payload = args
+    if redis.store.get(keys[0]) != version:
+        return 0
+    for index, day in enumerate(json.loads(payload)):
+        counters, exercises, workouts = keys[index * 3 + 1 : index * 3 + 4]
+        if counters in redis.hashes:
+            continue
+        total_sets, total_volume, weight_sum, exercise_ids, workout_ids = day
+        redis.hashes[counters] = {
+            "total_sets": total_sets,
+            "total_volume": total_volume,
+            "weight_sum": weight_sum,
+        }
+        redis.sets[exercises] = set(exercise_ids)
+        redis.sets[workouts] = set(workout_ids)
+    return 1
+
+
+SCRIPT_HANDLERS = {
+    live_counters_module.RECORD_SCRIPT: _live_record,
+    live_counters_module.SEED_SCRIPT: _live_seed,
+}
+
+
+class InMemoryPipeline:
+    """Команды копятся и выполняются по очереди в execute"""
+
+    def __init__(self, redis: InMemoryRedis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        commands, self._commands = self._commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+@pytest_asyncio.fixture
+async def memory_cache() -> AsyncGenerator[InMemoryRedis, None]:
+    """Подключает cache_manager к хранилищу в памяти"""
+    redis = InMemoryRedis()
+    cache_manager._redis = redis
+    yield redis
+    cache_manager._redis = None
+
+
+@pytest_asyncio.fixture
+async def redis_cache(monkeypatch) -> AsyncGenerator[Redis, None]:
+    """Подключает cache_manager к настоящему Redis (TEST_REDIS_URL).
+
+    Lua-скрипты выполняет сам Redis; ключи теста — под отдельным префиксом
+    и удаляются после теста.
+    """
+    if not test_settings.TEST_REDIS_URL:
+        pytest.skip("TEST_REDIS_URL is not set")
+    redis = Redis.from_url(test_settings.TEST_REDIS_URL, decode_responses=True)
+    prefix = f"fitmetrics-test-{uuid4().hex}"
+    monkeypatch.setattr(cache_manager, "_prefix", prefix)
+    cache_manager._redis = redis
+    yield redis
+    cache_manager._redis = None
+    async for key in redis.scan_iter(match=f"{prefix}:*"):
+        await redis.delete(key)
+    await redis.aclose()
+
+
 # ============================================================================
 # USER FIXTURES
 # ============================================================================
@@ -159,6 +411,36 @@ async def another_user(db_session: AsyncSession) -> Users:
 # ============================================================================
 
 
+@pytest.fixture
+def post_workout():
+    """POST /workouts/ с проверкой ответа; возвращает созданную тренировку"""
+
+    async def post(
+        client: AsyncClient,
+        weight: float = 100.0,
+        name: str = "Bench Press",
+        muscle_group: str = "Chest",
+        sets: int = 3,
+        reps: int = 10,
+        **headers,
+    ) -> dict:
+        response = await client.post(
+            "/api/v1/workouts/",
+            json={
+                "exercise_name": name,
+                "muscle_group": muscle_group,
+                "sets": sets,
+                "reps": reps,
+                "weight": weight,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    return post
+
+
 @pytest_asyncio.fixture
 async def user_with_workouts(db_session: AsyncSession) -> Users:
     """
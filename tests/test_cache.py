@@ -0,0 +1,49 @@
+# tests/test_cache.py
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from app.core.cache import cached
+
+
+class FakeService:
+    def __init__(self, user_id):
+        self._user_id = user_id
+        self.calls = 0
+
+    @cached(key_pattern="test:user:{self._user_id}:days:{days}", ttl=60)
+    async def compute(self, days: int = 7):
+        self.calls += 1
+        return [{"date": date(2024, 1, days), "value": days}]
+
+
+class TestCachedDecorator:
+    """Тесты декоратора кэширования"""
+
+    @pytest.mark.asyncio
+    async def test_key_from_self_and_defaults(self, memory_cache):
+        """Ключ строится из атрибутов self и аргументов по умолчанию"""
+        user_id = uuid4()
+        service = FakeService(user_id)
+
+        await service.compute()
+        await service.compute(days=7)
+        await service.compute(3)
+
+        assert set(memory_cache.store) == {
+            f"fitmetrics:test:user:{user_id}:days:7",
+            f"fitmetrics:test:user:{user_id}:days:3",
+        }
+        assert service.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_dates_serialized(self, memory_cache):
+        """Даты в результате сохраняются в ISO-формате"""
+        service = FakeService(uuid4())
+
+        await service.compute(days=5)
+
+        (value,) = memory_cache.store.values()
+        assert json.loads(value) == [{"date": "2024-01-05", "value": 5}]
@@ -0,0 +1,282 @@
+# tests/test_column_store.py
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.users import Users
+from app.repositories.metrics_repo import (
+    EPOCH,
+    MetricsRepository,
+    WorkoutColumnsRow,
+)
+from app.services.column_store import ColumnStore, UserColumns, column_store
+
+
+def make_row(days: list[int]) -> WorkoutColumnsRow:
+    return WorkoutColumnsRow(
+        days=days,
+        exercise=[0] * len(days),
+        muscle_group=[0] * len(days),
+        sets=[3] * len(days),
+        reps=[10] * len(days),
+        weight=[50.0] * len(days),
+        volume=[1500.0] * len(days),
+        exercise_ids=[uuid4()] if days else [],
+        muscle_groups=["Chest"] if days else [],
+    )
+
+
+@pytest_asyncio.fixture
+async def enabled_column_store(monkeypatch, memory_cache):
+    monkeypatch.setattr(settings, "COLUMN_STORE_ENABLED", True)
+    yield column_store
+    for user_id in list(column_store._entries):
+        column_store.evict(user_id)
+
+
+class TestUserColumns:
+    """Расчёты по колонкам совпадают с SQL"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("granularity", ["day", "week", "month"])
+    async def test_timeline_matches_sql(
+        self,
+        db_session: AsyncSession,
+        user_with_workouts: Users,
+        granularity: str,
+    ):
+        """Таймлайн из массивов равен get_timeline_window"""
+        repo = MetricsRepository(db_session)
+        columns = UserColumns(
+            await repo.load_workout_columns(user_with_workouts.id), "v1"
+        )
+        start = date.today() - timedelta(days=70)
+        end = date.today() + timedelta(days=1)
+
+        expected = await repo.get_timeline_window(
+            user_with_workouts.id, start, end, granularity
+        )
+        actual = columns.timeline(start, end, granularity)
+
+        assert actual["dates"] == expected["dates"]
+        assert actual["workouts_count"] == expected["workouts_count"]
+        assert actual["total_sets"] == expected["total_sets"]
+        assert actual["total_volume"] == pytest.approx(expected["total_volume"])
+        assert actual["avg_weight"] == pytest.approx(expected["avg_weight"])
+
+    @pytest.mark.asyncio
+    async def test_muscle_groups_match_sql(
+        self,
+        db_session: AsyncSession,
+        user_with_workouts: Users,
+    ):
+        """Разбивка по группам мышц из массивов равна SQL"""
+        repo = MetricsRepository(db_session)
+        columns = UserColumns(
+            await repo.load_workout_columns(user_with_workouts.id), "v1"
+        )
+        start = date.today() - timedelta(days=1)
+        end = date.today() + timedelta(days=1)
+
+        expected = await repo.get_muscle_groups(user_with_workouts.id, start, end)
+        assert columns.muscle_groups_breakdown(start, end) == pytest.approx(expected)
+
+    def test_append_keeps_order_and_grows(self):
+        """Дописанные строки попадают в срезы; ёмкость растёт удвоением"""
+        columns = UserColumns(make_row([]), "v1")
+        exercise_id = uuid4()
+        for _ in range(20):
+            columns.append(
+                day=date.today(),
+                exercise_id=exercise_id,
+                muscle_group="Legs",
+                sets=1,
+                reps=5,
+                weight=100.0,
+                volume=500.0,
+            )
+
+        summary = columns.summary(date.today(), date.today() + timedelta(days=1))
+        assert summary["workouts_count"] == 20
+        assert summary["total_volume"] == 10000.0
+        assert columns.exercise_ids == [exercise_id]
+        assert columns.muscle_groups == ["Legs"]
+
+    def test_append_before_last_day(self):
+        """Строка с днём раньше последнего вставляется по порядку"""
+        today = date.today()
+        columns = UserColumns(
+            make_row([(day - EPOCH).days for day in (today - timedelta(days=3),)]),
+            "v1",
+        )
+        for day in (today + timedelta(days=5), today):
+            columns.append(
+                day=day,
+                exercise_id=uuid4(),
+                muscle_group="Legs",
+                sets=1,
+                reps=1,
+                weight=100.0,
+                volume=100.0,
+            )
+
+        days = columns.column("days").tolist()
+        assert days == sorted(days)
+        summary = columns.summary(today - timedelta(days=7), today + timedelta(days=1))
+        assert summary["workouts_count"] == 2
+        assert summary["total_volume"] == 1600.0
+
+
+class TestColumnStore:
+    """Версии и вытеснение"""
+
+    def test_version_mismatch_evicts(self):
+        """Копия с другой версией данных не используется"""
+        store = ColumnStore(max_bytes=1024 * 1024)
+        user_id = uuid4()
+        store.put(user_id, UserColumns(make_row([1, 2, 3]), "v1"))
+
+        assert store.get(user_id, "v1") is not None
+        assert store.get(user_id, "v2") is None
+        assert len(store) == 0
+
+    def test_append_pending_until_confirm(self):
+        """Дописанная до коммита копия отдаётся только после confirm"""
+        store = ColumnStore(max_bytes=1024 * 1024)
+        user_id = uuid4()
+        store.put(user_id, UserColumns(make_row([1]), "v1"))
+        store.append(
+            user_id,
+            day=date.today(),
+            exercise_id=uuid4(),
+            muscle_group="Back",
+            sets=1,
+            reps=1,
+            weight=100.0,
+            volume=100.0,
+        )
+        store.confirm(user_id, "v2")
+
+        entry = store.get(user_id, "v2")
+        assert entry is not None
+        assert entry.size == 2
+
+    def test_confirm_waits_for_concurrent_append(self):
+        """Коммит одной записи не принимает строку другой, ещё не закоммиченной"""
+        store = ColumnStore(max_bytes=1024 * 1024)
+        user_id = uuid4()
+        store.put(user_id, UserColumns(make_row([1]), "v1"))
+        for _ in range(2):
+            store.append(
+                user_id,
+                day=date.today(),
+                exercise_id=uuid4(),
+                muscle_group="Back",
+                sets=1,
+                reps=1,
+                weight=100.0,
+                volume=100.0,
+            )
+        # Первая запись закоммичена, вторая откатывается и confirm не вызывает
+        store.confirm(user_id, "v2")
+
+        assert store.get(user_id, "v2") is None
+        assert len(store) == 0
+
+    def test_lru_eviction_by_memory(self):
+        """При превышении бюджета вытесняется давно не читавшийся пользователь"""
+        entry_bytes = UserColumns(make_row(list(range(100))), "v").nbytes
+        store = ColumnStore(max_bytes=entry_bytes * 2)
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        store.put(first, UserColumns(make_row(list(range(100))), "v"))
+        store.put(second, UserColumns(make_row(list(range(100))), "v"))
+        store.get(first, "v")
+        store.put(third, UserColumns(make_row(list(range(100))), "v"))
+
+        assert store.get(second, "v") is None
+        assert store.get(first, "v") is not None
+        assert store.get(third, "v") is not None
+        assert store.nbytes == entry_bytes * 2
+
+    def test_append_keeps_memory_budget(self):
+        """Рост массивов при дописывании вытесняет других, а не превышает бюджет"""
+        entry_bytes = UserColumns(make_row(list(range(16))), "v").nbytes
+        store = ColumnStore(max_bytes=entry_bytes * 2)
+        active, idle = uuid4(), uuid4()
+        store.put(idle, UserColumns(make_row(list(range(16))), "v"))
+        store.put(active, UserColumns(make_row(list(range(16))), "v"))
+
+        store.append(
+            active,
+            day=date.today(),
+            exercise_id=uuid4(),
+            muscle_group="Back",
+            sets=1,
+            reps=1,
+            weight=100.0,
+            volume=100.0,
+        )
+
+        assert store.nbytes <= entry_bytes * 2
+        assert len(store) == 1
+        store.confirm(active, "v2")
+        assert store.get(active, "v2").size == 17
+
+
+class TestColumnStoreEndpoints:
+    """Эндпоинты метрик с включённым хранилищем"""
+
+    @pytest.mark.asyncio
+    async def test_same_responses(
+        self,
+        auth_client_with_workouts: tuple[AsyncClient, Users],
+        enabled_column_store,
+        monkeypatch,
+    ):
+        """Ответы совпадают с путём через SQL"""
+        client, user = auth_client_with_workouts
+        urls = [
+            "/api/v1/metrics/summary?days=7",
+            "/api/v1/metrics/timeline?days=40&format=columnar&granularity=week",
+            "/api/v1/metrics/timeline?days=7",
+            "/api/v1/metrics/muscle-groups?days=7",
+        ]
+
+        from_store = [(await client.get(url)).json() for url in urls]
+        assert user.id in enabled_column_store._entries
+
+        monkeypatch.setattr(settings, "COLUMN_STORE_ENABLED", False)
+        from_sql = [(await client.get(url)).json() for url in urls]
+
+        assert from_store == from_sql
+
+    @pytest.mark.asyncio
+    async def test_write_is_visible(
+        self,
+        auth_client_with_workouts: tuple[AsyncClient, Users],
+        enabled_column_store,
+    ):
+        """Новая тренировка видна в метриках из хранилища"""
+        client, _ = auth_client_with_workouts
+
+        before = (await client.get("/api/v1/metrics/summary?days=7")).json()
+        await client.post(
+            "/api/v1/workouts/",
+            json={
+                "exercise_name": "Squat",
+                "muscle_group": "Legs",
+                "sets": 1,
+                "reps": 1,
+                "weight": 100.0,
+            },
+        )
+        after = (await client.get("/api/v1/metrics/summary?days=7")).json()
+
+        assert after["workouts_count"] == before["workouts_count"] + 1
+        assert after["total_volume"] == before["total_volume"] + 100.0
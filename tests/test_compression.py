@@ -0,0 +1,80 @@
+# tests/test_compression.py
+import pytest
+from httpx import AsyncClient
+
+from app.core.middleware import brotli, choose_encoding
+from app.db.models.users import Users
+
+
+class TestChooseEncoding:
+    """Тесты разбора Accept-Encoding"""
+
+    def test_prefers_brotli(self):
+        """При равном q выбирается br (если доступен)"""
+        expected = "br" if brotli is not None else "gzip"
+        assert choose_encoding("gzip, deflate, br") == expected
+
+    def test_respects_q_values(self):
+        """Кодировки с q=0 не выбираются, больший q важнее"""
+        assert choose_encoding("br;q=0, gzip") == "gzip"
+        assert choose_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("identity") is None
+
+    def test_wildcard(self):
+        """* разрешает любую поддерживаемую кодировку"""
+        assert choose_encoding("*") is not None
+
+
+class TestResponseCompression:
+    """Тесты сжатия ответов"""
+
+    @pytest.mark.asyncio
+    async def test_large_response_gzipped(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+    ):
+        """Большой ответ сжимается, заголовки из зависимостей сохраняются"""
+        client, _ = authenticated_client
+
+        response = await client.get(
+            "/api/v1/metrics/timeline?days=365",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert "etag" in response.headers
+        assert int(response.headers["content-length"]) < len(response.content)
+        assert len(response.json()) == 366
+
+    @pytest.mark.asyncio
+    async def test_small_response_not_compressed(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Ответ меньше порога отдаётся без сжатия"""
+        client, _ = authenticated_client
+
+        response = await client.get(
+            "/api/v1/metrics/summary?days=7",
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_identity_not_compressed(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Без поддерживаемой кодировки ответ не сжимается"""
+        client, _ = authenticated_client
+
+        response = await client.get(
+            "/api/v1/metrics/timeline?days=365",
+            headers={"Accept-Encoding": "identity"},
+        )
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
@@ -0,0 +1,230 @@
+# tests/test_leaderboards.py
+from datetime import date, timedelta
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.users import Users
+from app.repositories.leaderboard_repo import LeaderboardRepository
+from app.services.leaderboards import (
+    LeaderboardService,
+    best_weight_key,
+    leaderboards,
+    volume_key,
+)
+from app.services.metrics_history import bucket_start
+
+
+class TestLeaderboardStore:
+    """Обновление и чтение sorted set"""
+
+    @pytest.mark.asyncio
+    async def test_volume_accumulates_and_best_weight_only_grows(self, memory_cache):
+        """ZINCRBY суммирует объём, ZADD GT не понижает лучший вес"""
+        first, second, exercise_id = uuid4(), uuid4(), uuid4()
+        today = date.today()
+
+        await leaderboards.record_workout(first, exercise_id, today, 1000.0, 100.0)
+        await leaderboards.record_workout(first, exercise_id, today, 500.0, 80.0)
+        await leaderboards.record_workout(second, exercise_id, today, 1200.0, 120.0)
+
+        week = volume_key("week", bucket_start("week", today))
+        top = await leaderboards.top(week, limit=10)
+        assert [(e["user_id"], e["score"]) for e in top] == [
+            (str(first), 1500.0),
+            (str(second), 1200.0),
+        ]
+        assert (await leaderboards.top(week, limit=1))[0]["rank"] == 1
+
+        best = best_weight_key(exercise_id)
+        assert await leaderboards.position(best, first) == {
+            "rank": 2,
+            "user_id": str(first),
+            "score": 100.0,
+        }
+        assert await leaderboards.position(best, uuid4()) is None
+
+    @pytest.mark.asyncio
+    async def test_without_redis(self):
+        """Без Redis рейтинги пустые, запись не падает"""
+        await leaderboards.record_workout(uuid4(), uuid4(), date.today(), 1.0, 1.0)
+        assert await leaderboards.top(volume_key("week", date.today()), 10) == []
+
+
+class TestLeaderboardsApi:
+    """Тесты /leaderboards"""
+
+    @pytest.mark.asyncio
+    async def test_volume_board_with_own_position(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+    ):
+        """Топ и место текущего пользователя за неделю"""
+        client, user = authenticated_client
+        today = date.today()
+        other = uuid4()
+        await leaderboards.record_workout(other, uuid4(), today, 5000.0, 100.0)
+        await leaderboards.record_workout(user.id, uuid4(), today, 3000.0, 100.0)
+
+        response = await client.get("/api/v1/leaderboards/volume?limit=1")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["period_start"] == bucket_start("week", today).isoformat()
+        assert body["entries"] == [{"rank": 1, "user_id": str(other), "score": 5000.0}]
+        assert body["me"] == {"rank": 2, "user_id": str(user.id), "score": 3000.0}
+
+        previous = (today - timedelta(days=40)).isoformat()
+        response = await client.get(
+            "/api/v1/leaderboards/volume", params={"period": "month", "at": previous}
+        )
+        assert response.json()["entries"] == []
+        assert response.json()["me"] is None
+
+    @pytest.mark.asyncio
+    async def test_exercise_board(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        db_session: AsyncSession,
+        memory_cache,
+        post_workout,
+    ):
+        """Рейтинг по упражнению; неизвестное упражнение — 404"""
+        client, user = authenticated_client
+        await post_workout(client, 100.0)
+        exercise_id = await LeaderboardService(db_session).get_exercise_id(
+            "Bench Press"
+        )
+        await leaderboards.record_workout(
+            user.id, exercise_id, date.today(), 1000.0, 100.0
+        )
+
+        response = await client.get("/api/v1/leaderboards/exercises/Bench Press")
+        assert response.status_code == 200
+        assert response.json()["me"]["score"] == 100.0
+
+        response = await client.get("/api/v1/leaderboards/exercises/Nothing")
+        assert response.status_code == 404
+
+
+class TestLeaderboardReconciliation:
+    """Сверка с Postgres"""
+
+    @pytest.mark.asyncio
+    async def test_reconcile_restores_scores(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        db_session: AsyncSession,
+        memory_cache,
+        commit_session,
+        post_workout,
+    ):
+        """Пересборка прошлого периода заменяет искажённые и удаляет лишние счета"""
+        client, user = authenticated_client
+        last_week = bucket_start("week", date.today()) - timedelta(days=7)
+        content = (
+            "exercise_name,muscle_group,sets,reps,weight,performed_at\n"
+            f"Squat,Legs,2,5,120,{last_week.isoformat()}T08:00:00\n"
+            f"Squat,Legs,2,5,100,{last_week.isoformat()}T09:00:00\n"
+        )
+        await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", content, "text/csv")},
+        )
+        await post_workout(client, 80.0, "Squat", "Legs")
+        await commit_session()
+
+        previous = volume_key("week", last_week)
+        current = volume_key("week", bucket_start("week", date.today()))
+        memory_cache.zsets[f"fitmetrics:{previous}"] = {str(uuid4()): 1e9}
+        memory_cache.zsets[f"fitmetrics:{current}"][str(user.id)] += 1.0
+
+        service = LeaderboardService(db_session)
+        await service.reconcile(date.today())
+
+        assert await leaderboards.top(previous, limit=10) == [
+            {"rank": 1, "user_id": str(user.id), "score": 2200.0}
+        ]
+        # Текущая неделя не пересобирается: её ведут только ZINCRBY
+        assert (await leaderboards.position(current, user.id))["score"] == 2401.0
+        best = best_weight_key(await service.get_exercise_id("Squat"))
+        assert (await leaderboards.position(best, user.id))["score"] == 120.0
+
+    @pytest.mark.asyncio
+    async def test_reconcile_keeps_record_written_during_rebuild(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        db_session: AsyncSession,
+        memory_cache,
+        commit_session,
+        post_workout,
+        monkeypatch,
+    ):
+        """Рекорд, закоммиченный между чтением и заменой набора, не теряется"""
+        client, user = authenticated_client
+        await post_workout(client, 100.0, "Squat", "Legs")
+        await commit_session()
+        best_weights = LeaderboardRepository.best_weights
+        snapshots = []
+
+        async def write_after_snapshot(self, *args, **kwargs):
+            result = await best_weights(self, *args, **kwargs)
+            if not snapshots:
+                snapshots.append(result)
+                await post_workout(client, 140.0, "Squat", "Legs")
+                await commit_session()
+            return result
+
+        monkeypatch.setattr(LeaderboardRepository, "best_weights", write_after_snapshot)
+        service = LeaderboardService(db_session)
+        await service.reconcile(date.today())
+
+        best = best_weight_key(await service.get_exercise_id("Squat"))
+        assert list(snapshots[0].values()) == [{user.id: 100.0}]
+        assert (await leaderboards.position(best, user.id))["score"] == 140.0
+
+    @pytest.mark.asyncio
+    async def test_reconcile_drops_removed_exercises(
+        self,
+        db_session: AsyncSession,
+        memory_cache,
+    ):
+        """Рейтинг упражнения без личных рекордов удаляется"""
+        stale = best_weight_key(uuid4())
+        memory_cache.zsets[f"fitmetrics:{stale}"] = {str(uuid4()): 100.0}
+
+        await LeaderboardService(db_session).reconcile(date.today())
+
+        assert f"fitmetrics:{stale}" not in memory_cache.zsets
+
+    @pytest.mark.asyncio
+    async def test_import_scores(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        db_session: AsyncSession,
+    ):
+        """После импорта счета пересчитываются только для хранимых периодов"""
+        client, user = authenticated_client
+        today = date.today()
+        content = (
+            "exercise_name,muscle_group,sets,reps,weight,performed_at\n"
+            f"Deadlift,Back,1,1,150,{today.isoformat()}T08:00:00\n"
+            f"Deadlift,Back,1,1,170,{today.replace(year=today.year - 3)}T08:00:00\n"
+        )
+        await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", content, "text/csv")},
+        )
+
+        service = LeaderboardService(db_session)
+        exercise_id = await service.get_exercise_id("Deadlift")
+        volumes, weights = await service.user_scores(
+            user.id, {today, today.replace(year=today.year - 3)}, [exercise_id], today
+        )
+        assert volumes == {
+            ("week", bucket_start("week", today)): 150.0,
+            ("month", bucket_start("month", today)): 150.0,
+        }
+        assert weights == {exercise_id: 170.0}
@@ -0,0 +1,218 @@
+# tests/test_live_counters.py
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_manager
+from app.core.data_version import data_versions
+from app.db.models.users import Users
+from app.repositories.metrics_repo import MetricsRepository
+from app.repositories.metrics_repo import DailyCountersRow
+from app.services.live_counters import (
+    EMPTY_DAY_COUNTERS,
+    LiveCounterStore,
+    live_counters,
+    live_key,
+)
+from app.services.metrics_service import MetricsService
+
+
+class TestLiveCounters:
+    """Текущий интервал из дневных счётчиков в Redis"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("granularity", ["day", "week", "month"])
+    async def test_matches_sql(
+        self,
+        db_session: AsyncSession,
+        user_with_workouts: Users,
+        memory_cache,
+        granularity,
+    ):
+        """Интервал из счётчиков совпадает с агрегатом в БД"""
+        service = MetricsService(db_session, user_id=user_with_workouts.id)
+        today = date.today()
+
+        live = await service.get_timeline_range(today, today, granularity)
+        assert live == await service.get_timeline_range(today, today, granularity)
+
+        cache_manager._redis = None
+        assert live == await service.get_timeline_range(today, today, granularity)
+
+    @pytest.mark.asyncio
+    async def test_loaded_days_need_no_sql(
+        self,
+        db_session: AsyncSession,
+        user_with_workouts: Users,
+        memory_cache,
+        monkeypatch,
+    ):
+        """После загрузки дней сегодняшние метрики не обращаются к БД"""
+        service = MetricsService(db_session, user_id=user_with_workouts.id)
+        today = date.today()
+        first = await service.get_summary_range(today, today)
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("unexpected SQL aggregate")
+
+        monkeypatch.setattr(MetricsRepository, "get_daily_counters", fail)
+        monkeypatch.setattr(MetricsRepository, "get_timeline_window", fail)
+        assert await service.get_summary_range(today, today) == first
+        assert first["workouts_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_commit_increments_once(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+        commit_session,
+        post_workout,
+    ):
+        """Запись учитывается после коммита ровно один раз"""
+        client, user = authenticated_client
+        today = date.today()
+
+        await client.get(f"/api/v1/metrics/summary?from={today}")
+        assert memory_cache.hashes[f"fitmetrics:{live_key(user.id, today)}"] == {
+            "total_sets": "0",
+            "total_volume": "0.0",
+            "weight_sum": "0.0",
+        }
+
+        await post_workout(client, 100.0, sets=1, reps=1)
+        summary = (await client.get(f"/api/v1/metrics/summary?from={today}")).json()
+        assert summary["workouts_count"] == 0
+
+        await commit_session()
+        counters = memory_cache.hashes[f"fitmetrics:{live_key(user.id, today)}"]
+        assert counters["total_sets"] == "1"
+
+        workout_ids = memory_cache.sets[
+            f"fitmetrics:{live_key(user.id, today)}:workouts"
+        ]
+        await live_counters.record(
+            user.id, today, next(iter(workout_ids)), uuid4(), volume=100.0, weight=100.0
+        )
+        summary = (await client.get(f"/api/v1/metrics/summary?from={today}")).json()
+        assert summary["workouts_count"] == 1
+        assert summary["total_volume"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_read_before_record_not_cached(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+        commit_session,
+        post_workout,
+        monkeypatch,
+    ):
+        """Сводка, закэшированная между сбросом и record_live, не переживает запись"""
+        client, _ = authenticated_client
+        await client.get("/api/v1/metrics/summary?days=7")
+        record = LiveCounterStore.record
+
+        async def read_then_record(self, *args, **kwargs):
+            stale = (await client.get("/api/v1/metrics/summary?days=7")).json()
+            assert stale["workouts_count"] == 0
+            await record(self, *args, **kwargs)
+
+        monkeypatch.setattr(LiveCounterStore, "record", read_then_record)
+        await post_workout(client, 100.0, sets=1, reps=1)
+        await commit_session()
+
+        summary = (await client.get("/api/v1/metrics/summary?days=7")).json()
+        assert summary["workouts_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_seed_skipped_after_version_change(self, memory_cache):
+        """Снимок, прочитанный до смены версии данных, не записывается"""
+        user_id, today = uuid4(), date.today()
+        version = await data_versions.get(user_id)
+        await data_versions.bump(user_id)
+
+        await live_counters.seed(user_id, version, {today: EMPTY_DAY_COUNTERS})
+        assert await live_counters.read(user_id, [today]) == [None]
+
+        await live_counters.seed(
+            user_id, await data_versions.get(user_id), {today: EMPTY_DAY_COUNTERS}
+        )
+        assert (await live_counters.read(user_id, [today]))[0]["total_sets"] == 0
+
+    @pytest.mark.asyncio
+    async def test_import_drops_touched_days(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+    ):
+        """Импорт за сегодня сбрасывает счётчики дня, следующее чтение их загружает"""
+        client, user = authenticated_client
+        today = date.today()
+        await client.get(f"/api/v1/metrics/summary?from={today}")
+
+        content = (
+            "exercise_name,muscle_group,sets,reps,weight,performed_at\n"
+            f"Squat,Legs,1,1,80,{today.isoformat()}T00:00:01\n"
+        )
+        await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", content, "text/csv")},
+        )
+        assert f"fitmetrics:{live_key(user.id, today)}" not in memory_cache.hashes
+
+        summary = (await client.get(f"/api/v1/metrics/summary?from={today}")).json()
+        assert summary["total_volume"] == 80.0
+
+
+class TestLiveCounterScripts:
+    """Lua-скрипты счётчиков на настоящем Redis (TEST_REDIS_URL)"""
+
+    @pytest.mark.asyncio
+    async def test_seed_and_record(self, redis_cache):
+        """Загрузка дня, однократный учёт тренировки и проверка версии"""
+        user_id, today = uuid4(), date.today()
+        yesterday = date.fromordinal(today.toordinal() - 1)
+        exercise_id, workout_id, new_workout_id = uuid4(), uuid4(), uuid4()
+        version = await data_versions.get(user_id)
+
+        await live_counters.seed(
+            user_id,
+            version,
+            {
+                today: DailyCountersRow(
+                    total_sets=2,
+                    total_volume=300.0,
+                    weight_sum=150.0,
+                    exercise_ids=[exercise_id],
+                    workout_ids=[workout_id],
+                )
+            },
+        )
+        for workout in (workout_id, new_workout_id, new_workout_id):
+            await live_counters.record(
+                user_id, today, workout, uuid4(), volume=50.0, weight=50.0
+            )
+        # Незагруженный день не создаётся записью
+        await live_counters.record(
+            user_id, yesterday, uuid4(), exercise_id, volume=50.0, weight=50.0
+        )
+
+        day, missing = await live_counters.read(user_id, [today, yesterday])
+        assert missing is None
+        assert (day["total_sets"], day["total_volume"], day["weight_sum"]) == (
+            3,
+            350.0,
+            200.0,
+        )
+        assert len(day["exercise_ids"]) == 2
+        counters_key = cache_manager._make_key(live_key(user_id, today))
+        assert await redis_cache.ttl(counters_key) > 0
+
+        # Повторная загрузка не затирает день, снимок старой версии отбрасывается
+        await live_counters.seed(user_id, version, {today: EMPTY_DAY_COUNTERS})
+        assert (await live_counters.read(user_id, [today]))[0]["total_sets"] == 3
+        await data_versions.bump(user_id)
+        await live_counters.seed(user_id, version, {yesterday: EMPTY_DAY_COUNTERS})
+        assert await live_counters.read(user_id, [yesterday]) == [None]
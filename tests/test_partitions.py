@@ -0,0 +1,82 @@
+# tests/test_partitions.py
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.users import Users
+from app.db.models.workouts import Workout
+from app.repositories.partition_repo import WorkoutPartitionRepository, month_start
+
+
+async def partitions_of(session: AsyncSession, user: Users) -> set[str]:
+    stmt = select(text("workouts.tableoid::regclass::text")).where(
+        Workout.user_id == user.id
+    )
+    return set((await session.execute(stmt)).scalars())
+
+
+class TestWorkoutPartitions:
+    """Тесты помесячных секций workouts"""
+
+    def test_month_start(self):
+        """Первое число месяца со сдвигом через границу года"""
+        assert month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+        assert month_start(date(2026, 10, 19), 3) == date(2027, 1, 1)
+        assert month_start(date(2026, 1, 31), -1) == date(2025, 12, 1)
+
+    @pytest.mark.asyncio
+    async def test_create_partition_moves_default_rows(
+        self,
+        db_session: AsyncSession,
+        user_with_workouts: Users,
+    ):
+        """Новая секция забирает строки своего месяца из секции по умолчанию"""
+        repo = WorkoutPartitionRepository(db_session)
+        first_day = (
+            await db_session.execute(
+                select(func.min(Workout.performed_at)).where(
+                    Workout.user_id == user_with_workouts.id
+                )
+            )
+        ).scalar_one()
+        months = {month_start(first_day.date()), month_start(date.today())}
+        assert await partitions_of(db_session, user_with_workouts) == {
+            "workouts_default"
+        }
+
+        names = {await repo.create_partition(month) for month in months}
+
+        assert await partitions_of(db_session, user_with_workouts) == names
+        assert not set(await repo.default_months()) & months
+        assert names <= set(await repo.list_partitions())
+        # Повторный вызов возвращает существующую секцию
+        assert await repo.create_partition(date.today()) == (
+            f"workouts_{date.today():%Y_%m}"
+        )
+
+    @pytest.mark.asyncio
+    async def test_edit_in_partition(
+        self,
+        db_session: AsyncSession,
+        auth_client_with_workouts: tuple[AsyncClient, Users],
+    ):
+        """Правка и удаление находят строку в секции её месяца"""
+        client, user = auth_client_with_workouts
+        repo = WorkoutPartitionRepository(db_session)
+        for shift in (-1, 0):
+            await repo.create_partition(month_start(date.today(), shift))
+        workouts = (await client.get("/api/v1/workouts/")).json()
+
+        response = await client.patch(
+            f"/api/v1/workouts/{workouts[0]['id']}", json={"sets": 1}
+        )
+        assert response.status_code == 200
+        response = await client.delete(f"/api/v1/workouts/{workouts[1]['id']}")
+        assert response.status_code == 204
+
+        remaining = (await client.get("/api/v1/workouts/")).json()
+        assert len(remaining) == len(workouts) - 1
+        assert "workouts_default" not in await partitions_of(db_session, user)
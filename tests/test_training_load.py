@@ -0,0 +1,86 @@
+# tests/test_training_load.py
+import numpy as np
+import pytest
+from httpx import AsyncClient
+
+from app.db.models.users import Users
+from app.services.training_load import build_report, ewma, training_load
+from scripts.bench_training_load import loop_training_load, make_loads
+
+
+class TestTrainingLoadIndicators:
+    """Векторный расчёт показателей нагрузки"""
+
+    def test_ewma_matches_recursion(self):
+        """Блочная EWMA совпадает с рекурсией на рядах длиннее блока"""
+        loads = make_loads(1000)
+        for span in (2, 7, 28):
+            alpha = 2 / (span + 1)
+            expected, value = [], 0.0
+            for load in loads:
+                value = alpha * load + (1 - alpha) * value
+                expected.append(value)
+            np.testing.assert_allclose(ewma(loads, span), expected, rtol=1e-9)
+
+    def test_matches_loop_reference(self):
+        """Все показатели совпадают с построчным расчётом"""
+        loads = make_loads(400)
+        vectorized = training_load(loads)
+        reference = loop_training_load(loads.tolist())
+        for field, values in vectorized.items():
+            np.testing.assert_allclose(
+                values, reference[field], rtol=1e-9, equal_nan=True
+            )
+
+    def test_monotony_and_strain(self):
+        """Монотонность — среднее / σ за 7 дней, напряжение — неделя × монотонность"""
+        loads = np.array([100.0, 0, 100, 0, 100, 0, 100])
+        result = training_load(loads)
+
+        mean, std = loads.mean(), loads.std()
+        assert result["monotony"][-1] == pytest.approx(mean / std)
+        assert result["strain"][-1] == pytest.approx(400 * mean / std)
+
+    def test_undefined_values_are_null(self):
+        """Без нагрузки ACWR и монотонность не определены и отдаются как null"""
+        report = build_report([10, 11, 12], [0.0, 0.0, 0.0], since_day=11)
+
+        assert report["series"]["dates"] == [11, 12]
+        assert report["series"]["acwr"] == [None, None]
+        assert report["current"]["monotony"] is None
+        assert report["current"]["load"] == 0.0
+
+
+class TestTrainingLoadEndpoint:
+    """Тесты /metrics/load"""
+
+    @pytest.mark.asyncio
+    async def test_load_report(
+        self,
+        auth_client_with_workouts: tuple[AsyncClient, Users],
+    ):
+        """Ряд за окно без разгонного периода и текущие значения"""
+        client, _ = auth_client_with_workouts
+
+        response = await client.get("/api/v1/metrics/load?days=14")
+        assert response.status_code == 200
+
+        data = response.json()
+        series = data["series"]
+        assert len(series["dates"]) == 15
+        assert sum(series["load"]) == 8600.0
+        assert series["load"][-1] == 3000.0
+        assert data["current"]["load"] == 3000.0
+        assert data["current"]["acwr"] > 1
+        assert data["current"]["acute_load"] == series["acute_load"][-1]
+
+    @pytest.mark.asyncio
+    async def test_load_days_validation(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Окно короче недели — ошибка валидации"""
+        client, _ = authenticated_client
+
+        response = await client.get("/api/v1/metrics/load?days=3")
+        assert response.status_code == 422
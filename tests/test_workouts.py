@@ -1,9 +1,17 @@
 # tests/test_workouts.py
+import time
+from datetime import date, datetime, timezone
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 from app.db.models.users import Users
+from app.db.models.workouts import Workout, WorkoutSession
+from app.services.leaderboards import best_weight_key, leaderboards, volume_key
+from app.services.metrics_history import bucket_start
 
 
 class TestWorkoutsCreate:
@@ -231,6 +239,23 @@ class TestWorkoutsList:
         page2_ids = {w["id"] for w in page2}
         assert page1_ids.isdisjoint(page2_ids)
 
+    @pytest.mark.asyncio
+    async def test_list_workouts_not_modified(
+        self,
+        auth_client_with_workouts: tuple[AsyncClient, Users],
+        memory_cache,
+    ):
+        """Повторный запрос с If-None-Match возвращает 304"""
+        client, _ = auth_client_with_workouts
+
+        response = await client.get("/api/v1/workouts/")
+        etag = response.headers["etag"]
+
+        response = await client.get(
+            "/api/v1/workouts/", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
 
 class TestWorkoutsIntegration:
     """Интеграционные тесты"""
@@ -292,3 +317,529 @@ class TestWorkoutsIntegration:
 
         for workout in user1_workouts:
             assert workout["user_id"] == str(user1.id)
+
+    @pytest.mark.asyncio
+    async def test_days_follow_utc_not_process_timezone(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        monkeypatch,
+    ):
+        """День тренировки для серий берётся из performed_at, а не из пояса процесса"""
+        client, _ = authenticated_client
+        # Пояс выбирается так, чтобы местная дата сейчас отличалась от UTC
+        utc_hour = datetime.now(timezone.utc).hour
+        monkeypatch.setenv("TZ", "Etc/GMT+12" if utc_hour < 12 else "Etc/GMT-14")
+        time.tzset()
+        try:
+            payload = {"exercise_name": "Squat", "sets": 3, "reps": 5, "weight": 100.0}
+            created = (await client.post("/api/v1/workouts/", json=payload)).json()
+            summary = (await client.get("/api/v1/metrics/summary?days=7")).json()
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+        assert summary["streaks"]["last_training_day"] == created["performed_at"][:10]
+        assert summary["streaks"]["current_streak"] == 1
+
+
+class TestWorkoutsImport:
+    """Тесты импорта истории тренировок"""
+
+    @pytest.mark.asyncio
+    async def test_import_csv(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """CSV импортируется, упражнения создаются один раз"""
+        client, user = authenticated_client
+
+        content = (
+            "exercise_name,muscle_group,sets,reps,weight,performed_at\n"
+            "Bench Press,Chest,3,10,80,2025-01-10T10:00:00\n"
+            "Bench Press,Chest,3,8,85,2025-01-12T10:00:00\n"
+            "Squat,,5,5,100,2025-01-12T11:00:00\n"
+        )
+        response = await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", content, "text/csv")},
+        )
+        assert response.status_code == 200
+
+        report = response.json()
+        assert report["total_rows"] == 3
+        assert report["imported"] == 3
+        assert report["failed"] == 0
+
+        response = await client.get("/api/v1/workouts/?limit=10")
+        workouts = response.json()
+        assert len(workouts) == 3
+        assert {w["exercise"]["name"] for w in workouts} == {"Bench Press", "Squat"}
+        squat = next(w for w in workouts if w["exercise"]["name"] == "Squat")
+        assert squat["exercise"]["muscle_group"] == "general"
+        assert squat["total_volume"] == 2500.0
+        assert all(w["user_id"] == str(user.id) for w in workouts)
+
+    @pytest.mark.asyncio
+    async def test_import_ndjson_reports_row_errors(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Невалидные строки попадают в отчёт, валидные загружаются"""
+        client, _ = authenticated_client
+
+        content = "\n".join(
+            [
+                '{"exercise_name": "Deadlift", "sets": 5, "reps": 5, "weight": 120,'
+                ' "performed_at": "2025-02-01T09:00:00"}',
+                '{"exercise_name": "Deadlift", "sets": 0, "reps": 5, "weight": 120,'
+                ' "performed_at": "2025-02-02T09:00:00"}',
+                "not json",
+                '{"exercise_name": "Deadlift", "sets": 5, "reps": 5, "weight": 120}',
+                '{"exercise_name": "Deadlift", "sets": 5, "reps": 5, "weight": 120,'
+                ' "performed_at": "2999-01-01T09:00:00"}',
+            ]
+        )
+        response = await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.ndjson", content, "application/x-ndjson")},
+        )
+        assert response.status_code == 200
+
+        report = response.json()
+        assert report["total_rows"] == 5
+        assert report["imported"] == 1
+        assert report["failed"] == 4
+        assert [error["line"] for error in report["errors"]] == [2, 3, 4, 5]
+        assert "в будущем" in report["errors"][3]["errors"][0]
+
+    @pytest.mark.asyncio
+    async def test_import_csv_multiline_and_invalid_utf8(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Поле в кавычках с переводом строки разбирается, строка не в UTF-8 — ошибка"""
+        client, _ = authenticated_client
+
+        content = (
+            "exercise_name,sets,reps,weight,performed_at,notes\n"
+            'Bench Press,3,10,80,2025-01-10T10:00:00,"разминка\n'
+            'потом ""рабочие"" подходы"\n'
+            "Squat,5,5,100,2025-01-12T11:00:00,\n"
+        ).encode() + "Жим ногами,3,10,150,2025-01-13T10:00:00,\n".encode("cp1251")
+        response = await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", content, "text/csv")},
+        )
+        assert response.status_code == 200
+
+        report = response.json()
+        assert (report["imported"], report["failed"]) == (2, 1)
+        assert report["errors"] == [{"line": 5, "errors": ["invalid UTF-8"]}]
+        workouts = (await client.get("/api/v1/workouts/?limit=10")).json()
+        assert {w["exercise"]["name"] for w in workouts} == {"Bench Press", "Squat"}
+
+    @pytest.mark.asyncio
+    async def test_import_unauthenticated(self, client: AsyncClient):
+        """Неавторизованный запрос возвращает 401"""
+        response = await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", "exercise_name\n", "text/csv")},
+        )
+        assert response.status_code == 401
+
+
+class TestWorkoutSessions:
+    """Тесты тренировочных сессий"""
+
+    SESSION = {
+        "notes": "Ноги",
+        "sets": [
+            {
+                "exercise_name": "Squat",
+                "muscle_group": "Legs",
+                "sets": 1,
+                "reps": 5,
+                "weight": 100,
+            },
+            {
+                "exercise_name": "Squat",
+                "muscle_group": "Legs",
+                "sets": 1,
+                "reps": 5,
+                "weight": 110,
+            },
+            {
+                "exercise_name": "Lunge",
+                "muscle_group": "Legs",
+                "sets": 3,
+                "reps": 10,
+                "weight": 20,
+            },
+        ],
+    }
+
+    @pytest.mark.asyncio
+    async def test_create_session(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Сессия создаётся с подходами и агрегатами, подходы видны в списке"""
+        client, user = authenticated_client
+
+        response = await client.post("/api/v1/workouts/sessions", json=self.SESSION)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["user_id"] == str(user.id)
+        assert data["notes"] == "Ноги"
+        assert data["exercises_count"] == 2
+        assert data["sets_count"] == 5
+        assert data["total_volume"] == 500.0 + 550.0 + 600.0
+        assert [w["total_volume"] for w in data["workouts"]] == [500.0, 550.0, 600.0]
+        assert {w["performed_at"] for w in data["workouts"]} == {data["started_at"]}
+
+        response = await client.get("/api/v1/workouts/?limit=10")
+        assert len(response.json()) == 3
+
+        response = await client.get("/api/v1/metrics/summary?days=7")
+        summary = response.json()
+        assert summary["sessions_count"] == 1
+        assert summary["workouts_count"] == 3
+
+    @pytest.mark.asyncio
+    async def test_create_session_backdated(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+    ):
+        """Время с поясом хранится в UTC, сессия считается в своём дне"""
+        client, _ = authenticated_client
+
+        payload = {
+            **self.SESSION,
+            "started_at": "2025-03-10T10:00:00+03:00",
+            "ended_at": "2025-03-10T11:30:00+03:00",
+        }
+        response = await client.post("/api/v1/workouts/sessions", json=payload)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["started_at"] == "2025-03-10T07:00:00"
+        assert data["ended_at"] == "2025-03-10T08:30:00"
+
+        response = await client.get(
+            "/api/v1/metrics/summary",
+            params={"from": "2025-03-10", "to": "2025-03-10"},
+        )
+        assert response.json()["sessions_count"] == 1
+        response = await client.get("/api/v1/metrics/summary?days=7")
+        assert response.json()["sessions_count"] == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"sets": []},
+            {
+                "started_at": "2025-03-10T10:00:00",
+                "ended_at": "2025-03-10T09:00:00",
+            },
+            {"ended_at": "2025-03-10T09:00:00"},
+            {"started_at": "2999-01-01T10:00:00"},
+        ],
+    )
+    async def test_create_session_invalid(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        changes: dict,
+    ):
+        """Пустая сессия, начало в будущем и конец раньше начала — 422"""
+        client, _ = authenticated_client
+
+        response = await client.post(
+            "/api/v1/workouts/sessions", json={**self.SESSION, **changes}
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_session_updates_leaderboards(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+        commit_session,
+    ):
+        """После коммита рейтинги получают объём сессии и лучший вес"""
+        client, user = authenticated_client
+
+        response = await client.post("/api/v1/workouts/sessions", json=self.SESSION)
+        squat_id = next(
+            w["exercise"]["id"]
+            for w in response.json()["workouts"]
+            if w["exercise"]["name"] == "Squat"
+        )
+        await commit_session()
+
+        week = volume_key("week", bucket_start("week", date.today()))
+        assert await leaderboards.position(week, user.id) == {
+            "rank": 1,
+            "user_id": str(user.id),
+            "score": 1650.0,
+        }
+        best = await leaderboards.position(best_weight_key(UUID(squat_id)), user.id)
+        assert best["score"] == 110.0
+
+    @pytest.mark.asyncio
+    async def test_import_groups_days_into_sessions(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        db_session: AsyncSession,
+    ):
+        """Импорт объединяет подходы одного дня в сессию с агрегатами"""
+        client, user = authenticated_client
+
+        content = (
+            "exercise_name,muscle_group,sets,reps,weight,performed_at\n"
+            "Bench Press,Chest,3,10,80,2025-01-10T10:00:00\n"
+            "Bench Press,Chest,3,8,85,2025-01-12T10:00:00\n"
+            "Squat,,5,5,100,2025-01-12T11:00:00\n"
+        )
+        response = await client.post(
+            "/api/v1/workouts/import",
+            files={"file": ("history.csv", content, "text/csv")},
+        )
+        assert response.json()["imported"] == 3
+
+        sessions = (
+            await db_session.scalars(
+                select(WorkoutSession)
+                .where(WorkoutSession.user_id == user.id)
+                .order_by(WorkoutSession.started_at)
+            )
+        ).all()
+        assert [
+            (s.started_at.isoformat(), s.ended_at.isoformat(), s.exercises_count)
+            for s in sessions
+        ] == [
+            ("2025-01-10T10:00:00", "2025-01-10T10:00:00", 1),
+            ("2025-01-12T10:00:00", "2025-01-12T11:00:00", 2),
+        ]
+        assert [s.sets_count for s in sessions] == [3, 8]
+        assert sessions[1].total_volume == 2040.0 + 2500.0
+
+        orphans = await db_session.scalars(
+            select(Workout.id).where(
+                Workout.user_id == user.id, Workout.session_id.is_(None)
+            )
+        )
+        assert orphans.all() == []
+
+
+class TestWorkoutsEdit:
+    """Тесты правки и удаления тренировок"""
+
+    @pytest.mark.asyncio
+    async def test_update_applies_difference(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        post_workout,
+    ):
+        """Правка меняет объём, сводку и рекорд"""
+        client, _ = authenticated_client
+        workout = await post_workout(client, 80.0)
+
+        response = await client.patch(
+            f"/api/v1/workouts/{workout['id']}", json={"weight": 100.0}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["sets"], data["weight"]) == (3, 100.0)
+        assert data["total_volume"] == 3000.0
+
+        summary = (await client.get("/api/v1/metrics/summary?days=7")).json()
+        assert summary["total_volume"] == 3000.0
+        assert summary["workouts_count"] == 1
+
+        record = (await client.get("/api/v1/metrics/exercises/Bench Press")).json()
+        assert record["best_weight"] == 100.0
+        assert record["best_volume"] == 3000.0
+        assert record["workouts_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lowering_record_recomputes_it(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        post_workout,
+    ):
+        """Уменьшение строки с рекордом возвращает рекорд к следующей"""
+        client, _ = authenticated_client
+        await post_workout(client, 80.0)
+        best = await post_workout(client, 100.0)
+
+        await client.patch(f"/api/v1/workouts/{best['id']}", json={"weight": 60.0})
+
+        record = (await client.get("/api/v1/metrics/exercises/Bench Press")).json()
+        assert record["best_weight"] == 80.0
+        assert record["best_volume"] == 2400.0
+        assert record["workouts_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_workout(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        post_workout,
+    ):
+        """Удаление вычитает тренировку; после последней рекорда нет"""
+        client, _ = authenticated_client
+        first = await post_workout(client, 80.0)
+        second = await post_workout(client, 100.0)
+
+        response = await client.delete(f"/api/v1/workouts/{second['id']}")
+        assert response.status_code == 204
+
+        workouts = (await client.get("/api/v1/workouts/")).json()
+        assert [w["id"] for w in workouts] == [first["id"]]
+        record = (await client.get("/api/v1/metrics/exercises/Bench Press")).json()
+        assert (record["best_weight"], record["workouts_count"]) == (80.0, 1)
+
+        await client.delete(f"/api/v1/workouts/{first['id']}")
+        response = await client.get("/api/v1/metrics/exercises/Bench Press")
+        assert response.status_code == 404
+        summary = (await client.get("/api/v1/metrics/summary?days=7")).json()
+        assert summary["workouts_count"] == 0
+        assert summary["streaks"] is None
+
+    @pytest.mark.asyncio
+    async def test_session_aggregates_follow_edits(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        db_session: AsyncSession,
+    ):
+        """Агрегаты сессии сдвигаются на разность, пустая сессия удаляется"""
+        client, _ = authenticated_client
+        data = (
+            await client.post(
+                "/api/v1/workouts/sessions", json=TestWorkoutSessions.SESSION
+            )
+        ).json()
+        squat, second_squat, lunge = data["workouts"]
+
+        await client.patch(f"/api/v1/workouts/{squat['id']}", json={"sets": 2})
+        await client.delete(f"/api/v1/workouts/{lunge['id']}")
+
+        workout_session = await db_session.get(WorkoutSession, UUID(data["id"]))
+        await db_session.refresh(workout_session)
+        assert workout_session.sets_count == 3
+        assert workout_session.exercises_count == 1
+        assert workout_session.total_volume == 1000.0 + 550.0
+
+        await client.delete(f"/api/v1/workouts/{squat['id']}")
+        await client.delete(f"/api/v1/workouts/{second_squat['id']}")
+        db_session.expunge_all()
+        assert await db_session.get(WorkoutSession, UUID(data["id"])) is None
+
+    @pytest.mark.asyncio
+    async def test_other_users_workout_not_found(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        user_with_workouts: Users,
+        db_session: AsyncSession,
+    ):
+        """Чужая тренировка недоступна для правки и удаления"""
+        client, _ = authenticated_client
+        workout_id = (
+            await db_session.scalars(
+                select(Workout.id).where(Workout.user_id == user_with_workouts.id)
+            )
+        ).first()
+
+        response = await client.patch(
+            f"/api/v1/workouts/{workout_id}", json={"weight": 1.0}
+        )
+        assert response.status_code == 404
+        response = await client.delete(f"/api/v1/workouts/{workout_id}")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_edit_updates_leaderboards(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+        commit_session,
+        post_workout,
+    ):
+        """Объём периода меняется на разность, лучший вес — точно"""
+        client, user = authenticated_client
+        workout = await post_workout(client, 100.0)
+        await post_workout(client, 80.0)
+        await commit_session()
+
+        await client.patch(f"/api/v1/workouts/{workout['id']}", json={"weight": 50.0})
+        await commit_session()
+
+        week = volume_key("week", bucket_start("week", date.today()))
+        assert (await leaderboards.position(week, user.id))["score"] == 1500.0 + 2400.0
+        best = best_weight_key(UUID(workout["exercise"]["id"]))
+        assert (await leaderboards.position(best, user.id))["score"] == 80.0
+
+
+class TestIdempotencyKey:
+    """Тесты заголовка Idempotency-Key"""
+
+    @pytest.mark.asyncio
+    async def test_retry_replays_response(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+        commit_session,
+        post_workout,
+    ):
+        """Повтор после коммита получает тот же ответ без новой записи"""
+        client, _ = authenticated_client
+        first = await post_workout(client, 80.0, **{"Idempotency-Key": "abc"})
+        await commit_session()
+
+        retry = await post_workout(client, 80.0, **{"Idempotency-Key": "abc"})
+        assert retry == first
+        assert len((await client.get("/api/v1/workouts/")).json()) == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_in_progress_and_reused_key(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+        post_workout,
+    ):
+        """До коммита повтор получает 409, другой запрос с ключом — 422"""
+        client, _ = authenticated_client
+        workout = await post_workout(client, 80.0, **{"Idempotency-Key": "abc"})
+
+        payload = {
+            "exercise_name": "Bench Press",
+            "muscle_group": "Chest",
+            "sets": 3,
+            "reps": 10,
+            "weight": 80.0,
+        }
+        response = await client.post(
+            "/api/v1/workouts/", json=payload, headers={"Idempotency-Key": "abc"}
+        )
+        assert response.status_code == 409
+
+        response = await client.delete(
+            f"/api/v1/workouts/{workout['id']}", headers={"Idempotency-Key": "abc"}
+        )
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_failed_request_releases_key(
+        self,
+        authenticated_client: tuple[AsyncClient, Users],
+        memory_cache,
+    ):
+        """Ошибка обработчика освобождает ключ для повтора"""
+        client, _ = authenticated_client
+        workout_id = "00000000-0000-0000-0000-000000000000"
+
+        for _ in range(2):
+            response = await client.delete(
+                f"/api/v1/workouts/{workout_id}", headers={"Idempotency-Key": "k"}
+            )
+            assert response.status_code == 404